@@ -0,0 +1,5 @@
+"""Benchmarks for grammar compilation and parsing throughput.
+
+Run with `python -m benchmarks.run --output results.json` and compare two runs with
+`python -m benchmarks.compare before.json after.json`.
+"""
@@ -0,0 +1,34 @@
+"""Compares two results files written by benchmarks.run, printing the ratio of new to old time per phase.
+"""
+
+import argparse
+import json
+
+def compare(old, new):
+    """Returns a list of (case, phase, old seconds, new seconds, new / old) for phases present in both runs.
+    """
+    rows = []
+    for case, phases in sorted(new['results'].items()):
+        for phase, seconds in sorted(phases.items()):
+            if phase in old['results'].get(case, {}):
+                before = old['results'][case][phase]
+                rows.append((case, phase, before, seconds, seconds / before if before > 0 else float('inf')))
+
+    return rows
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('old')
+    parser.add_argument('new')
+    args = parser.parse_args(argv)
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    for case, phase, before, after, ratio in compare(old, new):
+        print('{:<20} {:<28} {:>10.6f} {:>10.6f} {:>7.2f}x'.format(case, phase, before, after, ratio))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Synthetic grammar generators. Each stresses a different part of grammar compilation, and all of them are
+LL(1) once normalized, so every phase including parsing can be timed on them.
+
+Nonterminals are drawn from the CJK block and terminals from the Latin-1 supplement, so generated grammars can
+be large without running out of single-char symbols.
+"""
+
+from pycc.grammar import Grammar, Rule, NSym, TSym
+from pycc.constants import EPSILON_CHAR
+
+_NONTERMINAL_BASE = 0x4E00
+_TERMINAL_BASE = 0xC0
+
+def nonterminal(i):
+    return NSym(chr(_NONTERMINAL_BASE + i))
+
+def terminal(i):
+    return TSym(chr(_TERMINAL_BASE + i))
+
+def wide_alternatives(n, width = 4):
+    """S -> one of n distinct keywords of equal length spelled with `width` letters, so keywords share long
+    prefixes and left factoring does most of the work.
+    """
+    length = 1
+    while width ** length < n:
+        length += 1
+
+    S = nonterminal(0)
+    rules = []
+    for i in range(n):
+        keyword = []
+        digits = i
+        for _ in range(length):
+            keyword.append(TSym('abcdefghijklmnopqrstuvwxyz'[digits % width]))
+            digits //= width
+
+        rules.append(Rule(S, keyword))
+
+    return Grammar(rules, S)
+
+def deep_chain(n):
+    """N0 -> N1, N1 -> N2, ..., Nn -> 0 | (N0): every terminal is preceded by n unit predictions.
+    """
+    rules = [Rule(nonterminal(i), [nonterminal(i + 1)]) for i in range(n)]
+    rules.append(Rule(nonterminal(n), [TSym('0')]))
+    rules.append(Rule(nonterminal(n), [TSym('('), nonterminal(0), TSym(')')]))
+
+    return Grammar(rules, nonterminal(0))
+
+def left_recursive(n):
+    """An operator precedence ladder of n directly left recursive levels:
+    Ai -> Ai op_i A(i+1) | A(i+1), An -> 0 | (A0). Level 0's operator is '+'.
+    """
+    ops = [TSym('+')] + [terminal(i) for i in range(n - 1)]
+
+    rules = []
+    for i in range(n):
+        A, B = nonterminal(i), nonterminal(i + 1)
+        rules.append(Rule(A, [A, ops[i], B]))
+        rules.append(Rule(A, [B]))
+
+    rules.append(Rule(nonterminal(n), [TSym('0')]))
+    rules.append(Rule(nonterminal(n), [TSym('('), nonterminal(0), TSym(')')]))
+
+    return Grammar(rules, nonterminal(0))
+
+def epsilon_heavy(n):
+    """S -> A1 A2 ... An z (S | epsilon), Ai -> t_i | epsilon: every nonterminal is nullable, so FIRST and
+    FOLLOW sets chain through all of them.
+    """
+    S, R = nonterminal(0), nonterminal(n + 1)
+    rules = [Rule(S, [nonterminal(i) for i in range(1, n + 1)] + [TSym('z'), R])]
+    rules.append(Rule(R, [S]))
+    rules.append(Rule(R, [TSym(EPSILON_CHAR)]))
+
+    for i in range(1, n + 1):
+        rules.append(Rule(nonterminal(i), [terminal(i)]))
+        rules.append(Rule(nonterminal(i), [TSym(EPSILON_CHAR)]))
+
+    return Grammar(rules, S)
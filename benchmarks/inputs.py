@@ -0,0 +1,33 @@
+"""Input generators for the grammars in benchmarks.grammars.
+"""
+
+from benchmarks.grammars import terminal
+
+def long_flat(n):
+    """0+0+...+0 with n operands. Accepted by left_recursive grammars.
+    """
+    return '+'.join(['0'] * n)
+
+def deeply_nested(n):
+    """(((...0...))) nested n deep. Accepted by deep_chain and left_recursive grammars.
+    """
+    return '(' * n + '0' + ')' * n
+
+def adversarial(n):
+    """A long valid prefix with the error in the last symbol, so a parse does all of its work before
+    rejecting. Rejected by left_recursive grammars.
+    """
+    return long_flat(n) + '+'
+
+def keywords(grammar, n):
+    """n separate inputs, cycling through the keywords of a wide_alternatives grammar.
+    """
+    alternatives = [''.join(sym.char for sym in rule.exp_syms) for rule in grammar.rules]
+    return [alternatives[i % len(alternatives)] for i in range(n)]
+
+def epsilon_run(n, k):
+    """k repetitions of an epsilon_heavy(n) statement, alternately with every optional terminal present and
+    with all of them omitted.
+    """
+    full = ''.join(terminal(i).char for i in range(1, n + 1)) + 'z'
+    return ''.join(full if i % 2 == 0 else 'z' for i in range(k))
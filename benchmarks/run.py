@@ -0,0 +1,97 @@
+"""Times each phase of grammar compilation and parsing on the synthetic grammars, and writes the results as
+JSON. Each timing is the best of several repeats, in seconds.
+"""
+
+import argparse
+import json
+import platform
+import time
+from benchmarks import grammars, inputs
+from pycc.compiled_table import compile_parse_table
+from pycc.grammar_normalization import left_factor, remove_left_recursion
+from pycc.ll_parser import LLParser
+from pycc.parse_table import build_first_sets, build_follow_sets, build_parse_table
+
+RESULTS_VERSION = 1
+
+def cases(scale = 1):
+    """Yields (name, grammar, {input name: [strings]}) for each benchmark case. scale multiplies every size.
+    """
+    wide = grammars.wide_alternatives(256 * scale)
+    yield ('wide_alternatives', wide, {'keywords': inputs.keywords(wide, 2000 * scale)})
+
+    yield ('deep_chain', grammars.deep_chain(50 * scale),
+           {'deeply_nested': [inputs.deeply_nested(100 * scale)]})
+
+    yield ('left_recursive', grammars.left_recursive(20 * scale),
+           {'long_flat': [inputs.long_flat(2000 * scale)],
+            'deeply_nested': [inputs.deeply_nested(200 * scale)],
+            'adversarial': [inputs.adversarial(2000 * scale)]})
+
+    yield ('epsilon_heavy', grammars.epsilon_heavy(100 * scale),
+           {'epsilon_run': [inputs.epsilon_run(100 * scale, 20)]})
+
+def time_phases(grammar, input_sets, repeat = 3):
+    """Returns a map of phase name -> best time in seconds for grammar and each named input set.
+    """
+    timings = {}
+
+    def timed(name, fn, *args):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn(*args)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        timings[name] = best
+        return result
+
+    lrr = timed('remove_left_recursion', remove_left_recursion, grammar)
+    normalized = timed('left_factor', left_factor, lrr)
+    first_sets = timed('build_first_sets', build_first_sets, normalized)
+    follow_sets = timed('build_follow_sets', build_follow_sets, normalized, first_sets)
+    table = timed('build_parse_table', build_parse_table, normalized, first_sets, follow_sets)
+    timed('compile_parse_table', compile_parse_table, normalized, table)
+
+    parser = LLParser(grammar)
+    for name, strings in input_sets.items():
+        timed('parse:' + name, lambda: [parser.parse(s) for s in strings])
+
+        # rewriting one character in the middle of the longest string, which reparses only near the edit but
+        # copies the text and the checkpoints after it
+        longest = max(strings, key=len)
+        incremental = parser.incremental(longest)
+        mid = len(longest) // 2
+        timed('edit:' + name, incremental.edit, mid, mid + 1, longest[mid:mid + 1])
+
+    return timings
+
+def run(scale = 1, repeat = 3):
+    results = {}
+    for name, grammar, input_sets in cases(scale):
+        results[name] = time_phases(grammar, input_sets, repeat)
+
+    return {
+        'version': RESULTS_VERSION,
+        'python': platform.python_version(),
+        'scale': scale,
+        'results': results,
+    }
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=int, default=1, help='multiplier for every grammar and input size')
+    parser.add_argument('--repeat', type=int, default=3, help='timing repeats per phase (best is kept)')
+    parser.add_argument('--output', help='file to write results to (defaults to stdout)')
+    args = parser.parse_args(argv)
+
+    results = json.dumps(run(args.scale, args.repeat), indent=2, sort_keys=True)
+    if args.output is None:
+        print(results)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(results + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Module for recognizing large batches of strings with NumPy.
+
+Rather than running the LL driver once per string, every string's automaton is stepped in lockstep. The batch is
+padded into a 2-D array of terminal ids and each row gets its own stack in a shared stack array. Each step looks up
+one transition per running row, for the symbol on top of its stack and its lookahead, in a single table over
+every symbol:
+- a nonterminal row holds the table's prediction chains (see pycc.compiled_table), which replace the
+  nonterminal with everything it predicts up to matching the lookahead, consuming it if the chain does
+- a terminal row holds a match (pop and advance) on its own terminal, or an accept on END
+- anything else rejects
+so a step is a handful of vectorized gathers and scatters, and a string takes about one step per character plus
+one per chain that ends without matching (e.g. an epsilon production).
+
+The number of steps is proportional to the longest string in the batch, independent of the batch size. The
+fixed cost of each step is spread over every row still running, so large batches of similar-length strings
+gain the most. NumPy is an optional dependency and is only needed for this module.
+"""
+
+from pycc.compiled_table import UNKNOWN_TERMINAL, END_TERMINAL, _BYTES_TYPES
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_ACCEPTED = 1
+_REJECTED = -1
+
+def recognize_batch(table, inputs, initial_depth = 64):
+    """Returns a boolean NumPy array with whether each string in inputs is accepted by table. Inputs may be strs
+    or bytes-like objects, as for CompiledTable.encode.
+    """
+    if np is None:
+        raise ImportError("recognize_batch requires numpy")
+
+    if not table.complete:
+        table.build_all()
+
+    inputs = list(inputs)
+    n_terminals = table.n_terminals
+    n_rows = len(inputs)
+    if n_rows == 0:
+        return np.zeros(0, dtype=bool)
+
+    codes = _encode_batch(table, inputs).ravel()
+    row_length = len(codes) // n_rows
+    (transitions, productions, lengths, consumes, accept) = _transitions(table)
+    width = productions.shape[0]
+
+    # Stacks are stored depth-major: entry d * n_rows + r is depth d of row r's stack. Each step then reads and
+    # writes contiguous runs of rows.
+    stacks = np.empty((max(initial_depth, 2) + width) * n_rows, dtype=np.int32)
+    stacks[:n_rows] = END_TERMINAL
+    stacks[n_rows:2 * n_rows] = table.start
+    status = np.zeros(n_rows, dtype=np.int8)
+
+    # state of the rows still running, kept compacted
+    rows = np.arange(n_rows)
+    depth = np.full(n_rows, 2, dtype=np.int64)
+    pos = rows * row_length
+    while len(rows) > 0:
+        top = (depth - 1) * n_rows + rows
+        k = transitions[stacks[top] * n_terminals + codes[pos]]
+
+        done = (k < 0) | (k == accept)
+        if done.any():
+            finished = rows[done]
+            status[finished] = np.where(k[done] < 0, _REJECTED, _ACCEPTED)
+
+            running = ~done
+            rows = rows[running]
+            depth = depth[running]
+            pos = pos[running]
+            top = top[running]
+            k = k[running]
+
+        depth += lengths[k] - 1
+        needed = (int(depth.max(initial=0)) + width) * n_rows
+        if needed > len(stacks):
+            stacks = _grow(stacks, needed)
+
+        # every row writes a full width of symbols; anything past its new depth is just ignored
+        for j in range(width):
+            stacks[top + j * n_rows] = productions[j][k]
+        pos += consumes[k]
+
+    return status == _ACCEPTED
+
+def _transitions(table):
+    """Builds the table stepped through by recognize_batch, flattened: entry X * n_terminals + a is the transition
+    id for symbol X on top of the stack with lookahead a, or -1 to reject. Transition k pushes
+    productions[:lengths[k], k] (one row per stack position, so a step can write a position at a time) and
+    advances the input by consumes[k]; transition accept accepts.
+    """
+    n_terminals = table.n_terminals
+    chains = table.chains()
+    n_chains = len(chains.offsets) - 1
+    (productions, lengths) = _pad(chains.symbols, chains.offsets, n_chains + 2)
+    productions = np.ascontiguousarray(productions.T)
+
+    # after the chains come a match and an accept, which push nothing
+    match = n_chains
+    accept = n_chains + 1
+    consumes = np.zeros(n_chains + 2, dtype=np.int64)
+    consumes[:n_chains] = np.asarray(chains.consumes, dtype=np.int64)
+    consumes[match] = 1
+
+    terminal_rows = np.full((n_terminals, n_terminals), -1, dtype=np.int64)
+    terminal_rows[np.arange(n_terminals), np.arange(n_terminals)] = match
+    terminal_rows[END_TERMINAL, END_TERMINAL] = accept
+    terminal_rows[UNKNOWN_TERMINAL, UNKNOWN_TERMINAL] = -1
+
+    transitions = np.concatenate([terminal_rows.ravel(), np.asarray(chains.table, dtype=np.int64)])
+    return (transitions, productions, lengths, consumes, accept)
+
+def _encode_batch(table, inputs):
+    """Encodes inputs as a (rows, longest + 1) array of terminal ids, padded with END_TERMINAL. strs are decoded to
+    code points in one pass and mapped through a lookup array (or the table's class map), and bytes-like inputs
+    through the table's byte_codes, with no per-character Python work.
+    """
+    lengths = np.fromiter(map(len, inputs), dtype=np.int64, count=len(inputs))
+    codes = np.full((len(inputs), int(lengths.max()) + 1), END_TERMINAL, dtype=np.int32)
+
+    is_bytes = np.fromiter((isinstance(s, _BYTES_TYPES) for s in inputs), dtype=bool, count=len(inputs))
+    for rows, encode in [(np.flatnonzero(~is_bytes), _encode_strs), (np.flatnonzero(is_bytes), _encode_bytes)]:
+        if len(rows) == 0:
+            continue
+
+        flat = encode(table, [inputs[i] for i in rows])
+        row_lengths = lengths[rows]
+        row_ids = np.repeat(rows, row_lengths)
+        starts = np.cumsum(row_lengths) - row_lengths
+        col_ids = np.arange(len(flat)) - np.repeat(starts, row_lengths)
+        codes[row_ids, col_ids] = flat
+
+    return codes
+
+def _encode_strs(table, inputs):
+    points = np.frombuffer(''.join(inputs).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    if table.class_map is not None:
+        return _encode_classes(table, points)
+
+    return _encode_chars(table, points)
+
+def _encode_bytes(table, inputs):
+    data = np.frombuffer(b''.join(inputs), dtype=np.uint8)
+    return np.asarray(table.byte_codes, dtype=np.int32)[data]
+
+def _encode_chars(table, points):
+    single_chars = [(ord(c), i) for c, i in table.terminal_ids.items() if len(c) == 1]
+    lookup = np.full(max([o for (o, _) in single_chars], default=0) + 1, UNKNOWN_TERMINAL, dtype=np.int32)
+    for (o, i) in single_chars:
+        lookup[o] = i
+
+    in_range = points < len(lookup)
+    return np.where(in_range, lookup[np.where(in_range, points, 0)], UNKNOWN_TERMINAL)
+
+def _encode_classes(table, points):
+    class_map = table.class_map
+    starts = np.asarray(class_map.starts, dtype=np.int64)
+    classes = np.asarray(class_map.classes, dtype=np.int64)
+
+    return np.asarray(table.class_codes, dtype=np.int32)[classes[np.searchsorted(starts, points, 'right') - 1]]
+
+def _pad(symbols, offsets, n_rows):
+    """Returns the symbols of each entry of a flat symbols/offsets buffer as rows of a padded 2-D array with
+    n_rows rows, along with their lengths. Rows past the buffer's entries are empty.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.zeros(n_rows, dtype=np.int64)
+    lengths[:len(offsets) - 1] = np.diff(offsets)
+    productions = np.zeros((n_rows, max(int(lengths.max(initial=0)), 1)), dtype=np.int32)
+
+    symbols = np.asarray(symbols, dtype=np.int32)
+    for p in range(len(offsets) - 1):
+        productions[p, :lengths[p]] = symbols[offsets[p]:offsets[p + 1]]
+
+    return (productions, lengths)
+
+def _grow(stacks, needed):
+    grown = np.empty(max(needed, 2 * len(stacks)), dtype=stacks.dtype)
+    grown[:len(stacks)] = stacks
+    return grown
@@ -0,0 +1,136 @@
+"""Module for persisting compiled parse tables on disk, so a parser for a previously seen grammar can skip
+normalization and analysis entirely.
+
+Tables are keyed by a stable fingerprint of the grammar's rules and start symbol, and of the version of the code
+that normalizes and compiles it. Each file holds a fixed header, a JSON blob with the symbol chars (and the
+number of lowered character classes) and the table's int32 arrays laid out back to back in little-endian order.
+Files are read through mmap, and any file that doesn't match the current FORMAT_VERSION is ignored. The arrays
+are copied out of the mapping once, into regular arrays, so a loaded table doesn't keep the file open.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pycc.charset import ClassMap
+from pycc.compiled_table import CompiledTable
+from pycc.grammar import CSym, NSym
+
+FORMAT_VERSION = 3
+
+# Version of the normalization, optimization and table compilation code. Bump it whenever a change gives some
+# grammar different normalized rules or production ids, so tables built by older code are never loaded:
+# evaluate() finds each production's action by its id.
+COMPILER_VERSION = 1
+
+_MAGIC = b'PYCCTBL\0'
+
+_SYMBOL_KINDS = {NSym: 'N', CSym: 'C'}
+
+# magic, version, start, blob length, then the lengths of the table, symbols, offsets, class starts and class ids
+# arrays. The class arrays are empty for tables without a class map.
+_HEADER = struct.Struct('<8s8I')
+
+def grammar_fingerprint(grammar, variant = ''):
+    """Returns a hex digest identifying grammar by its start symbol and rules (in order), and the tables built
+    from it by the current FORMAT_VERSION and COMPILER_VERSION. Terminals, character classes and nonterminals
+    with the same char are distinguished. variant distinguishes tables built from the same grammar with
+    different options.
+    """
+    rules = [[rule.sym.char, [[_SYMBOL_KINDS.get(type(sym), 'T'), sym.char] for sym in rule.exp_syms]]
+             for rule in grammar.rules]
+    key = [FORMAT_VERSION, COMPILER_VERSION, grammar.start_symbol.char, rules]
+    if variant != '':
+        key.append(variant)
+    canonical = json.dumps(key, separators=(',', ':'))
+
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def cache_path(cache_dir, grammar, variant = ''):
+    return os.path.join(cache_dir, grammar_fingerprint(grammar, variant) + '.pycc')
+
+def save_table(table, path):
+    """Writes table to path. The file is written to a temporary name first and then moved into place, so
+    concurrent readers never see a partial file.
+    """
+    blob = json.dumps([table.terminals, table.nonterminals, table.n_lowered]).encode('utf-8')
+    arrays = [table.table, table.symbols, table.offsets, array('i'), array('i')]
+    if table.class_map is not None:
+        arrays[3:] = [array('i', table.class_map.starts), array('i', table.class_map.classes)]
+    arrays = [_to_little_endian(a) for a in arrays]
+
+    header = _HEADER.pack(_MAGIC, FORMAT_VERSION, table.start, len(blob), *[len(a) for a in arrays])
+
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(blob)
+            for a in arrays:
+                f.write(a.tobytes())
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def load_table(path):
+    """Reads a CompiledTable written by save_table. Raises ValueError if the file isn't a table in the current
+    format.
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if len(mm) < _HEADER.size:
+            raise ValueError("Truncated parse table file: {}".format(path))
+
+        magic, version, start, blob_len, *lengths = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Unsupported parse table file: {}".format(path))
+
+        offset = _HEADER.size + blob_len
+        if len(mm) != offset + 4 * sum(lengths):
+            raise ValueError("Truncated parse table file: {}".format(path))
+
+        terminals, nonterminals, n_lowered = json.loads(mm[_HEADER.size:offset].decode('utf-8'))
+
+        arrays = []
+        with memoryview(mm) as view:
+            for length in lengths:
+                a = array('i')
+                a.frombytes(view[offset:offset + 4 * length])
+                if sys.byteorder != 'little':
+                    a.byteswap()
+
+                arrays.append(a)
+                offset += 4 * length
+
+    (table, symbols, offsets, class_starts, class_ids) = arrays
+    class_map = None
+    if len(class_starts) > 0:
+        class_map = ClassMap(class_starts, class_ids, len(terminals) - 1)
+
+    return CompiledTable(terminals, nonterminals, start, table, symbols, offsets, class_map, n_lowered)
+
+def load_cached_table(cache_dir, grammar, variant = ''):
+    """Returns the cached CompiledTable for grammar, or None if there isn't a usable one.
+    """
+    try:
+        return load_table(cache_path(cache_dir, grammar, variant))
+    except (OSError, ValueError):
+        return None
+
+def store_cached_table(cache_dir, grammar, table, variant = ''):
+    os.makedirs(cache_dir, exist_ok=True)
+    save_table(table, cache_path(cache_dir, grammar, variant))
+
+def _to_little_endian(a):
+    if sys.byteorder == 'little':
+        return a
+
+    a = array('i', a)
+    a.byteswap()
+    return a
@@ -0,0 +1,187 @@
+"""Module for sets of characters and their equivalence classes.
+
+A charset is a tuple of disjoint, sorted, inclusive (lo, hi) code point ranges. Given a collection of charsets,
+partition() groups every code point into equivalence classes: two code points share a class exactly when
+they belong to the same charsets, so tables can be indexed by class id rather than by character.
+"""
+
+from array import array
+from bisect import bisect_right
+
+MAX_CODE_POINT = 0x10FFFF
+
+ANY = ((0, MAX_CODE_POINT),)
+
+# Escapes usable both inside and outside of [...] classes
+_CLASS_ESCAPES = {
+    'd': ((ord('0'), ord('9')),),
+    'w': ((ord('0'), ord('9')), (ord('A'), ord('Z')), (ord('_'), ord('_')), (ord('a'), ord('z'))),
+    's': ((ord('\t'), ord('\r')), (ord(' '), ord(' '))),
+}
+
+_CHAR_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v', '0': '\0'}
+
+def normalize(ranges):
+    """Sorts ranges and merges any that overlap or touch.
+    """
+    merged = []
+    for lo, hi in sorted(ranges):
+        if len(merged) > 0 and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+
+    return tuple(merged)
+
+def negate(charset):
+    ranges = []
+    lo = 0
+    for start, end in charset:
+        if start > lo:
+            ranges.append((lo, start - 1))
+        lo = end + 1
+
+    if lo <= MAX_CODE_POINT:
+        ranges.append((lo, MAX_CODE_POINT))
+
+    return tuple(ranges)
+
+def from_chars(chars):
+    return normalize((ord(c), ord(c)) for c in chars)
+
+def contains(charset, c):
+    o = ord(c)
+    return any(lo <= o <= hi for lo, hi in charset)
+
+def parse_escape(pattern, i):
+    """Parses the escape sequence whose backslash is at pattern[i]. Returns (charset, next index).
+    """
+    if i + 1 >= len(pattern):
+        raise ValueError("Dangling escape at end of pattern: {!r}".format(pattern))
+
+    c = pattern[i + 1]
+    if c in _CLASS_ESCAPES:
+        return (_CLASS_ESCAPES[c], i + 2)
+    if c.isupper() and c.lower() in _CLASS_ESCAPES:
+        return (negate(_CLASS_ESCAPES[c.lower()]), i + 2)
+
+    c = _CHAR_ESCAPES.get(c, c)
+    return (((ord(c), ord(c)),), i + 2)
+
+def parse_class(pattern, i):
+    """Parses a bracketed class such as [a-z_], [^"] or [\\d.] whose opening bracket is at pattern[i]. Returns
+    (charset, index after the closing bracket).
+    """
+    i += 1
+    negated = i < len(pattern) and pattern[i] == '^'
+    if negated:
+        i += 1
+
+    ranges = []
+    first = True
+    while i < len(pattern) and (pattern[i] != ']' or first):
+        first = False
+
+        if pattern[i] == '\\':
+            (charset, i) = parse_escape(pattern, i)
+        else:
+            charset = ((ord(pattern[i]), ord(pattern[i])),)
+            i += 1
+
+        # a range, unless the '-' is the last char of the class
+        if (len(charset) == 1 and charset[0][0] == charset[0][1] and
+                i + 1 < len(pattern) and pattern[i] == '-' and pattern[i + 1] != ']'):
+            if pattern[i + 1] == '\\':
+                (end, i) = parse_escape(pattern, i + 1)
+            else:
+                (end, i) = (((ord(pattern[i + 1]), ord(pattern[i + 1])),), i + 2)
+
+            if len(end) != 1 or end[0][0] != end[0][1] or end[0][0] < charset[0][0]:
+                raise ValueError("Invalid range in class: {!r}".format(pattern))
+
+            charset = ((charset[0][0], end[0][0]),)
+
+        ranges.extend(charset)
+
+    if i >= len(pattern):
+        raise ValueError("Unterminated character class: {!r}".format(pattern))
+
+    charset = normalize(ranges)
+    return (negate(charset) if negated else charset, i + 1)
+
+def parse_set(pattern):
+    """Parses a pattern made of exactly one bracketed class or escape, such as [0-9], [^"] or \\w.
+    """
+    if pattern.startswith('['):
+        (charset, i) = parse_class(pattern, 0)
+    elif pattern.startswith('\\'):
+        (charset, i) = parse_escape(pattern, 0)
+    else:
+        i = 0
+
+    if i == 0 or i != len(pattern):
+        raise ValueError("Expected a single class or escape: {!r}".format(pattern))
+
+    return charset
+
+class ClassMap:
+    """Maps characters to equivalence class ids. Code points below 256 go through a direct lookup array; the
+    rest are found by bisecting the sorted interval starts.
+    """
+    def __init__(self, starts, classes, n_classes):
+        # classes[k] is the class of every code point in [starts[k], starts[k + 1])
+        self.starts = starts
+        self.classes = classes
+        self.n_classes = n_classes
+
+        self.latin1 = array('i', [classes[bisect_right(starts, o) - 1] for o in range(256)])
+
+    def class_of(self, c):
+        o = ord(c)
+        if o < 256:
+            return self.latin1[o]
+
+        return self.classes[bisect_right(self.starts, o) - 1]
+
+def partition(charsets):
+    """Splits the code point space into equivalence classes with respect to charsets.
+
+    Returns (class_map, members), where members[i] is the set of class ids making up charsets[i]. Code points
+    in none of the charsets form class 0 (if there are any).
+    """
+    events = {0: [], MAX_CODE_POINT + 1: []}
+    for i, charset in enumerate(charsets):
+        for lo, hi in charset:
+            events.setdefault(lo, []).append(i)
+            events.setdefault(hi + 1, []).append(~i)
+
+    signatures = {frozenset(): 0}
+    starts = []
+    classes = array('i')
+    members = [set() for _ in charsets]
+
+    active = set()
+    for point in sorted(events):
+        if point > MAX_CODE_POINT:
+            break
+
+        for i in events[point]:
+            if i >= 0:
+                active.add(i)
+            else:
+                active.discard(~i)
+
+        signature = frozenset(active)
+        if signature not in signatures:
+            signatures[signature] = len(signatures)
+
+        class_id = signatures[signature]
+        for i in signature:
+            members[i].add(class_id)
+
+        # adjacent intervals in the same class are merged
+        if len(classes) == 0 or classes[-1] != class_id:
+            starts.append(point)
+            classes.append(class_id)
+
+    return (ClassMap(starts, classes, len(signatures)), members)
@@ -0,0 +1,149 @@
+"""Module for generating standalone parser modules from a grammar.
+
+A generated module exposes a single parse(s) function and has no runtime dependency on pycc: all grammar
+analysis is done at generation time and the results are written out as literal constants. Two variants are
+available:
+- 'table': the parse table plus a driver loop specialized to it
+- 'recursive': a recursive-descent parser with one function per nonterminal. This avoids the table lookups
+  entirely, but nesting depth is limited by Python's recursion limit.
+"""
+
+from pycc.compiled_table import UNKNOWN_TERMINAL, END_TERMINAL
+from pycc.ll_parser import LLParser
+
+_HEADER = '''# Parser generated by pycc. Do not edit.
+#
+# Recognizes strings of the grammar:
+#
+{grammar}
+
+'''
+
+_TABLE_DRIVER = '''
+def parse(s):
+    stack = [END, START]
+    push = stack.extend
+    pop = stack.pop
+
+    for a in chain(map(TERMINAL_IDS.get, s, repeat(UNKNOWN)), (END,)):
+        top = pop()
+        while top >= N_TERMINALS:
+            rhs = CELLS[top + a]
+            if rhs is None:
+                return False
+
+            push(rhs)
+            top = pop()
+
+        if top != a:
+            return False
+
+    return True
+'''
+
+def generate(grammar, path, mode = 'table'):
+    """Writes a standalone parser module for grammar to path.
+    """
+    source = generate_source(grammar, mode)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(source)
+
+def generate_source(grammar, mode = 'table'):
+    """Returns the source of a standalone parser module for grammar.
+    """
+    parser = LLParser(grammar)
+    if parser.compiled.class_map is not None:
+        raise ValueError("Can't generate a parser for a grammar with character class terminals")
+
+    if mode == 'table':
+        body = _generate_table(parser.compiled)
+    elif mode == 'recursive':
+        body = _generate_recursive(parser.compiled)
+    else:
+        raise ValueError("Unknown codegen mode: {}".format(mode))
+
+    return _HEADER.format(grammar=_comment(parser.grammar.stringify_rules())) + body
+
+def _generate_table(table):
+    """Nonterminal j is encoded as its row offset j * N_TERMINALS, shifted up by N_TERMINALS so that it stays
+    distinct from the terminal ids. A lookup is then just CELLS[top + a], and each cell holds the production's
+    right-hand side directly (in stack order) rather than a production id.
+    """
+    n_terminals = table.n_terminals
+
+    def encode(sym_id):
+        if sym_id < n_terminals:
+            return sym_id
+
+        return (sym_id - n_terminals + 1) * n_terminals
+
+    productions = []
+    for p in range(len(table.offsets) - 1):
+        productions.append(tuple(encode(s) for s in table.symbols[table.offsets[p]:table.offsets[p + 1]]))
+
+    cells = [None] * n_terminals + [None if p < 0 else productions[p] for p in table.table]
+
+    lines = [
+        'from itertools import chain, repeat',
+        '',
+        'UNKNOWN = {!r}'.format(UNKNOWN_TERMINAL),
+        'END = {!r}'.format(END_TERMINAL),
+        'N_TERMINALS = {!r}'.format(n_terminals),
+        'START = {!r}'.format(encode(table.start)),
+        'TERMINAL_IDS = {!r}'.format({c: i for c, i in table.terminal_ids.items() if i != END_TERMINAL}),
+        'CELLS = {!r}'.format(tuple(cells)),
+    ]
+
+    return '\n'.join(lines) + '\n' + _TABLE_DRIVER
+
+def _generate_recursive(table):
+    n_terminals = table.n_terminals
+
+    lines = [
+        'def parse(s):',
+        '    """Raises RecursionError if s is nested too deeply for the Python stack."""',
+        '    return _parse_{}(s, 0, len(s)) == len(s)'.format(table.start - n_terminals),
+    ]
+
+    for j, nonterm in enumerate(table.nonterminals):
+        # Group lookaheads by the production they predict
+        lookaheads = {}
+        for a in range(n_terminals):
+            p = table.table[j * n_terminals + a]
+            if p >= 0:
+                lookaheads.setdefault(p, []).append(a)
+
+        lines.extend([
+            '',
+            'def _parse_{}(s, i, n):'.format(j),
+            '    # {!r}'.format(nonterm),
+            '    c = s[i] if i < n else None',
+        ])
+
+        for p, terms in lookaheads.items():
+            chars = tuple(None if a == END_TERMINAL else table.terminals[a] for a in terms)
+            lines.append('    if c in {!r}:'.format(chars))
+
+            rhs = table.symbols[table.offsets[p]:table.offsets[p + 1]]
+            for sym in reversed(rhs):
+                if sym < n_terminals:
+                    lines.extend([
+                        '        if i >= n or s[i] != {!r}:'.format(table.terminals[sym]),
+                        '            return -1',
+                        '        i += 1',
+                    ])
+                else:
+                    lines.extend([
+                        '        i = _parse_{}(s, i, n)'.format(sym - n_terminals),
+                        '        if i < 0:',
+                        '            return -1',
+                    ])
+
+            lines.append('        return i')
+
+        lines.append('    return -1')
+
+    return '\n'.join(lines) + '\n'
+
+def _comment(s):
+    return '\n'.join('#     ' + line for line in s.splitlines())
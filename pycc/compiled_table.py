@@ -0,0 +1,339 @@
+"""Module for compiling a parse table into a dense, integer-encoded form.
+
+Every terminal and nonterminal is interned to a small integer. Terminals occupy ids [0, n_terminals) and
+nonterminals occupy ids [n_terminals, n_terminals + n_nonterminals), so a single comparison tells the two
+apart. The table itself is a row-major array('i') of production ids (or -1 for a miss) and every production's
+right-hand side is stored, pre-reversed, in one flat symbol buffer.
+
+For the plain recognizer the table is also available as prediction chains: for each (nonterminal, lookahead)
+cell, the combined stack effect of every predict the driver would make before the lookahead is matched. The
+driver applies a whole chain in one step instead of popping, looking up and pushing once per production.
+
+Grammars with character class terminals (CSym) are compiled over equivalence classes of characters instead:
+each terminal id after END_TERMINAL stands for one class, and input characters are mapped to it through a class
+map. A terminal that spans several classes is lowered into a nonterminal with one single-class production per
+class, so the driver never needs more than an equality test to match a terminal.
+"""
+
+import mmap
+from array import array
+from itertools import repeat
+import pycc.charset as charset
+from pycc.constants import EPSILON_CHAR, END_SYMBOL
+from pycc.grammar import CSym
+
+# Reserved terminal ids. Input characters that don't appear in the grammar are encoded as UNKNOWN_TERMINAL,
+# whose column is always a miss.
+UNKNOWN_TERMINAL = 0
+END_TERMINAL = 1
+
+_BYTES_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+class CompiledTable:
+    def __init__(self, terminals, nonterminals, start, table, symbols, offsets, class_map = None, n_lowered = 0):
+        # terminals[i] is the char for terminal id i, nonterminals[j] the char for id n_terminals + j. With a
+        # class map, terminals[i] is instead a label for the class with terminal id i.
+        self.terminals = terminals
+        self.nonterminals = nonterminals
+        self.n_terminals = len(terminals)
+        self.terminal_ids = {c: i for i, c in enumerate(terminals) if c is not None}
+
+        # Class k of class_map has terminal id k + 1, except for class 0 (characters outside of every terminal)
+        self.class_map = class_map
+        if class_map is not None:
+            self.class_codes = array('i', [UNKNOWN_TERMINAL]) + array('i', range(2, class_map.n_classes + 1))
+            self.byte_codes = array('i', [self.class_codes[k] for k in class_map.latin1])
+        else:
+            # byte_codes[b] is the terminal id for byte value b
+            self.byte_codes = array('i', [self.terminal_ids.get(chr(b), UNKNOWN_TERMINAL) for b in range(256)])
+
+        # id of the start symbol
+        self.start = start
+
+        # table[(X - n_terminals) * n_terminals + a] is the production id to predict for (X, a), or -1
+        self.table = table
+
+        # production p pushes symbols[offsets[p]:offsets[p + 1]], already in stack order
+        self.symbols = symbols
+        self.offsets = offsets
+
+        # The last n_lowered nonterminals are lowered character class terminals, which drivers report as terminals
+        self.n_lowered = n_lowered
+        self.first_lowered = self.n_terminals + len(nonterminals) - n_lowered
+
+        # Whether every row of table is built; see pycc.lazy_table
+        self.complete = True
+
+        self._chains = None
+
+    def resolve(self, nonterm_id, term_id):
+        """Called by the drivers when a lookup misses, in case the cell's row hasn't been built yet. Returns the
+        production id for the cell, which for a complete table is always -1.
+        """
+        return -1
+
+    def chains(self):
+        """The PredictionChains for this table, built on first use.
+        """
+        if self._chains is None:
+            self._chains = build_prediction_chains(self)
+
+        return self._chains
+
+    def __getstate__(self):
+        # chains are cheap to rebuild relative to sending them to another process
+        state = dict(self.__dict__)
+        state['_chains'] = None
+        return state
+
+    def is_terminal(self, sym_id):
+        """Whether sym_id is a terminal of the grammar, including a lowered character class terminal.
+        """
+        return sym_id < self.n_terminals or sym_id >= self.first_lowered
+
+    def symbol_char(self, sym_id):
+        if sym_id < self.n_terminals:
+            return self.terminals[sym_id]
+
+        return self.nonterminals[sym_id - self.n_terminals]
+
+    def encode(self, s):
+        """Lazily maps each symbol of s to its terminal id. s is either a str (or other iterable of chars), or a
+        bytes-like object such as bytes, bytearray, memoryview or mmap.mmap. Bytes are read in place through a
+        memoryview, never copied, and each byte value b is matched by the terminal chr(b).
+        """
+        if isinstance(s, _BYTES_TYPES):
+            view = memoryview(s)
+            if view.format != 'B':
+                view = view.cast('B')
+
+            return map(self.byte_codes.__getitem__, view)
+
+        if self.class_map is not None:
+            return map(self._class_code, s)
+
+        return map(self.terminal_ids.get, s, repeat(UNKNOWN_TERMINAL))
+
+    def _class_code(self, c):
+        o = ord(c)
+        if o < 256:
+            return self.byte_codes[o]
+
+        return self.class_codes[self.class_map.class_of(c)]
+
+    def lookup(self, nonterm_id, term_id):
+        return self.table[(nonterm_id - self.n_terminals) * self.n_terminals + term_id]
+
+def compile_parse_table(grammar, parse_table):
+    """Interns the symbols of grammar and packs parse_table (as built by parse_table.build_parse_table) into a
+    CompiledTable. Production ids are indices into grammar.rules.
+    """
+    if any(type(sym) is CSym for sym in grammar.terminals):
+        return _compile_with_classes(grammar, parse_table)
+
+    terminals = [None, END_SYMBOL] + [sym.char for sym in grammar.terminals]
+    nonterminals = [grammar.start_symbol.char]
+    nonterminals.extend(sym.char for sym in grammar.nonterminals if sym.char != grammar.start_symbol.char)
+
+    n_terminals = len(terminals)
+    ids = {c: i for i, c in enumerate(terminals) if c is not None}
+    ids.update({c: n_terminals + j for j, c in enumerate(nonterminals)})
+
+    symbols = array('i')
+    offsets = array('i', [0])
+    production_ids = {}
+    for i, rule in enumerate(grammar.rules):
+        exp_chars = tuple(sym.char for sym in rule.exp_syms)
+        production_ids.setdefault((rule.sym.char, exp_chars), i)
+
+        symbols.extend(ids[c] for c in reversed(exp_chars) if c != EPSILON_CHAR)
+        offsets.append(len(symbols))
+
+    table = array('i', [-1]) * (len(nonterminals) * n_terminals)
+    for (nonterm, term), exp_chars in parse_table.items():
+        cell = (ids[nonterm] - n_terminals) * n_terminals + ids[term]
+        table[cell] = production_ids[(nonterm, tuple(exp_chars))]
+
+    return CompiledTable(terminals, nonterminals, ids[grammar.start_symbol.char], table, symbols, offsets)
+
+def class_columns(grammar):
+    """Partitions the characters matched by grammar's terminals into equivalence classes. Returns the ClassMap
+    and a map of terminal char (and END_SYMBOL) -> the terminal ids of the classes it spans, in order.
+    """
+    for sym in grammar.terminals:
+        if type(sym) is not CSym and len(sym.char) != 1:
+            raise ValueError("Character classes can't be mixed with multi-character terminals: {!r}".format(sym.char))
+
+    charsets = [charset.parse_set(sym.char) if type(sym) is CSym else charset.from_chars(sym.char)
+                for sym in grammar.terminals]
+    (class_map, members) = charset.partition(charsets)
+    for sym, classes in zip(grammar.terminals, members):
+        if len(classes) == 0:
+            raise ValueError("Character class matches no characters: {!r}".format(sym.char))
+
+    columns = {sym.char: sorted(k + 1 for k in classes) for sym, classes in zip(grammar.terminals, members)}
+    columns[END_SYMBOL] = [END_TERMINAL]
+
+    return (class_map, columns)
+
+def _compile_with_classes(grammar, parse_table):
+    """compile_parse_table for grammars with character class terminals. Each cell of parse_table is spread over
+    every class its terminal spans, and a ValueError is raised if overlapping terminals give a nonterminal two
+    productions for the same class. Productions of lowered terminals follow those of grammar.rules.
+    """
+    (class_map, columns) = class_columns(grammar)
+
+    # Classes are labelled by the single char terminal they match, if any, or else the first class that spans them
+    terminals = [None, END_SYMBOL] + [None] * (class_map.n_classes - 1)
+    for sym in sorted(grammar.terminals, key=lambda sym: type(sym) is CSym):
+        for a in columns[sym.char]:
+            if terminals[a] is None:
+                terminals[a] = sym.char
+
+    n_terminals = len(terminals)
+    nonterminals = [grammar.start_symbol.char]
+    nonterminals.extend(sym.char for sym in grammar.nonterminals if sym.char != grammar.start_symbol.char)
+    lowered = [sym.char for sym in grammar.terminals if len(columns[sym.char]) > 1]
+
+    ids = {c: a[0] for c, a in columns.items() if len(a) == 1}
+    ids.update({c: n_terminals + j for j, c in enumerate(nonterminals + lowered)})
+
+    symbols = array('i')
+    offsets = array('i', [0])
+    production_ids = {}
+    for i, rule in enumerate(grammar.rules):
+        exp_chars = tuple(sym.char for sym in rule.exp_syms)
+        production_ids.setdefault((rule.sym.char, exp_chars), i)
+
+        symbols.extend(ids[c] for c in reversed(exp_chars) if c != EPSILON_CHAR)
+        offsets.append(len(symbols))
+
+    table = array('i', [-1]) * ((len(nonterminals) + len(lowered)) * n_terminals)
+    for (nonterm, term), exp_chars in parse_table.items():
+        p = production_ids[(nonterm, tuple(exp_chars))]
+        row = (ids[nonterm] - n_terminals) * n_terminals
+
+        for a in columns[term]:
+            if table[row + a] >= 0 and table[row + a] != p:
+                raise ValueError("Received non LL(1) grammar! Overlapping terminals give {} two productions on {}"
+                                 .format(nonterm, terminals[a]))
+
+            table[row + a] = p
+
+    for c in lowered:
+        row = (ids[c] - n_terminals) * n_terminals
+        for a in columns[c]:
+            table[row + a] = len(offsets) - 1
+            symbols.append(a)
+            offsets.append(len(symbols))
+
+    return CompiledTable(terminals, nonterminals + lowered, ids[grammar.start_symbol.char], table, symbols, offsets,
+                         class_map, len(lowered))
+
+class PredictionChains:
+    def __init__(self, table, symbols, offsets, consumes):
+        # table[cell] is the chain id for a cell of the parse table, or -1 for a miss
+        self.table = table
+
+        # chain k replaces the predicted nonterminal with symbols[offsets[k]:offsets[k + 1]], in stack order
+        self.symbols = symbols
+        self.offsets = offsets
+
+        # consumes[k] is set if chain k ends by matching the lookahead, which isn't pushed
+        self.consumes = consumes
+
+# Most predicts a chain makes. Chains that would need more stop there, and the driver predicts on from whatever
+# nonterminal they leave on top, so building chains stays linear in the size of the table.
+MAX_CHAIN_STEPS = 16
+
+# Marks for cells whose chains haven't been built yet, and are being built, in build_prediction_chains
+_EXPAND = -2
+_EXPANDING = -3
+
+def build_prediction_chains(table):
+    """Expands every cell of table into a PredictionChains chain. Expansion stops when the lookahead is matched,
+    when the expanded symbols run out (the rest of the prediction depends on what's below on the stack), when
+    a terminal or missing cell is reached, which the driver then handles as it would have anyway, or before
+    making more than MAX_CHAIN_STEPS predicts.
+    """
+    n_terminals = table.n_terminals
+
+    table_symbols = table.symbols
+    table_offsets = table.offsets
+
+    symbols = array('i')
+    offsets = array('i', [0])
+    consumes = array('b')
+    chain_ids = {}
+
+    # Productions that can't be expanded (empty, or starting with a terminal) are their own chains, whatever the
+    # cell. A production starting with a terminal is only ever predicted on that terminal, which it consumes.
+    production_chains = array('i', [_EXPAND]) * (len(table_offsets) - 1)
+    for p in range(len(production_chains)):
+        start = table_offsets[p]
+        end = table_offsets[p + 1]
+        if start == end or table_symbols[end - 1] < n_terminals:
+            production_chains[p] = _add_chain(chain_ids, symbols, offsets, consumes,
+                                              table_symbols[start:max(start, end - 1)], start < end)
+
+    cells = array('i', [-1 if p < 0 else production_chains[p] for p in table.table])
+
+    # Number of predicts made by the chain of each expanded cell
+    steps = {}
+
+    # The chain of (X, a) is X's production with the nonterminal Y on top of it replaced by the chain of (Y, a), and
+    # so on while that leaves a nonterminal on top without matching a. Each remaining cell is expanded once, after the
+    # cells it builds on
+    cell = 0
+    while True:
+        try:
+            cell = cells.index(_EXPAND, cell)
+        except ValueError:
+            break
+
+        pending = [cell]
+        while len(pending) > 0:
+            c = pending[-1]
+            a = c % n_terminals
+            q = table.table[c]
+            cells[c] = _EXPANDING
+
+            stack = list(table_symbols[table_offsets[q]:table_offsets[q + 1]])
+            consumed = False
+            n_steps = 1
+            sub = None
+            while len(stack) > 0 and stack[-1] >= n_terminals:
+                sub = (stack[-1] - n_terminals) * n_terminals + a
+                k = cells[sub]
+                # a cell that's still expanding is only reached by a left recursive grammar, which isn't expanded
+                if k < 0 or n_steps + steps.get(sub, 1) > MAX_CHAIN_STEPS:
+                    break
+
+                stack.pop()
+                stack.extend(symbols[offsets[k]:offsets[k + 1]])
+                n_steps += steps.get(sub, 1)
+                if consumes[k]:
+                    consumed = True
+                    break
+
+            if sub is not None and cells[sub] == _EXPAND:
+                pending.append(sub)
+                continue
+
+            pending.pop()
+            cells[c] = _add_chain(chain_ids, symbols, offsets, consumes, stack, consumed)
+            steps[c] = n_steps
+
+    return PredictionChains(cells, symbols, offsets, consumes)
+
+def _add_chain(chain_ids, symbols, offsets, consumes, stack, consumed):
+    """Returns the id of the chain pushing stack, adding it if there isn't one yet.
+    """
+    key = (tuple(stack), bool(consumed))
+    if key not in chain_ids:
+        chain_ids[key] = len(consumes)
+        symbols.extend(stack)
+        offsets.append(len(symbols))
+        consumes.append(consumed)
+
+    return chain_ids[key]
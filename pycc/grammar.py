@@ -1,9 +1,62 @@
-from collections import namedtuple
+"""Module for the grammar data model.
+
+Grammars, rules and symbols are immutable: setting or deleting their attributes raises AttributeError, and a
+grammar's indexes are read-only mappings of tuples. Symbols are interned, so there is only ever one NSym (or TSym,
+or CSym) with a given char and symbols compare by identity. Rules keep their expression as a tuple, and rules and
+grammars cache their hashes, so either can be used as a dict key, e.g. to memoize work done on a grammar.
+"""
+
+from types import MappingProxyType
+from pycc.constants import EPSILON_CHAR
+
+# Sets an attribute of an immutable object while it's being constructed
+_set = object.__setattr__
+
+def _immutable(self, *args):
+    raise AttributeError("{} is immutable".format(type(self).__name__))
 
 class Grammar:
+    """A context free grammar. Indexes over the rules are built once at construction; to change a grammar,
+    build a new Grammar instead.
+    """
     def __init__(self, rules, start_symbol):
-        self.rules = rules
-        self.start_symbol = start_symbol
+        rules = tuple(rules)
+        _set(self, 'rules', rules)
+        _set(self, 'start_symbol', start_symbol)
+        _set(self, '_hash', None)
+
+        # Map of nonterminal char -> rules with that nonterminal on the left-hand side, in rule order
+        rules_by_symbol = {}
+
+        # Map of nonterminal char -> [(rule index, position in exp_syms), ...] for each right-hand side use
+        occurrences = {}
+
+        nonterminals = {}
+        terminals = {}
+        for rule in rules:
+            rules_by_symbol.setdefault(rule.sym.char, []).append(rule)
+            nonterminals.setdefault(rule.sym.char, rule.sym)
+
+        for i, rule in enumerate(rules):
+            for j, sym in enumerate(rule.exp_syms):
+                if type(sym) is NSym:
+                    occurrences.setdefault(sym.char, []).append((i, j))
+                    nonterminals.setdefault(sym.char, sym)
+                elif sym.char != EPSILON_CHAR:
+                    terminals.setdefault(sym.char, sym)
+
+        _set(self, 'rules_by_symbol', MappingProxyType({X: tuple(xs) for X, xs in rules_by_symbol.items()}))
+        _set(self, 'occurrences', MappingProxyType({X: tuple(xs) for X, xs in occurrences.items()}))
+
+        # Nonterminals in order of first appearance on a left-hand side, followed by any that only appear on
+        # right-hand sides
+        _set(self, 'nonterminals', tuple(nonterminals.values()))
+
+        # Terminals in order of first appearance, excluding epsilon
+        _set(self, 'terminals', tuple(terminals.values()))
+
+    def rules_for(self, symbol):
+        return self.rules_by_symbol.get(symbol.char, ())
 
     def stringify_rules(self):
         rule_str = ""
@@ -21,13 +74,97 @@ class Grammar:
         return start_sym_str + "\n" + rules_str
 
     def __eq__(self, other):
-        return self.start_symbol == other.start_symbol and self.rules == other.rules
+        return (self is other or
+                (type(other) is Grammar and self.start_symbol is other.start_symbol and self.rules == other.rules))
+
+    def __hash__(self):
+        if self._hash is None:
+            _set(self, '_hash', hash((self.start_symbol, self.rules)))
+
+        return self._hash
+
+    def __reduce__(self):
+        # hashes depend on the process's hash seed, so they're recomputed rather than pickled
+        return (Grammar, (self.rules, self.start_symbol))
+
+    __setattr__ = _immutable
+    __delattr__ = _immutable
+
+class Rule:
+    """A rule sym -> exp_syms. exp_syms may be given as any iterable of symbols, and is stored as a tuple.
+    action is an optional callable that LLParser.evaluate calls with the values of exp_syms once the rule has
+    been fully matched; its result becomes the value of sym.
+    """
+    __slots__ = ('sym', 'exp_syms', 'action', '_hash')
+
+    def __init__(self, sym, exp_syms, action = None):
+        exp_syms = tuple(exp_syms)
+        _set(self, 'sym', sym)
+        _set(self, 'exp_syms', exp_syms)
+        _set(self, 'action', action)
+        _set(self, '_hash', hash((sym, exp_syms, action)))
+
+    def _replace(self, **fields):
+        return Rule(fields.get('sym', self.sym), fields.get('exp_syms', self.exp_syms),
+                    fields.get('action', self.action))
+
+    def __eq__(self, other):
+        return (self is other or
+                (type(other) is Rule and self._hash == other._hash and self.sym is other.sym and
+                 self.exp_syms == other.exp_syms and self.action == other.action))
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (Rule, (self.sym, self.exp_syms, self.action))
+
+    __setattr__ = _immutable
+    __delattr__ = _immutable
 
-# Expression symbol is a list of symbols
-Rule = namedtuple('Rule', 'sym exp_syms')
+    def __repr__(self):
+        return 'Rule(sym={!r}, exp_syms={!r}, action={!r})'.format(self.sym, self.exp_syms, self.action)
+
+class _Symbol:
+    """Base class of the symbol types. Constructing a symbol returns the existing instance with the same type and
+    char, if there is one; instances are kept for the life of the process.
+    """
+    __slots__ = ('char', '_hash')
+
+    def __new__(cls, char):
+        sym = cls._interned.get(char)
+        if sym is None:
+            sym = object.__new__(cls)
+            _set(sym, 'char', char)
+            _set(sym, '_hash', hash((cls.__name__, char)))
+            cls._interned[char] = sym
+
+        return sym
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (type(self), (self.char,))
+
+    __setattr__ = _immutable
+    __delattr__ = _immutable
+
+    def __repr__(self):
+        return '{}(char={!r})'.format(type(self).__name__, self.char)
 
 # Terminal symbol
-TSym = namedtuple('TSym', 'char')
+class TSym(_Symbol):
+    __slots__ = ()
+    _interned = {}
+
+# Character class terminal, matching any one character of a class. char is the class's pattern: a bracketed
+# class such as '[0-9]' or '[^"]', or a class escape such as '\\d' (see pycc.charset.parse_set)
+class CSym(_Symbol):
+    __slots__ = ()
+    _interned = {}
 
 # Nonterminal symbol
-NSym = namedtuple('NSym', 'char')
+class NSym(_Symbol):
+    __slots__ = ()
+    _interned = {}
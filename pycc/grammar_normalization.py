@@ -3,34 +3,43 @@
 Currently, this module does:
 - left recursion removal
 - left factoring
+
+Both passes rewrite the rules of each nonterminal independently of the rest of the grammar. NormalizationPipeline
+uses this to memoize them per nonterminal, so normalizing many grammars that share most of their rules only
+rewrites the rules that differ.
 """
 
-from collections import defaultdict
 from pycc.grammar import Grammar, Rule, NSym, TSym
 from pycc.constants import EPSILON_CHAR, END_SYMBOL
 
 def _is_left_recursive(rule):
-    return rule.sym == rule.exp_syms[0]
+    return rule.sym is rule.exp_syms[0]
 
 def nonterminal_generator(rules):
     """Generator that continuously provides new nonterminal symbols to be used in rules. Avoids collision with
     the rule set specified.
 
-    Currently just iterates from the last ord used in specified rule nonterminals.
+    Currently just iterates from the last ord used in specified rule nonterminals, skipping any char used by a
+    symbol of the rules (including nonterminals without rules of their own, and terminals).
     """
     used = [ord(rule.sym.char) for rule in rules]
     used.sort()
     i = used[-1]
 
+    chars = set(rule.sym.char for rule in rules)
+    for rule in rules:
+        chars.update(sym.char for sym in rule.exp_syms)
+
     while True:
         i += 1
-        yield chr(i)
+        if chr(i) not in chars:
+            yield chr(i)
 
 def _lrr_split_symbol_rules(symbol_rules, nonterminal_gen):
     """Given all the rules for a given symbol, creates a new set of rules by eliminating any left recursive
     rules. If no left recursive rules exist, just returns the original rules.
     """
-    symbol_rules = [rule for rule in symbol_rules if rule.exp_syms != [rule.sym]]
+    symbol_rules = [rule for rule in symbol_rules if rule.exp_syms != (rule.sym,)]
 
     if not any([_is_left_recursive(rule) for rule in symbol_rules]):
         return symbol_rules
@@ -42,16 +51,16 @@ def _lrr_split_symbol_rules(symbol_rules, nonterminal_gen):
 
     found_non_recursive_rule = False
     for rule in symbol_rules:
-        if rule.exp_syms[0] == rule.sym:
+        if rule.exp_syms[0] is rule.sym:
             new_rules.append(
                 Rule(new_symbol,
-                     rule.exp_syms[1:] + [new_symbol]))
+                     rule.exp_syms[1:] + (new_symbol,)))
         else:
             found_non_recursive_rule = True
             # NOTE - insert to front to preserve property that start_symbol is identified by first rule
             new_rules.insert(0,
                              Rule(old_symbol,
-                                  rule.exp_syms + [new_symbol]))
+                                  rule.exp_syms + (new_symbol,)))
 
     if found_non_recursive_rule:
         new_rules.append(
@@ -62,16 +71,6 @@ def _lrr_split_symbol_rules(symbol_rules, nonterminal_gen):
 
     return new_rules
 
-def remove_duplicates(seq):
-    """Helper method for removing duplicates while preserving order of first occurrence of each elt
-    """
-    seen = set()
-    seen_add = seen.add
-    return [x for x in seq if not (x in seen or seen_add(x))]
-
-def rules_for_symbol(rules, symbol):
-    return [rule for rule in rules if rule.sym == symbol]
-
 def remove_left_recursion(grammar, nonterminal_gen = None):
     """Returns a new set of rules with all left recursion removed. Optionally takes a generator for new
     symbols, but otherwise generates symbols based on the lexicographically last symbol in the provided rules.
@@ -80,72 +79,67 @@ def remove_left_recursion(grammar, nonterminal_gen = None):
         nonterminal_gen = nonterminal_generator(grammar.rules)
 
     new_rules = []
-    old_nonterminals = remove_duplicates([rule.sym for rule in grammar.rules])
-    for nonterminal in old_nonterminals:
-        new_rules.extend(
-            _lrr_split_symbol_rules(rules_for_symbol(grammar.rules, nonterminal), nonterminal_gen))
+    for symbol_rules in grammar.rules_by_symbol.values():
+        new_rules.extend(_lrr_split_symbol_rules(symbol_rules, nonterminal_gen))
 
     return Grammar(new_rules, grammar.start_symbol)
 
-def longest_common_prefix(exp_syms1, exp_syms2):
-    prefix = []
-    for i in range(min(len(exp_syms1), len(exp_syms2))):
-        if exp_syms1[i] != exp_syms2[i]:
-            break
+class _TrieNode:
+    __slots__ = ('children', 'rule')
+
+    def __init__(self):
+        # Map of symbol -> child node
+        self.children = {}
 
-        prefix.append(exp_syms1[i])
+        # The original rule whose alternative ends at this node, if any
+        self.rule = None
+
+def _build_trie(symbol_rules):
+    root = _TrieNode()
+    for rule in symbol_rules:
+        node = root
+        for sym in rule.exp_syms:
+            if type(sym) is TSym and sym.char == EPSILON_CHAR:
+                continue
 
-    return tuple(prefix)
+            if sym not in node.children:
+                node.children[sym] = _TrieNode()
+
+            node = node.children[sym]
+
+        if node.rule is None:
+            node.rule = rule
+
+    return root
 
 def _lf_split_symbol_rules(symbol_rules, nonterminal_gen):
-    symbol = symbol_rules[0].sym
+    """Fully left factors the rules for a single symbol by building a prefix trie of their alternatives. Each
+    trie node below the root that branches (or where one alternative ends and others continue) gets a fresh
+    nonterminal, and unbranching chains are collapsed into a single rule. This is linear in the total length of
+    the alternatives and introduces the minimal number of fresh nonterminals.
 
-    prefix_map = defaultdict(set)
-    reverse_prefix_map = defaultdict(set)
-    factored_rule_indices = set()
-    for i in range(len(symbol_rules)):
-        for j in range(i + 1, len(symbol_rules)):
-            prefix = longest_common_prefix(symbol_rules[i].exp_syms,
-                                           symbol_rules[j].exp_syms)
-
-            if len(prefix) > 0:
-                prefix_map[prefix] |= set([i,j])
-                reverse_prefix_map[i].add(prefix)
-                reverse_prefix_map[j].add(prefix)
-                factored_rule_indices |= set([i,j])
-
-    # For rules with multiple shared prefixes, pick the largest one and remove all others
-    for i, prefixes in reverse_prefix_map.items():
-        if len(prefixes) > 1:
-            longest_prefix = max(prefixes, key=len)
-            for prefix in prefixes:
-                if prefix != longest_prefix:
-                    prefix_map[prefix].discard(i)
-
-    # Remove all prefixes with only 1 item
-    updated_prefix_map = {}
-    for prefix, indices in prefix_map.items():
-        if len(indices) > 1:
-            updated_prefix_map[prefix] = indices
-        else:
-            factored_rule_indices -= indices
+    Rules that don't share a prefix with any other are returned unchanged.
+    """
+    symbol = symbol_rules[0].sym
 
     new_rules = []
-    for prefix_tuple, indices in updated_prefix_map.items():
-        new_sym = NSym(next(nonterminal_gen))
-
-        prefix = list(prefix_tuple)
-        new_rules.append(Rule(symbol, prefix + [new_sym]))
-        for i in indices:
-            original_exp = symbol_rules[i].exp_syms
-            new_exp = original_exp[len(prefix):]
-            if len(new_exp) is 0:
-                new_exp = [TSym(EPSILON_CHAR)]
-            new_rules.append(Rule(new_sym, new_exp))
-
-    for i in range(len(symbol_rules)):
-        if i not in factored_rule_indices:
-            new_rules.append(symbol_rules[i])
+    pending = [(symbol, _build_trie(symbol_rules))]
+    for lhs, node in pending:
+        if node.rule is not None:
+            new_rules.append(node.rule if lhs is symbol else Rule(lhs, [TSym(EPSILON_CHAR)]))
+
+        for child_sym, child in node.children.items():
+            prefix = [child_sym]
+            while child.rule is None and len(child.children) == 1:
+                (next_sym, child), = child.children.items()
+                prefix.append(next_sym)
+
+            if len(child.children) == 0:
+                new_rules.append(child.rule if lhs is symbol else Rule(lhs, prefix))
+            else:
+                new_sym = NSym(next(nonterminal_gen))
+                new_rules.append(Rule(lhs, prefix + [new_sym]))
+                pending.append((new_sym, child))
 
     return new_rules
 
@@ -157,9 +151,103 @@ def left_factor(grammar, nonterminal_gen = None):
         nonterminal_gen = nonterminal_generator(grammar.rules)
 
     new_rules = []
-    old_nonterminals = remove_duplicates([rule.sym for rule in grammar.rules])
-    for nonterminal in old_nonterminals:
-        new_rules.extend(
-            _lf_split_symbol_rules(rules_for_symbol(grammar.rules, nonterminal), nonterminal_gen))
+    for symbol_rules in grammar.rules_by_symbol.values():
+        new_rules.extend(_lf_split_symbol_rules(symbol_rules, nonterminal_gen))
 
     return Grammar(new_rules, grammar.start_symbol)
+
+# Passes run by NormalizationPipeline, in order, as (name, tag, function splitting the rules of one symbol). Tags
+# are used in the names of the fresh nonterminals each pass introduces.
+_PASSES = [
+    ('remove_left_recursion', 'R', _lrr_split_symbol_rules),
+    ('left_factor', 'F', _lf_split_symbol_rules),
+]
+
+def fresh_names(symbol, tag, avoid = ()):
+    """Generator of fresh nonterminal chars derived from symbol's char, e.g. E~F1, E~F2 for tag F, skipping any
+    in avoid. Unlike nonterminal_generator, the names only depend on the symbol being rewritten.
+    """
+    i = 0
+    while True:
+        i += 1
+        char = '{}~{}{}'.format(symbol.char, tag, i)
+        if char not in avoid:
+            yield char
+
+class NormalizationPipeline:
+    """Normalizes grammars like left_factor(remove_left_recursion(grammar)), but memoizes each pass's output
+    for each nonterminal's rules, and names fresh nonterminals with fresh_names. A nonterminal whose rules were
+    seen before (in any grammar run through the same pipeline) reuses its earlier output, fresh symbols included.
+    Whole grammars are memoized as well.
+
+    hits and misses count the nonterminals whose output was reused and computed.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._memos = {name: {} for name, _, _ in _PASSES}
+        self._grammars = {}
+
+    def normalize(self, grammar):
+        memoized = self._grammars.get(grammar)
+        if memoized is not None:
+            (source, normalized) = memoized
+            if source is grammar:
+                return normalized
+
+            return Grammar(_current_rules(grammar.rules, normalized.rules), normalized.start_symbol)
+
+        chars = set(sym.char for sym in grammar.nonterminals) | set(sym.char for sym in grammar.terminals)
+
+        # every pass rewrites each nonterminal's rules on their own, so each nonterminal is run through all of
+        # them in turn, and the grammar's indexes are only built once, at the end
+        new_rules = []
+        for symbol_rules in grammar.rules_by_symbol.values():
+            rules = symbol_rules
+            for name, tag, split in _PASSES:
+                rules_by_symbol = {}
+                for rule in rules:
+                    rules_by_symbol.setdefault(rule.sym, []).append(rule)
+
+                rules = []
+                for split_rules in rules_by_symbol.values():
+                    rules.extend(self._split(split_rules, self._memos[name], tag, split, chars))
+
+            new_rules.extend(rules)
+
+        normalized = Grammar(new_rules, grammar.start_symbol)
+        self._grammars[grammar] = (grammar, normalized)
+        return normalized
+
+    def _split(self, symbol_rules, memo, tag, split, chars):
+        """Runs one pass over the rules of a single symbol, adding any fresh nonterminals to chars.
+        """
+        key = tuple(symbol_rules)
+        symbol = symbol_rules[0].sym
+
+        output = memo.get(key)
+        if output is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            output = tuple(split(symbol_rules, fresh_names(symbol, tag)))
+            memo[key] = output
+
+        if any(rule.sym is not symbol and rule.sym.char in chars for rule in output):
+            # a fresh name is taken in this grammar, so this output can't be shared
+            output = split(symbol_rules, fresh_names(symbol, tag, chars))
+        else:
+            output = _current_rules(symbol_rules, output)
+
+        for rule in output:
+            if rule.sym is not symbol:
+                chars.add(rule.sym.char)
+
+        return output
+
+def _current_rules(rules, output):
+    """Replaces the rules of a memoized output that are equal to one of rules with that rule, so rules kept as
+    they are by normalization are the rules of the grammar being normalized, not equal ones from an earlier one.
+    """
+    current = {rule: rule for rule in rules}
+    return [current.get(rule, rule) for rule in output]
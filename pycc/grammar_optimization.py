@@ -0,0 +1,289 @@
+"""Module for shrinking a normalized grammar before its parse table is built.
+
+Normalization leaves behind unit productions, single-rule helper nonterminals and, sometimes, symbols that can
+never take part in a derivation. Each of these costs a table row and a predict step per use at parse time. This
+module does:
+- useless symbol removal: rules using unproductive nonterminals, and rules for unreachable ones, are dropped
+- inlining: a nonterminal with a single rule is replaced by its expression everywhere; a unit rule A -> B, or a
+  rule A -> B... that is B's only use, is replaced by one rule per alternative of B
+- merging: nonterminals with the same rules (up to merged names) are replaced by a single representative
+
+Each transformation keeps the language the same, and only applies where it can't introduce an LL(1) conflict:
+inlined alternatives are only ever spliced in at the start of a rule, where their lookaheads are a subset of
+what the replaced rule already predicted on, and nullable nonterminals (whose predictions depend on their
+FOLLOW sets) are never merged.
+
+Grammars with semantic actions are returned unchanged, since inlining would change the values actions receive.
+"""
+
+from pycc.grammar import Grammar, Rule, NSym, TSym, CSym
+from pycc.constants import EPSILON_CHAR
+from pycc.compiled_table import compile_parse_table, END_TERMINAL
+from pycc.parse_table import build_parse_table, build_first_sets
+
+class OptimizationReport:
+    """Compares the size of a grammar's parse table before and after optimization. If samples (strings in the
+    grammar's language) are given, the total number of predict steps needed to parse them is compared as well.
+    """
+    def __init__(self, before, after, samples = None):
+        table_before = build_parse_table(before)
+        table_after = build_parse_table(after)
+
+        self.nonterminals_before = len(before.rules_by_symbol)
+        self.nonterminals_after = len(after.rules_by_symbol)
+        self.rules_before = len(before.rules)
+        self.rules_after = len(after.rules)
+        self.table_entries_before = len(table_before)
+        self.table_entries_after = len(table_after)
+
+        self.predicts_before = None
+        self.predicts_after = None
+        if samples is not None:
+            samples = list(samples)
+            self.predicts_before = _count_predicts(compile_parse_table(before, table_before), samples)
+            self.predicts_after = _count_predicts(compile_parse_table(after, table_after), samples)
+
+    def __str__(self):
+        lines = [
+            "nonterminals: {} -> {}".format(self.nonterminals_before, self.nonterminals_after),
+            "rules: {} -> {}".format(self.rules_before, self.rules_after),
+            "table entries: {} -> {}".format(self.table_entries_before, self.table_entries_after),
+        ]
+        if self.predicts_before is not None:
+            lines.append("predicts: {} -> {}".format(self.predicts_before, self.predicts_after))
+
+        return "\n".join(lines)
+
+def optimize(grammar):
+    """Runs every optimization pass over grammar until none of them changes it.
+    """
+    if any(rule.action is not None for rule in grammar.rules):
+        return grammar
+
+    while True:
+        optimized = merge_equivalent_nonterminals(inline_nonterminals(remove_useless_symbols(grammar)))
+        if optimized.rules == grammar.rules:
+            return optimized
+
+        grammar = optimized
+
+def remove_useless_symbols(grammar):
+    """Drops rules that use unproductive nonterminals (ones that derive no terminal string), then rules for
+    nonterminals that can't be reached from the start symbol.
+    """
+    productive = set()
+    changed = True
+    while changed:
+        changed = False
+        for rule in grammar.rules:
+            if rule.sym.char not in productive and all(_is_productive(sym, productive) for sym in rule.exp_syms):
+                productive.add(rule.sym.char)
+                changed = True
+
+    rules = [rule for rule in grammar.rules
+             if rule.sym.char in productive and all(_is_productive(sym, productive) for sym in rule.exp_syms)]
+
+    reachable = set([grammar.start_symbol.char])
+    pending = [grammar.start_symbol.char]
+    by_symbol = Grammar(rules, grammar.start_symbol).rules_by_symbol
+    while len(pending) > 0:
+        for rule in by_symbol.get(pending.pop(), []):
+            for sym in rule.exp_syms:
+                if type(sym) is NSym and sym.char not in reachable:
+                    reachable.add(sym.char)
+                    pending.append(sym.char)
+
+    return Grammar([rule for rule in rules if rule.sym.char in reachable], grammar.start_symbol)
+
+def _is_productive(sym, productive):
+    return type(sym) is not NSym or sym.char in productive
+
+def inline_nonterminals(grammar):
+    """Inlines nonterminals with a single rule everywhere they're used, and splices the alternatives of B into
+    any unit rule A -> B or rule A -> B... that is B's only use. Nonterminals that no longer have any uses are
+    dropped.
+    """
+    index = _RuleIndex(grammar.rules)
+    start = grammar.start_symbol
+
+    for nonterm in list(grammar.rules_by_symbol):
+        symbol_rules = index.rules_for(nonterm)
+        uses = index.occurrences.get(nonterm, {})
+
+        if nonterm == start.char or len(symbol_rules) == 0 or len(uses) == 0:
+            continue
+        if any(sym.char == nonterm and type(sym) is NSym for rule in symbol_rules for sym in rule.exp_syms):
+            continue
+
+        if len(symbol_rules) == 1:
+            expansion = _expression(symbol_rules[0])
+            for key in set(key for (key, j) in uses):
+                index.replace(key, [_replace_uses(index.rules[key], nonterm, expansion)])
+            index.remove_rules_for(nonterm)
+            continue
+
+        # alternatives can only be spliced in at the front of a rule
+        spliced = set(key for (key, j) in uses
+                      if j == 0 and (len(uses) == 1 or len(index.rules[key].exp_syms) == 1))
+        if len(spliced) == 0:
+            continue
+
+        all_spliced = len(spliced) == len(uses)
+        for key in spliced:
+            rule = index.rules[key]
+            index.replace(key, [Rule(rule.sym, _with_epsilon(_expression(alternative) + list(rule.exp_syms[1:])))
+                                for alternative in symbol_rules])
+
+        if all_spliced:
+            index.remove_rules_for(nonterm)
+
+    return Grammar(index.ordered_rules(), start)
+
+class _RuleIndex:
+    """The rules of a grammar being inlined, with the rules and uses of each nonterminal kept up to date as rules
+    are replaced, so that each inline doesn't rebuild the grammar. Rules are keyed by position: the rules replacing
+    the rule at key k get keys k + (0,), k + (1,), ..., which sort where it was.
+    """
+
+    def __init__(self, rules):
+        self.rules = {}
+
+        # Map of nonterminal char -> set of keys of its rules
+        self.keys_by_symbol = {}
+
+        # Map of nonterminal char -> {(rule key, position in exp_syms), ...} for each right-hand side use
+        self.occurrences = {}
+
+        for i, rule in enumerate(rules):
+            self._add((i,), rule)
+
+    def rules_for(self, nonterm):
+        return [self.rules[key] for key in sorted(self.keys_by_symbol.get(nonterm, ()))]
+
+    def ordered_rules(self):
+        return [self.rules[key] for key in sorted(self.rules)]
+
+    def replace(self, key, rules):
+        self._remove(key)
+        for m, rule in enumerate(rules):
+            self._add(key + (m,), rule)
+
+    def remove_rules_for(self, nonterm):
+        for key in list(self.keys_by_symbol.get(nonterm, ())):
+            self._remove(key)
+
+    def _add(self, key, rule):
+        self.rules[key] = rule
+        self.keys_by_symbol.setdefault(rule.sym.char, set()).add(key)
+        for j, sym in enumerate(rule.exp_syms):
+            if type(sym) is NSym:
+                self.occurrences.setdefault(sym.char, set()).add((key, j))
+
+    def _remove(self, key):
+        rule = self.rules.pop(key)
+        self.keys_by_symbol[rule.sym.char].discard(key)
+        for j, sym in enumerate(rule.exp_syms):
+            if type(sym) is NSym:
+                self.occurrences[sym.char].discard((key, j))
+
+def _expression(rule):
+    return [sym for sym in rule.exp_syms if sym.char != EPSILON_CHAR or type(sym) is NSym]
+
+def _with_epsilon(exp_syms):
+    return exp_syms if len(exp_syms) > 0 else [TSym(EPSILON_CHAR)]
+
+def _replace_uses(rule, nonterm, expansion):
+    if not any(type(sym) is NSym and sym.char == nonterm for sym in rule.exp_syms):
+        return rule
+
+    exp_syms = []
+    for sym in _expression(rule):
+        if type(sym) is NSym and sym.char == nonterm:
+            exp_syms.extend(expansion)
+        else:
+            exp_syms.append(sym)
+
+    return Rule(rule.sym, _with_epsilon(exp_syms))
+
+def merge_equivalent_nonterminals(grammar):
+    """Merges non-nullable nonterminals whose rules are identical once merged nonterminals are identified with
+    each other. Equivalence classes are found by partition refinement, as in DFA minimization.
+    """
+    first_sets = build_first_sets(grammar)
+    nonterminals = [nonterm for nonterm in grammar.rules_by_symbol if EPSILON_CHAR not in first_sets[nonterm]]
+    candidates = set(nonterminals)
+
+    classes = {nonterm: 0 for nonterm in nonterminals}
+    n_classes = 1
+    while True:
+        signatures = {}
+        new_classes = {}
+        for nonterm in nonterminals:
+            signature = (classes[nonterm], tuple(sorted(
+                tuple(_symbol_key(sym, classes, candidates) for sym in rule.exp_syms)
+                for rule in grammar.rules_by_symbol[nonterm])))
+            new_classes[nonterm] = signatures.setdefault(signature, len(signatures))
+
+        classes = new_classes
+        if len(signatures) == n_classes:
+            break
+        n_classes = len(signatures)
+
+    # The first nonterminal of each class represents it (the start symbol always represents its own class)
+    representatives = {}
+    for nonterm in [grammar.start_symbol.char] + nonterminals:
+        if nonterm in classes:
+            representatives.setdefault(classes[nonterm], nonterm)
+
+    renames = {nonterm: representatives[classes[nonterm]] for nonterm in nonterminals
+               if representatives[classes[nonterm]] != nonterm}
+    if len(renames) == 0:
+        return grammar
+
+    rules = []
+    seen = set()
+    for rule in grammar.rules:
+        if rule.sym.char in renames:
+            continue
+
+        if any(type(sym) is NSym and sym.char in renames for sym in rule.exp_syms):
+            rule = Rule(rule.sym, [NSym(renames[sym.char]) if type(sym) is NSym and sym.char in renames else sym
+                                   for sym in rule.exp_syms])
+
+        key = (rule.sym.char, tuple(_symbol_key(sym, {}, set()) for sym in rule.exp_syms))
+        if key not in seen:
+            seen.add(key)
+            rules.append(rule)
+
+    return Grammar(rules, grammar.start_symbol)
+
+def _symbol_key(sym, classes, candidates):
+    if type(sym) is CSym:
+        return ('S', sym.char)
+    if type(sym) is not NSym:
+        return ('T', sym.char)
+    if sym.char in candidates:
+        return ('C', classes[sym.char])
+
+    return ('N', sym.char)
+
+def _count_predicts(table, samples):
+    n_terminals = table.n_terminals
+    predicts = 0
+    for s in samples:
+        parse_stack = [END_TERMINAL, table.start]
+        for a in list(table.encode(s)) + [END_TERMINAL]:
+            top = parse_stack.pop()
+            while top >= n_terminals:
+                p = table.lookup(top, a)
+                if p < 0:
+                    break
+
+                predicts += 1
+                parse_stack.extend(table.symbols[table.offsets[p]:table.offsets[p + 1]])
+                top = parse_stack.pop()
+
+            if top != a:
+                break
+
+    return predicts
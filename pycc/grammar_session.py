@@ -0,0 +1,211 @@
+"""Module for analyzing a grammar that's built or edited one rule at a time.
+
+A GrammarSession keeps a grammar's FIRST sets, FOLLOW sets and parse table up to date as rules are added and
+removed, redoing only the part of the analysis that a change can affect:
+- FIRST sets are recomputed for the changed nonterminal and the nonterminals whose FIRST sets can include it,
+  found through a reverse index of the nonterminals each rule starts with
+- FOLLOW sets are recomputed for the nonterminals next to a changed symbol in some rule, and those that their
+  FOLLOW sets flow into
+- parse table rows are rebuilt only for nonterminals whose rules, FIRST or FOLLOW sets were recomputed
+
+Both recomputations run the same bitset fixpoint as a full build (see pycc.parse_table.solve_first_sets and
+solve_follow_sets), restricted to the affected nonterminals' strongly connected components, with every other set
+held constant. Rather than raising on LL(1) conflicts, the session records them in conflicts, so a grammar can
+pass through conflicting states while it's being edited.
+
+The session analyzes rules as given: a grammar that needs left factoring or left recursion removal will show
+up as conflicts.
+"""
+
+from collections import Counter
+from pycc.compiled_table import compile_parse_table
+from pycc.constants import EPSILON_CHAR
+from pycc.grammar import Grammar, NSym
+from pycc.parse_table import (build_first_sets, build_follow_sets, solve_first_sets, solve_follow_sets,
+                              _get_next_terminals)
+
+class GrammarSession:
+    def __init__(self, grammar):
+        self.start_symbol = grammar.start_symbol
+        self.rules = list(grammar.rules)
+        self.rules_by_symbol = {}
+
+        # Map of nonterminal X -> Counter of the nonterminals with rules using X, and with rules whose leading run
+        # of nonterminals includes X (so their FIRST sets can depend on X's)
+        self.users = {}
+        self.prefix_users = {}
+
+        for rule in grammar.rules:
+            self._index(rule, 1)
+
+        self.first_sets = build_first_sets(grammar)
+        self.follow_sets = build_follow_sets(grammar, self.first_sets)
+
+        # Map of (nonterminal, terminal) -> expression chars, as in build_parse_table, and of conflicting cells
+        # -> [rules predicted there, ...]. A conflicting cell holds the expression of its first rule.
+        self.parse_table = {}
+        self.conflicts = {}
+        self._row_terms = {}
+        for nonterm in self.rules_by_symbol:
+            self._build_row(nonterm)
+
+    def grammar(self):
+        return Grammar(list(self.rules), self.start_symbol)
+
+    def compile(self):
+        """Returns the CompiledTable for the current rules. Raises ValueError if there are conflicts.
+        """
+        if len(self.conflicts) > 0:
+            (nonterm, term) = next(iter(self.conflicts))
+            raise ValueError("Received non LL(1) grammar! {} -> {} appears more than once in parse table."
+                             .format(nonterm, term))
+
+        return compile_parse_table(self.grammar(), self.parse_table)
+
+    def add_rule(self, rule):
+        self.rules.append(rule)
+        self._index(rule, 1)
+        self._update(rule)
+
+    def remove_rule(self, rule):
+        """Removes the first rule with the same symbols as rule. Raises ValueError if there isn't one.
+        """
+        key = _rule_key(rule)
+        for i, existing in enumerate(self.rules):
+            if _rule_key(existing) == key:
+                del self.rules[i]
+                self._index(existing, -1)
+                self._update(existing)
+                return
+
+        raise ValueError("No such rule: {} -> {}".format(rule.sym.char, [sym.char for sym in rule.exp_syms]))
+
+    def _index(self, rule, count):
+        A = rule.sym.char
+        if count > 0:
+            self.rules_by_symbol.setdefault(A, []).append(rule)
+        else:
+            symbol_rules = self.rules_by_symbol[A]
+            symbol_rules.remove(rule)
+            if len(symbol_rules) == 0:
+                del self.rules_by_symbol[A]
+
+        for X in _nonterminals(rule.exp_syms):
+            _count(self.users, X, A, count)
+        for X in _nonterminals(_prefix(rule.exp_syms)):
+            _count(self.prefix_users, X, A, count)
+
+    def _is_present(self, X):
+        return X in self.rules_by_symbol or X in self.users
+
+    def _update(self, rule):
+        """Brings the analysis up to date after rule has been added or removed.
+        """
+        A = rule.sym.char
+        symbols = set([A]) | set(_nonterminals(rule.exp_syms))
+        for X in symbols:
+            if not self._is_present(X):
+                self.first_sets.pop(X, None)
+                if X != self.start_symbol.char:
+                    self.follow_sets.pop(X, None)
+            else:
+                self.first_sets.setdefault(X, set())
+                self.follow_sets.setdefault(X, set())
+
+        changed_firsts = set()
+        if self._is_present(A):
+            affected = _closure([A], lambda X: self.prefix_users.get(X, ()))
+            changed_firsts = solve_first_sets(self.rules_by_symbol, affected, self.first_sets)
+
+        # FOLLOW sets of the symbols of every rule using a changed FIRST set, and of the changed rule's symbols
+        seeds = set(X for X in _nonterminals(rule.exp_syms) if self._is_present(X) or X == self.start_symbol.char)
+        for f in changed_firsts:
+            for B in self.users.get(f, ()):
+                for user_rule in self.rules_by_symbol[B]:
+                    seeds.update(_nonterminals(user_rule.exp_syms))
+
+        affected = _closure(seeds, self._suffix_nonterminals)
+        changed_follows = solve_follow_sets(self.rules_by_symbol, self.users, self.start_symbol.char, affected,
+                                            self.first_sets, self.follow_sets)
+
+        # a row depends on its own FOLLOW set and the FIRST sets its rules start with
+        rows = symbols | changed_follows
+        for f in changed_firsts:
+            rows.update(self.prefix_users.get(f, ()))
+
+        for nonterm in rows:
+            self._build_row(nonterm)
+
+    def _suffix_nonterminals(self, X):
+        suffix = set()
+        for rule in self.rules_by_symbol.get(X, ()):
+            suffix.update(_nonterminals(_suffix(rule.exp_syms)))
+
+        return suffix
+
+    def _build_row(self, nonterm):
+        for term in self._row_terms.pop(nonterm, ()):
+            del self.parse_table[(nonterm, term)]
+            self.conflicts.pop((nonterm, term), None)
+
+        cells = {}
+        for rule in self.rules_by_symbol.get(nonterm, ()):
+            first_chars = _get_next_terminals(self.first_sets, rule.exp_syms, 0)
+            terms = first_chars - set([EPSILON_CHAR])
+            if EPSILON_CHAR in first_chars:
+                terms |= self.follow_sets[nonterm]
+
+            for term in terms:
+                cells.setdefault(term, []).append(rule)
+
+        for term, rules in cells.items():
+            self.parse_table[(nonterm, term)] = [sym.char for sym in rules[0].exp_syms]
+            if len(rules) > 1:
+                self.conflicts[(nonterm, term)] = rules
+
+        if len(cells) > 0:
+            self._row_terms[nonterm] = list(cells)
+
+def _rule_key(rule):
+    return (rule.sym, rule.exp_syms)
+
+def _nonterminals(syms):
+    return [sym.char for sym in syms if type(sym) is NSym]
+
+def _prefix(exp_syms):
+    """The symbols of exp_syms before its first terminal.
+    """
+    for i, sym in enumerate(exp_syms):
+        if type(sym) is not NSym and sym.char != EPSILON_CHAR:
+            return exp_syms[:i]
+
+    return exp_syms
+
+def _suffix(exp_syms):
+    """The symbols of exp_syms after its last terminal.
+    """
+    for i in range(len(exp_syms) - 1, -1, -1):
+        sym = exp_syms[i]
+        if type(sym) is not NSym and sym.char != EPSILON_CHAR:
+            return exp_syms[i + 1:]
+
+    return exp_syms
+
+def _count(index, X, A, count):
+    counter = index.setdefault(X, Counter())
+    counter[A] += count
+    if counter[A] <= 0:
+        del counter[A]
+        if len(counter) == 0:
+            del index[X]
+
+def _closure(nodes, successors):
+    result = set(nodes)
+    pending = list(nodes)
+    while len(pending) > 0:
+        for succ in successors(pending.pop()):
+            if succ not in result:
+                result.add(succ)
+                pending.append(succ)
+
+    return result
@@ -0,0 +1,82 @@
+"""Graph helpers shared by the grammar analyses.
+"""
+
+def strongly_connected_components(graph):
+    """Iterative implementation of Tarjan's algorithm. graph maps each node to an iterable of its successors;
+    successors that aren't keys of graph are treated as nodes without successors.
+
+    Returns a list of components (each a list of nodes). Every component comes after all components reachable
+    from it, so visiting them in order always sees a node's successors first.
+    """
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+
+    for root in graph:
+        if root in index:
+            continue
+
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+
+        while len(work) > 0:
+            node, successors = work[-1]
+
+            advanced = False
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = lowlink[succ] = len(index)
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(graph.get(succ, ()))))
+                    advanced = True
+                    break
+
+                if succ in on_stack:
+                    lowlink[node] = min(lowlink[node], index[succ])
+
+            if advanced:
+                continue
+
+            work.pop()
+            if len(work) > 0:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+
+                components.append(component)
+
+    return components
+
+def propagate_bits(graph, direct):
+    """Solves the fixpoint value[n] = direct[n] | OR(value[m] for m in graph[n]) over integer bitsets, one
+    strongly connected component at a time. Every member of a component ends up with the same value, so each
+    edge is looked at once and the whole solve is linear in the size of the graph.
+    """
+    values = {}
+    for component in strongly_connected_components(graph):
+        members = set(component)
+
+        value = 0
+        for node in component:
+            value |= direct.get(node, 0)
+            for succ in graph.get(node, ()):
+                if succ not in members:
+                    value |= values.get(succ, direct.get(succ, 0))
+
+        for node in component:
+            values[node] = value
+
+    return values
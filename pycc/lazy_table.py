@@ -0,0 +1,194 @@
+"""Module for compiled parse tables whose rows are built on demand.
+
+A LazyTable starts out with every symbol interned and every production packed, as in compile_parse_table, but
+with no rows: every cell holds UNBUILT. Drivers call resolve() on any lookup that misses, which builds the
+nonterminal's row the first time it's needed. Building a row only computes the FIRST sets of the nonterminals its
+rules can start with and, if one of its rules is nullable, the FOLLOW sets its own FOLLOW set depends on. Every
+set is memoized, so over the life of the table each is computed once, just as in a full build.
+
+Grammars with character class terminals work the same way: each cell is spread over every class its terminal
+spans, as in compile_parse_table, and the rows of lowered classes are built straight away.
+
+A workload that only reaches a small part of a large grammar therefore only pays for that part. Rows can also be
+built ahead of time with warm(), for example from the nonterminals in a ParseStats profile of a previous run.
+"""
+
+from array import array
+from pycc.compiled_table import CompiledTable, class_columns, compile_parse_table
+from pycc.constants import EPSILON_CHAR
+from pycc.grammar import CSym, NSym
+from pycc.parse_table import solve_first_sets, solve_follow_sets, _get_next_terminals
+
+# Value of every cell in a row that hasn't been built yet
+UNBUILT = -2
+
+class LazyTable(CompiledTable):
+    def __init__(self, grammar):
+        compiled = compile_parse_table(grammar, {})
+
+        # Rows of lowered character classes don't depend on any analysis, so they're kept as compiled
+        n_rows = len(compiled.nonterminals) - compiled.n_lowered
+        table = array('i', [UNBUILT]) * (n_rows * compiled.n_terminals)
+        table.extend(compiled.table[n_rows * compiled.n_terminals:])
+        super().__init__(compiled.terminals, compiled.nonterminals, compiled.start, table, compiled.symbols,
+                         compiled.offsets, compiled.class_map, compiled.n_lowered)
+
+        self.grammar = grammar
+        self.complete = n_rows == 0
+        self._n_built = compiled.n_lowered
+
+        # Map of terminal char -> the columns its cells are spread over, for grammars with character classes
+        self._columns = None
+        if any(type(sym) is CSym for sym in grammar.terminals):
+            self._columns = class_columns(grammar)[1]
+
+        self._production_ids = {}
+        for i, rule in enumerate(grammar.rules):
+            self._production_ids.setdefault(_rule_key(rule), i)
+
+        # Map of nonterminal X -> nonterminals with rules using X
+        self.users = {}
+        for X, occurrences in grammar.occurrences.items():
+            self.users[X] = set(grammar.rules[i].sym.char for (i, _) in occurrences)
+
+        self.first_sets = {}
+        self.follow_sets = {}
+
+    def resolve(self, nonterm_id, term_id):
+        cell = (nonterm_id - self.n_terminals) * self.n_terminals + term_id
+        if self.table[cell] == UNBUILT:
+            self.build_row(nonterm_id)
+
+        return self.table[cell]
+
+    def build_row(self, nonterm_id):
+        """Builds the row of nonterm_id, if it hasn't been already. Raises ValueError if the row has an LL(1)
+        conflict.
+        """
+        n_terminals = self.n_terminals
+        row = (nonterm_id - n_terminals) * n_terminals
+        if self.table[row] != UNBUILT:
+            return
+
+        nonterm = self.nonterminals[nonterm_id - n_terminals]
+        self._ensure_first_sets(nonterm)
+
+        cells = array('i', [-1]) * n_terminals
+        for rule in self.grammar.rules_by_symbol.get(nonterm, ()):
+            p = self._production_ids[_rule_key(rule)]
+
+            first_chars = _get_next_terminals(self.first_sets, rule.exp_syms, 0)
+            terms = first_chars - set([EPSILON_CHAR])
+            if EPSILON_CHAR in first_chars:
+                self._ensure_follow_sets(nonterm)
+                terms |= self.follow_sets[nonterm]
+
+            for term in terms:
+                for a in self._columns[term] if self._columns is not None else [self.terminal_ids[term]]:
+                    if cells[a] >= 0 and cells[a] != p:
+                        raise ValueError("Received non LL(1) grammar! {} -> {} appears more than once in parse "
+                                         "table.".format(nonterm, self.terminals[a]))
+
+                    cells[a] = p
+
+        self.table[row:row + n_terminals] = cells
+
+        self._n_built += 1
+        self.complete = self._n_built == len(self.nonterminals)
+
+    def build_all(self):
+        for j in range(len(self.nonterminals)):
+            self.build_row(self.n_terminals + j)
+
+    def warm(self, nonterminals):
+        """Builds the rows of the given nonterminal chars. Chars that aren't nonterminals of the table are ignored,
+        so a profile from a different version of a grammar can still be used.
+        """
+        ids = {c: self.n_terminals + j for j, c in enumerate(self.nonterminals)}
+        for nonterm in nonterminals:
+            if nonterm in ids:
+                self.build_row(ids[nonterm])
+
+    def built_rows(self):
+        """The chars of every nonterminal whose row has been built, usable as a profile for warm().
+        """
+        n_rows = len(self.nonterminals) - self.n_lowered
+        return [c for j, c in enumerate(self.nonterminals[:n_rows]) if self.table[j * self.n_terminals] != UNBUILT]
+
+    def _ensure_first_sets(self, nonterm):
+        if nonterm in self.first_sets:
+            return
+
+        rules_by_symbol = self.grammar.rules_by_symbol
+        affected = set([nonterm])
+        pending = [nonterm]
+        while len(pending) > 0:
+            for rule in rules_by_symbol.get(pending.pop(), ()):
+                for X in _leading_nonterminals(rule.exp_syms):
+                    if X not in affected and X not in self.first_sets:
+                        affected.add(X)
+                        pending.append(X)
+
+        solve_first_sets(rules_by_symbol, affected, self.first_sets)
+
+    def _ensure_follow_sets(self, nonterm):
+        if nonterm in self.follow_sets:
+            return
+
+        # FOLLOW(X) depends on FOLLOW(B) when X is at the end of one of B's rules (after the last terminal)
+        rules_by_symbol = self.grammar.rules_by_symbol
+        affected = set([nonterm])
+        pending = [nonterm]
+        while len(pending) > 0:
+            X = pending.pop()
+            for B in self.users.get(X, ()):
+                if B in affected or B in self.follow_sets:
+                    continue
+
+                if any(X in _trailing_nonterminals(rule.exp_syms) for rule in rules_by_symbol[B]):
+                    affected.add(B)
+                    pending.append(B)
+
+        # the FIRST sets of whatever follows the affected nonterminals are needed
+        for X in affected:
+            for B in self.users.get(X, ()):
+                for rule in rules_by_symbol[B]:
+                    after = False
+                    for sym in rule.exp_syms:
+                        if type(sym) is NSym:
+                            after = after or sym.char in affected
+                            if after:
+                                self._ensure_first_sets(sym.char)
+
+        solve_follow_sets(rules_by_symbol, self.users, self.grammar.start_symbol.char, affected, self.first_sets,
+                          self.follow_sets)
+
+def _rule_key(rule):
+    return (rule.sym.char, tuple(sym.char for sym in rule.exp_syms))
+
+def _leading_nonterminals(exp_syms):
+    """The nonterminals of exp_syms before its first terminal.
+    """
+    for sym in exp_syms:
+        if type(sym) is not NSym:
+            if sym.char != EPSILON_CHAR:
+                return
+
+            continue
+
+        yield sym.char
+
+def _trailing_nonterminals(exp_syms):
+    """The nonterminals of exp_syms after its last terminal.
+    """
+    trailing = set()
+    for sym in reversed(exp_syms):
+        if type(sym) is not NSym:
+            if sym.char != EPSILON_CHAR:
+                break
+
+            continue
+
+        trailing.add(sym.char)
+
+    return trailing
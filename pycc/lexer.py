@@ -0,0 +1,283 @@
+"""Module for table-driven lexing, so that parsing can run over tokens instead of individual characters.
+
+Token definitions are regular expressions, which are compiled together into a single DFA:
+- each pattern is parsed into a Thompson NFA fragment, all joined under one start state
+- the charsets labelling NFA edges are partitioned into equivalence classes, so the DFA's transition table has
+  one column per class rather than one per character
+- subset construction then yields a dense transition table, with each accepting state labelled by the
+  earliest-defined token it accepts
+
+Tokenizing uses maximal munch: the longest match wins, with ties going to the token defined first. Scanning past
+the end of a token to rule out a longer one remembers the (state, offset) pairs it found no accepting state
+after, so later tokens stop scanning when they reach one, and tokenizing stays linear in the input length (times
+the number of DFA states) even when every token is followed by a long failed match.
+
+Supported pattern syntax: literals, '.', [...] classes (with ranges and ^ negation), the escapes \\d \\w \\s (and
+their negations \\D \\W \\S), \\n \\t \\r, grouping with (...), alternation with | and the *, + and ? operators.
+"""
+
+from array import array
+import pycc.charset as charset
+from pycc.compiled_table import UNKNOWN_TERMINAL
+
+class LexError(ValueError):
+    pass
+
+class Lexer:
+    def __init__(self, tokens, skip = ()):
+        """tokens is a list of (name, pattern) pairs; skip names tokens (such as whitespace) that are matched
+        but not yielded.
+        """
+        self.names = [name for (name, _) in tokens]
+        self.skip = array('b', [name in skip for name in self.names])
+
+        nfa = _NFA()
+        starts = []
+        for token_id, (_, pattern) in enumerate(tokens):
+            (start, end) = _RegexParser(pattern, nfa).parse()
+            nfa.accepts[end] = token_id
+            starts.append(start)
+
+        root = nfa.new_state()
+        nfa.epsilons[root].extend(starts)
+
+        (self.class_map, self.n_states, self.transitions, self.accepts) = _build_dfa(nfa, root)
+
+    def token_ids(self, s):
+        """Yields the id (index into self.names) of each token in s. Raises LexError if some part of s isn't
+        matched by any token.
+        """
+        for (token_id, _, _) in self.tokenize(s):
+            yield token_id
+
+    def tokenize(self, s):
+        """Yields (token id, start, end) for each token in s. Raises LexError if some part of s isn't matched by
+        any token.
+        """
+        n_classes = self.class_map.n_classes
+        latin1 = self.class_map.latin1
+        class_of = self.class_map.class_of
+        transitions = self.transitions
+        accepts = self.accepts
+        skip = self.skip
+
+        i = 0
+        n = len(s)
+
+        # failed holds state * stride + j for each state that a scan has been in at offset j without reaching an
+        # accepting state afterwards; failed_end is the last such offset
+        stride = n + 1
+        failed = set()
+        failed_end = -1
+
+        while i < n:
+            state = 0
+            token_id = -1
+            token_end = i
+            token_state = 0
+
+            j = i
+            while j < n:
+                if j <= failed_end and state * stride + j in failed:
+                    break
+
+                o = ord(s[j])
+                state = transitions[state * n_classes + (latin1[o] if o < 256 else class_of(s[j]))]
+                if state < 0:
+                    break
+
+                j += 1
+                if accepts[state] >= 0:
+                    token_id = accepts[state]
+                    token_end = j
+                    token_state = state
+
+            if token_id < 0:
+                raise LexError("No token matches input at offset {}".format(i))
+
+            # a scan a single character past the token is as cheap as looking it up, so only longer ones are
+            # remembered, by stepping through them again from the token's accepting state
+            if j - token_end > 1:
+                state = token_state
+                for k in range(token_end, j):
+                    o = ord(s[k])
+                    state = transitions[state * n_classes + (latin1[o] if o < 256 else class_of(s[k]))]
+                    failed.add(state * stride + k + 1)
+
+                failed_end = max(failed_end, j)
+
+            if not skip[token_id]:
+                yield (token_id, i, token_end)
+
+            i = token_end
+
+    def terminal_codes(self, table):
+        """Returns a list mapping each token id to the id of the CompiledTable terminal with the same name.
+        Tokens that aren't terminals of the table's grammar map to the always-missing unknown terminal.
+        """
+        return [table.terminal_ids.get(name, UNKNOWN_TERMINAL) for name in self.names]
+
+class _NFA:
+    def __init__(self):
+        self.epsilons = []
+        # edges[state] is a list of (charset, target state)
+        self.edges = []
+        # map of accepting state -> token id
+        self.accepts = {}
+
+    def new_state(self):
+        self.epsilons.append([])
+        self.edges.append([])
+        return len(self.edges) - 1
+
+class _RegexParser:
+    """Recursive descent parser for patterns, building Thompson fragments as (start, end) state pairs.
+    """
+    def __init__(self, pattern, nfa):
+        self.pattern = pattern
+        self.nfa = nfa
+        self.i = 0
+
+    def parse(self):
+        fragment = self._alternation()
+        if self.i < len(self.pattern):
+            raise ValueError("Unexpected {!r} in pattern: {!r}".format(self.pattern[self.i], self.pattern))
+
+        return fragment
+
+    def _peek(self):
+        return self.pattern[self.i] if self.i < len(self.pattern) else None
+
+    def _alternation(self):
+        fragments = [self._concatenation()]
+        while self._peek() == '|':
+            self.i += 1
+            fragments.append(self._concatenation())
+
+        if len(fragments) == 1:
+            return fragments[0]
+
+        start = self.nfa.new_state()
+        end = self.nfa.new_state()
+        for (s, e) in fragments:
+            self.nfa.epsilons[start].append(s)
+            self.nfa.epsilons[e].append(end)
+
+        return (start, end)
+
+    def _concatenation(self):
+        start = end = self.nfa.new_state()
+        while self._peek() not in (None, '|', ')'):
+            (s, e) = self._repetition()
+            self.nfa.epsilons[end].append(s)
+            end = e
+
+        return (start, end)
+
+    def _repetition(self):
+        (s, e) = self._atom()
+
+        while self._peek() in ('*', '+', '?'):
+            op = self.pattern[self.i]
+            self.i += 1
+
+            start = self.nfa.new_state()
+            end = self.nfa.new_state()
+            self.nfa.epsilons[start].append(s)
+            self.nfa.epsilons[e].append(end)
+            if op in ('*', '?'):
+                self.nfa.epsilons[start].append(end)
+            if op in ('*', '+'):
+                self.nfa.epsilons[e].append(s)
+
+            (s, e) = (start, end)
+
+        return (s, e)
+
+    def _atom(self):
+        c = self._peek()
+        if c is None or c in ('*', '+', '?'):
+            raise ValueError("Expected an expression at offset {} of pattern: {!r}".format(self.i, self.pattern))
+
+        if c == '(':
+            self.i += 1
+            fragment = self._alternation()
+            if self._peek() != ')':
+                raise ValueError("Unbalanced parenthesis in pattern: {!r}".format(self.pattern))
+
+            self.i += 1
+            return fragment
+
+        if c == '[':
+            (chars, self.i) = charset.parse_class(self.pattern, self.i)
+        elif c == '\\':
+            (chars, self.i) = charset.parse_escape(self.pattern, self.i)
+        elif c == '.':
+            chars = charset.negate(charset.from_chars('\n'))
+            self.i += 1
+        else:
+            chars = charset.from_chars(c)
+            self.i += 1
+
+        start = self.nfa.new_state()
+        end = self.nfa.new_state()
+        self.nfa.edges[start].append((chars, end))
+        return (start, end)
+
+def _build_dfa(nfa, root):
+    """Subset construction over equivalence classes. DFA state 0 is the start state; a transition to -1 means
+    no token can continue from there.
+    """
+    edge_charsets = []
+    for edges in nfa.edges:
+        edge_charsets.extend(chars for (chars, _) in edges)
+
+    (class_map, members) = charset.partition(edge_charsets)
+    n_classes = class_map.n_classes
+
+    # edges per NFA state with their class ids resolved
+    class_edges = []
+    k = 0
+    for edges in nfa.edges:
+        class_edges.append([(members[k + j], target) for j, (_, target) in enumerate(edges)])
+        k += len(edges)
+
+    def closure(states):
+        result = set(states)
+        pending = list(states)
+        while len(pending) > 0:
+            for t in nfa.epsilons[pending.pop()]:
+                if t not in result:
+                    result.add(t)
+                    pending.append(t)
+
+        return frozenset(result)
+
+    start = closure([root])
+    dfa_ids = {start: 0}
+    dfa_states = [start]
+    transitions = array('i')
+    accepts = array('i')
+
+    for state_set in dfa_states:
+        moves = {}
+        for nfa_state in state_set:
+            for (classes, target) in class_edges[nfa_state]:
+                for c in classes:
+                    moves.setdefault(c, set()).add(target)
+
+        row = array('i', [-1]) * n_classes
+        for c, targets in moves.items():
+            target_set = closure(targets)
+            if target_set not in dfa_ids:
+                dfa_ids[target_set] = len(dfa_states)
+                dfa_states.append(target_set)
+
+            row[c] = dfa_ids[target_set]
+
+        transitions.extend(row)
+
+        token_ids = [nfa.accepts[s] for s in state_set if s in nfa.accepts]
+        accepts.append(min(token_ids) if len(token_ids) > 0 else -1)
+
+    return (class_map, len(dfa_states), transitions, accepts)
@@ -1,50 +1,728 @@
+import multiprocessing
+from bisect import bisect_left, bisect_right
+from collections import deque
+from contextlib import nullcontext
+from itertools import chain
+import pycc.cache as cache
+from pycc.batch import recognize_batch
 import pycc.parse_table as parse_table
-from pycc.constants import EPSILON_CHAR, END_SYMBOL
+from pycc.compiled_table import compile_parse_table, END_TERMINAL
 from pycc.grammar_normalization import left_factor, remove_left_recursion
+from pycc.grammar_optimization import optimize as optimize_grammar
+from pycc.lazy_table import LazyTable
+from pycc.lexer import LexError
+from pycc.parse_tree import ParseTree
+
+# Kinds of event yielded by LLParser.iter_events
+ENTER = 0
+EXIT = 1
+TOKEN = 2
+
+# Exit markers: the drivers mark where each predicted production ends on the parse stack with ~x, the complement
+# of an id (the production for evaluate, the predicted nonterminal for iter_events and parse_tree). Symbol ids are
+# never negative, so any negative stack entry is an exit marker, and ~marker gives back its id. The drivers write
+# ~ inline rather than through a helper, which would cost a call per predict.
 
 class LLParser:
     # We may want to add some helpers for converting a string to rules, etc.
     # Assume that the first rule supplied is the start rule
-    def __init__(self, grammar):
-        self.grammar = left_factor(remove_left_recursion(grammar))
+    def __init__(self, grammar, cache_dir = None, stats = None, optimize = False, lazy = False, warm = (),
+                 pipeline = None):
+        """If cache_dir is given, the compiled table is loaded from (or saved to) a file there keyed by the
+        grammar's fingerprint. On a cache hit no grammar analysis is done; the normalized grammar and dict
+        parse table are only computed if they're accessed.
+
+        If stats (a pycc.stats.ParseStats) is given, construction phases are timed into it and parse() and
+        stream parses run an instrumented driver that records into it.
+
+        If optimize is set, the normalized grammar is shrunk by pycc.grammar_optimization before its parse table
+        is built. This changes the shape of parse trees, but not the language recognized.
+
+        If lazy is set, the grammar is still normalized up front but the compiled table is a LazyTable, whose rows
+        (and the FIRST and FOLLOW sets they need) are only built as parses reach them; LL(1) conflicts are then
+        only found once a conflicting row is built. warm is an iterable of nonterminal chars whose rows are built
+        straight away, such as LazyTable.built_rows() or ParseStats.predicts() from an earlier run. Lazy tables
+        are loaded from cache_dir if there's a cached table, but never stored.
+
+        If pipeline (a pycc.grammar_normalization.NormalizationPipeline) is given, the grammar is normalized
+        through it, reusing whatever it has memoized from grammars normalized before. Sharing one pipeline between
+        the parsers of many similar grammars means only the rules that differ between them get normalized.
+        Fresh nonterminals are then named after the nonterminals they come from.
+        """
+        self.source_grammar = grammar
+        self.stats = stats
+        self.optimize = optimize
+        self.pipeline = pipeline
+        self._grammar = None
+        self._parse_table = None
+        self._actions = None
+
+        self.compiled = None
+        if cache_dir is not None:
+            with self._phase('load_cache'):
+                self.compiled = cache.load_cached_table(cache_dir, grammar, self._cache_variant())
+
+        if self.compiled is None and lazy:
+            normalized = self.grammar
+            with self._phase('compile_parse_table'):
+                self.compiled = LazyTable(normalized)
+            with self._phase('warm'):
+                self.compiled.warm(warm)
+
+        if self.compiled is None:
+            (normalized, table) = (self.grammar, self.parse_table)
+            with self._phase('compile_parse_table'):
+                self.compiled = compile_parse_table(normalized, table)
+
+            if cache_dir is not None:
+                with self._phase('store_cache'):
+                    cache.store_cached_table(cache_dir, grammar, self.compiled, self._cache_variant())
+
+        if stats is not None:
+            stats.bind(self.compiled)
+
+    def _phase(self, name):
+        return nullcontext() if self.stats is None else self.stats.phase(name)
+
+    def _cache_variant(self):
+        variants = []
+        if self.pipeline is not None:
+            variants.append('pipeline')
+        if self.optimize:
+            variants.append('optimized')
+
+        return ','.join(variants)
+
+    def _normalize(self):
+        if self.pipeline is not None:
+            with self._phase('normalize'):
+                grammar = self.pipeline.normalize(self.source_grammar)
+        else:
+            with self._phase('remove_left_recursion'):
+                grammar = remove_left_recursion(self.source_grammar)
+            with self._phase('left_factor'):
+                grammar = left_factor(grammar)
+        if self.optimize:
+            with self._phase('optimize'):
+                grammar = optimize_grammar(grammar)
+
+        return grammar
+
+    def _analyze(self):
+        grammar = self.grammar
+        with self._phase('build_first_sets'):
+            first_sets = parse_table.build_first_sets(grammar)
+        with self._phase('build_follow_sets'):
+            follow_sets = parse_table.build_follow_sets(grammar, first_sets)
+        with self._phase('build_parse_table'):
+            self._parse_table = parse_table.build_parse_table(grammar, first_sets, follow_sets)
+
+    @property
+    def grammar(self):
+        if self._grammar is None:
+            self._grammar = self._normalize()
+
+        return self._grammar
 
-        # For convenience during parsing
-        self.nonterminals = set([rule.sym.char for rule in grammar.rules])
+    @property
+    def parse_table(self):
+        if self._parse_table is None:
+            self._analyze()
 
-        self.parse_table = parse_table.build_parse_table(grammar)
+        return self._parse_table
+
+    @property
+    def nonterminals(self):
+        return set(self.compiled.nonterminals)
 
     def parse(self, s):
-        parse_stack = [END_SYMBOL, self.grammar.start_symbol.char]
+        if self.stats is not None:
+            stack = _new_stack(self.compiled)
+            codes = chain(self.compiled.encode(s), (END_TERMINAL,))
+            return _record_parse(self.stats, _consume_instrumented(self.compiled, stack, codes, self.stats))
+
+        return _recognize(self.compiled, self.compiled.encode(s))
+
+    def parse_tokens(self, s, lexer):
+        """Tokenizes s with lexer and parses the resulting token stream. The grammar's terminals should be the
+        lexer's token names. Returns False if s can't be tokenized.
+        """
+        codes = lexer.terminal_codes(self.compiled)
+        try:
+            return _recognize(self.compiled, map(codes.__getitem__, lexer.token_ids(s)))
+        except LexError:
+            return False
+
+    def parse_many(self, inputs, workers = None, chunksize = 1024):
+        """Parses each string in inputs, yielding the results in order.
+
+        With workers > 1 the strings are parsed in chunks across a process pool. The compiled table is handed to
+        each worker once when it starts (inherited directly where the platform forks), so the per-string cost in
+        a worker is the same as the single process loop.
+        """
+        if workers is None or workers <= 1:
+            return _parse_all(self.compiled, inputs)
+
+        return _parse_pooled(self.compiled, inputs, workers, chunksize)
+
+    def parse_batch(self, inputs):
+        """Parses a batch of strings in lockstep with NumPy (see pycc.batch), returning a boolean array. Best
+        suited to large batches of short strings.
+        """
+        return recognize_batch(self.compiled, inputs)
+
+    def stream(self):
+        """Returns a StreamParse that accepts input incrementally through feed() and finish().
+        """
+        return StreamParse(self.compiled, self.stats)
+
+    def parse_stream(self, source, chunk_size=1 << 16):
+        """Parses input from either an iterable of chunks or a file-like object with a read() method, holding
+        only one chunk in memory at a time. Stops reading at the first symbol that can't be matched.
+        """
+        if hasattr(source, 'read'):
+            source = _read_chunks(source, chunk_size)
+
+        stream = self.stream()
+        for chunk in source:
+            if not stream.feed(chunk):
+                return False
+
+        return stream.finish()
+
+    def incremental(self, s, interval = 1024):
+        """Parses s and returns an IncrementalParse, which can reparse s cheaply after edits through edit().
+        """
+        return IncrementalParse(self.compiled, s, interval)
+
+    def evaluate(self, s):
+        """Parses s, running the semantic actions of the grammar's rules as each one is completed, and returns the
+        value of the start symbol. Raises ValueError if s isn't accepted.
+
+        Values live on a stack alongside the parse stack: a matched terminal pushes its char, and a completed rule
+        pops one value per symbol of its expression and pushes its action's result. Rules without an action
+        produce None for an empty expression, the value of a single symbol, or otherwise a tuple of the values.
+        """
+        table = self.compiled
+        n_terminals = table.n_terminals
+        cells = table.table
+        symbols = table.symbols
+        offsets = table.offsets
+        actions = self._production_actions()
+
+        parse_stack = [END_TERMINAL, table.start]
+        push = parse_stack.extend
+        pop = parse_stack.pop
+        values = []
+
+        # terminal values are chars, so bytes-like input (which iterates as ints) is decoded a byte per char
+        chars = s if isinstance(s, str) else map(chr, s)
+        codes = chain(table.encode(s), (END_TERMINAL,))
+        for i, (a, c) in enumerate(zip(codes, chain(chars, (None,)))):
+            top = pop()
+
+            while top != a:
+                # rule completed (see exit markers, above)
+                if top < 0:
+                    p = ~top
+                    k = offsets[p + 1] - offsets[p]
+                    args = values[len(values) - k:]
+                    del values[len(values) - k:]
+
+                    action = actions[p]
+                    if action is not None:
+                        values.append(action(*args))
+                    else:
+                        values.append(None if k == 0 else args[0] if k == 1 else tuple(args))
+
+                # predict
+                elif top >= n_terminals:
+                    p = cells[(top - n_terminals) * n_terminals + a]
+                    if p < 0:
+                        p = table.resolve(top, a)
+                        if p < 0:
+                            raise ValueError("Input rejected at offset {}".format(i))
+
+                    parse_stack.append(~p)
+                    push(symbols[offsets[p]:offsets[p + 1]])
+
+                # terminal mismatch
+                else:
+                    raise ValueError("Input rejected at offset {}".format(i))
+
+                top = pop()
+
+            # match
+            values.append(c)
+
+        # the last value is END_TERMINAL's placeholder
+        return values[0]
+
+    def _production_actions(self):
+        """Returns the action of each production, checking that every action in the source grammar survived
+        normalization. Rules that normalization rewrites (left recursive or left factored ones) have no place in
+        the normalized grammar to run their action from.
+        """
+        if self._actions is None:
+            kept = set(id(rule) for rule in self.grammar.rules)
+            for rule in self.source_grammar.rules:
+                if rule.action is not None and id(rule) not in kept:
+                    raise ValueError("Can't run the semantic action of a rule rewritten by normalization: {} -> {}"
+                                     .format(rule.sym.char, [sym.char for sym in rule.exp_syms]))
+
+            # productions past the grammar's rules are lowered character classes, whose value is the char matched
+            self._actions = [rule.action for rule in self.grammar.rules]
+            self._actions.extend([None] * (len(self.compiled.offsets) - 1 - len(self._actions)))
+
+        return self._actions
+
+    def iter_events(self, s):
+        """Lazily yields (kind, symbol id, offset) events as s is parsed: (ENTER, X, i) when nonterminal X is
+        predicted at offset i, (EXIT, X, i) when it has been fully matched and (TOKEN, a, i) for each terminal
+        matched. Symbol ids can be translated with self.compiled.symbol_char. A character class terminal that was
+        lowered into a nonterminal (see pycc.compiled_table) is reported as a single TOKEN with its lowered id, so
+        its char is the class's pattern.
+
+        Memory is bounded by the nesting depth of s. Raises ValueError once s is found not to be accepted; events
+        already yielded up to that point are still valid.
+        """
+        table = self.compiled
+        n_terminals = table.n_terminals
+        cells = table.table
+        symbols = table.symbols
+        offsets = table.offsets
+
+        parse_stack = [END_TERMINAL, table.start]
+        push = parse_stack.extend
+        pop = parse_stack.pop
+
+        first_lowered = table.first_lowered
+
+        i = 0
+        for a in chain(table.encode(s), (END_TERMINAL,)):
+            top = pop()
+            token = a
+
+            while top != a:
+                # end of production (see exit markers, above)
+                if top < 0:
+                    yield (EXIT, ~top, i)
+
+                # predict
+                elif top >= n_terminals:
+                    p = cells[(top - n_terminals) * n_terminals + a]
+                    if p < 0:
+                        p = table.resolve(top, a)
+                        if p < 0:
+                            raise ValueError("Input rejected at offset {}".format(i))
+
+                    # a lowered class's production just matches a, which is reported as the class
+                    if top >= first_lowered:
+                        token = top
+                    else:
+                        yield (ENTER, top, i)
+                        parse_stack.append(~top)
+                    push(symbols[offsets[p]:offsets[p + 1]])
+
+                # terminal mismatch
+                else:
+                    raise ValueError("Input rejected at offset {}".format(i))
+
+                top = pop()
+
+            if a != END_TERMINAL:
+                yield (TOKEN, token, i)
+            i += 1
+
+    def parse_tree(self, s):
+        """Parses s and returns its derivation as a ParseTree, or None if s isn't accepted.
+        """
+        table = self.compiled
+        n_terminals = table.n_terminals
+        cells = table.table
+        symbols = table.symbols
+        offsets = table.offsets
+
+        first_lowered = table.first_lowered
+
+        tree = ParseTree(table)
+        root = tree.add_nodes([table.start], -1)
+        node_start = tree.start
+        node_end = tree.end
+
+        # Parallel stacks of symbol ids and the tree nodes they'll derive
+        sym_stack = [END_TERMINAL, table.start]
+        node_stack = [-1, root]
+
         i = 0
+        for a in chain(table.encode(s), (END_TERMINAL,)):
+            top = sym_stack.pop()
+            node = node_stack.pop()
+
+            while top != a:
+                # end of production (see exit markers, above)
+                if top < 0:
+                    node_end[node] = i
+
+                # predict
+                elif top >= n_terminals:
+                    p = cells[(top - n_terminals) * n_terminals + a]
+
+                    # predict miss
+                    if p < 0:
+                        p = table.resolve(top, a)
+                        if p < 0:
+                            return None
+
+                    rhs = symbols[offsets[p]:offsets[p + 1]]
 
-        s_list = list(s) + [END_SYMBOL]
-        while i < len(s_list):
+                    # a lowered class's node becomes the leaf for the terminal its production matches
+                    if top >= first_lowered:
+                        sym_stack.extend(rhs)
+                        node_stack.append(node)
+                        top = sym_stack.pop()
+                        node = node_stack.pop()
+                        continue
 
-            # successful full match
-            if parse_stack[-1] == END_SYMBOL and s_list[i] == END_SYMBOL:
-                return True
+                    k = len(rhs)
+                    first = tree.add_nodes(rhs[::-1], node)
+                    tree.set_children(node, first, k)
+                    node_start[node] = i
+
+                    sym_stack.append(~top)
+                    node_stack.append(node)
+                    sym_stack.extend(rhs)
+                    node_stack.extend(range(first + k - 1, first - 1, -1))
+
+                # terminal mismatch
+                else:
+                    return None
+
+                top = sym_stack.pop()
+                node = node_stack.pop()
 
             # match
-            elif parse_stack[-1] == s_list[i]:
-                parse_stack.pop()
-                i += 1
+            if node >= 0:
+                node_start[node] = i
+                node_end[node] = i + 1
+            i += 1
 
-            # predict attempt
-            elif parse_stack[-1] in self.nonterminals:
-                X = parse_stack.pop()
-                a = s_list[i]
+        return tree
 
-                # predict miss
-                if (X, a) not in self.parse_table:
-                    return False
+class StreamParse:
+    """A resumable parse. The LL stack is kept between calls to feed(), so memory is bounded by the stack depth
+    rather than the total input size.
+    """
+    def __init__(self, table, stats = None):
+        self.table = table
+        self.stats = stats
+        self.parse_stack = _new_stack(table)
+        self.rejected = False
+        self.finished = False
 
-                syms = self.parse_table[(X, a)].copy()
-                syms.reverse()
+    def _consume(self, codes):
+        if self.stats is not None:
+            return _consume_instrumented(self.table, self.parse_stack, codes, self.stats)
 
-                parse_stack = parse_stack + [sym for sym in syms if sym is not EPSILON_CHAR]
+        return _consume(self.table, self.parse_stack, codes)
 
+    def feed(self, chunk):
+        """Consumes the next chunk of input. Returns False once the input can no longer be accepted.
+        """
+        if self.finished:
+            raise ValueError("Can't feed a stream parse that has already finished!")
+
+        if not self.rejected:
+            self.rejected = not self._consume(self.table.encode(chunk))
+
+        return not self.rejected
+
+    def finish(self):
+        """Signals the end of input and returns whether everything fed was accepted.
+        """
+        if not self.finished:
+            self.finished = True
+            if not self.rejected:
+                self.rejected = not self._consume((END_TERMINAL,))
+
+            if self.stats is not None:
+                _record_parse(self.stats, not self.rejected)
+
+        return not self.rejected
+
+class IncrementalParse:
+    """A parse of a string that's kept up to date as the string is edited.
+
+    The LL stack is checkpointed at least every interval symbols. An edit resumes parsing from the last checkpoint
+    before it, and stops as soon as the parse reaches one of the old checkpoints past the edit with the same stack:
+    from there on the input and the parser state are the same as in the previous parse, so its result stands. The
+    parsing per edit is then proportional to the edit's length plus the interval, rather than to the input length.
+
+    Each edit still costs O(n) outside of parsing: the text is spliced into a new string, and the checkpoints after
+    the edit are shifted by its change in length. That's a string copy and one addition per checkpoint
+    (n / interval of them), so it only dominates parsing for very long texts.
+    """
+    def __init__(self, table, text, interval = 1024):
+        self.table = table
+        self.text = text
+        self.interval = interval
+
+        # positions[k] is an offset into text and stacks[k] a copy of the LL stack before consuming text[positions[k]]
+        self.positions = []
+        self.stacks = []
+
+        # number of symbols consumed by the last parse or reparse
+        self.parsed = 0
+
+        self.accepted = self._run(0, _new_stack(table), [], [], False)
+
+    def edit(self, start, end, text):
+        """Replaces self.text[start:end] with text and returns whether the result is accepted.
+        """
+        if not 0 <= start <= end <= len(self.text):
+            raise ValueError("Invalid edit range: [{}, {})".format(start, end))
+
+        delta = len(text) - (end - start)
+        self.text = self.text[:start] + text + self.text[end:]
+
+        # positions[0] is always 0, so there's a checkpoint to resume from
+        k = bisect_right(self.positions, start) - 1
+        m = bisect_left(self.positions, end, k + 1)
+
+        old_positions = [q + delta for q in self.positions[m:]]
+        old_stacks = self.stacks[m:]
+        pos = self.positions[k]
+        stack = list(self.stacks[k])
+        del self.positions[k:]
+        del self.stacks[k:]
+
+        self.accepted = self._run(pos, stack, old_positions, old_stacks, self.accepted)
+        return self.accepted
+
+    def _run(self, pos, stack, old_positions, old_stacks, old_accepted):
+        """Parses self.text from pos with stack, checkpointing along the way, until the end of the input, a
+        rejection, or a checkpoint matching one of old_positions and old_stacks (which come from a parse that
+        ended with old_accepted).
+        """
+        text = self.text
+        n = len(text)
+        j = 0
+
+        self.parsed = 0
+        while True:
+            while j < len(old_positions) and old_positions[j] < pos:
+                j += 1
+
+            if j < len(old_positions) and old_positions[j] == pos:
+                if tuple(stack) == old_stacks[j]:
+                    self.positions.extend(old_positions[j:])
+                    self.stacks.extend(old_stacks[j:])
+                    return old_accepted
+
+                j += 1
+
+            self.positions.append(pos)
+            self.stacks.append(tuple(stack))
+            if pos == n:
+                return _consume(self.table, stack, (END_TERMINAL,))
+
+            # chunks end at the next old checkpoint, so convergence is checked there
+            end = min(pos + self.interval, n)
+            if j < len(old_positions) and old_positions[j] < end:
+                end = old_positions[j]
+
+            if not _consume(self.table, stack, self.table.encode(text[pos:end])):
+                return False
+
+            self.parsed += end - pos
+            pos = end
+
+def _read_chunks(f, chunk_size):
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+
+        yield chunk
+
+# Compiled table of the current pool worker process, set once by _init_worker
+_worker_table = None
+
+def _init_worker(table):
+    global _worker_table
+    _worker_table = table
+
+def _parse_chunk(chunk):
+    return [_recognize(_worker_table, _worker_table.encode(s)) for s in chunk]
+
+def _parse_all(table, inputs):
+    for s in inputs:
+        yield _recognize(table, table.encode(s))
+
+# Most chunks parse_many keeps queued or being parsed per worker process
+CHUNKS_PER_WORKER = 2
+
+def _parse_pooled(table, inputs, workers, chunksize):
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+
+    # Pool.imap reads inputs as fast as it can hand them out, so chunks are submitted by hand instead, keeping no
+    # more than CHUNKS_PER_WORKER of them per worker in flight and reading the next only as results are taken
+    with context.Pool(workers, initializer=_init_worker, initargs=(table,)) as pool:
+        pending = deque()
+        for chunk in _chunks(inputs, chunksize):
+            if len(pending) == workers * CHUNKS_PER_WORKER:
+                yield from pending.popleft().get()
+
+            pending.append(pool.apply_async(_parse_chunk, (chunk,)))
+
+        while len(pending) > 0:
+            yield from pending.popleft().get()
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if len(chunk) > 0:
+        yield chunk
+
+def _new_stack(table):
+    return [END_TERMINAL, table.start]
+
+def _recognize(table, codes):
+    """Runs the LL driver over an iterable of terminal ids, returning whether it's accepted.
+    """
+    return _consume(table, _new_stack(table), chain(codes, (END_TERMINAL,)))
+
+def _consume(table, parse_stack, codes):
+    """Advances parse_stack over an iterable of terminal ids, returning False as soon as one can't be matched.
+
+    Each input symbol pops the stack until a terminal is on top, expanding nonterminals in place along the way.
+    Nonterminals are expanded a whole prediction chain at a time, and a chain that ends by matching the input
+    symbol consumes it directly. The stack is only ever extended and popped at its end, so a parse is amortized
+    O(n) in the input length.
+    """
+    if not table.complete:
+        return _consume_lazy(table, parse_stack, codes)
+
+    n_terminals = table.n_terminals
+    chains = table.chains()
+    cells = chains.table
+    symbols = chains.symbols
+    offsets = chains.offsets
+    consumes = chains.consumes
+
+    push = parse_stack.extend
+    pop = parse_stack.pop
+
+    for a in codes:
+        top = pop()
+
+        # predict until a terminal is on top of the stack, or a chain has matched a
+        while top >= n_terminals:
+            k = cells[(top - n_terminals) * n_terminals + a]
+
+            # predict miss
+            if k < 0:
+                return False
+
+            push(symbols[offsets[k]:offsets[k + 1]])
+            if consumes[k]:
+                break
+
+            top = pop()
+        else:
             # terminal mismatch
-            else:
+            if top != a:
+                return False
+
+    # END_TERMINAL only ever matches the last input symbol, so consuming it means a successful full match
+    return True
+
+def _consume_lazy(table, parse_stack, codes):
+    """Same as _consume, but for tables that are still being built, so it predicts a production at a time and
+    has the table resolve every miss.
+    """
+    n_terminals = table.n_terminals
+    cells = table.table
+    symbols = table.symbols
+    offsets = table.offsets
+
+    push = parse_stack.extend
+    pop = parse_stack.pop
+
+    for a in codes:
+        top = pop()
+
+        while top >= n_terminals:
+            p = cells[(top - n_terminals) * n_terminals + a]
+            if p < 0:
+                p = table.resolve(top, a)
+                if p < 0:
+                    return False
+
+            push(symbols[offsets[p]:offsets[p + 1]])
+            top = pop()
+
+        if top != a:
+            return False
+
+    return True
+
+def _consume_instrumented(table, parse_stack, codes, stats):
+    """Same as _consume, but records each predict, match and miss into stats along with the stack depth.
+    """
+    n_terminals = table.n_terminals
+    cells = table.table
+    symbols = table.symbols
+    offsets = table.offsets
+
+    push = parse_stack.extend
+    pop = parse_stack.pop
+
+    hits = stats.cell_hit_counts
+    matches = stats.match_counts
+    max_depth = stats.max_stack_depth
+
+    try:
+        for a in codes:
+            top = pop()
+
+            while top >= n_terminals:
+                cell = (top - n_terminals) * n_terminals + a
+                p = cells[cell]
+
+                if p < 0:
+                    p = table.resolve(top, a)
+                    if p < 0:
+                        stats.cell_miss_counts[cell] += 1
+                        return False
+
+                hits[cell] += 1
+                push(symbols[offsets[p]:offsets[p + 1]])
+                if len(parse_stack) > max_depth:
+                    max_depth = len(parse_stack)
+
+                top = pop()
+
+            if top != a:
                 return False
 
+            matches[a] += 1
+
         return True
+    finally:
+        stats.max_stack_depth = max_depth
+
+def _record_parse(stats, accepted):
+    stats.parses += 1
+    if accepted:
+        stats.accepted += 1
+
+    return accepted
@@ -1,5 +1,5 @@
-from copy import deepcopy
-from pycc.grammar import NSym, TSym
+from pycc.grammar import NSym
+from pycc.graph import propagate_bits
 from pycc.constants import EPSILON_CHAR, END_SYMBOL
 
 def build_parse_table(grammar, first_sets = None, follow_sets = None):
@@ -10,11 +10,11 @@ def build_parse_table(grammar, first_sets = None, follow_sets = None):
     parse_table = {}
 
     for rule in grammar.rules:
-        (first_sets, first_chars) = _get_next_terminals(grammar.rules, first_sets, rule.exp_syms, 0)
+        first_chars = _get_next_terminals(first_sets, rule.exp_syms, 0)
 
         sym_char = rule.sym.char
         for c in first_chars:
-            if c is not EPSILON_CHAR:
+            if c != EPSILON_CHAR:
                 _add_to_parse_table(parse_table, sym_char, c, rule)
 
         if EPSILON_CHAR in first_chars:
@@ -32,212 +32,287 @@ def _add_to_parse_table(parse_table, nonterm, term, rule):
     parse_table[(nonterm, term)] = parse_table_exp
 
 def build_first_sets(grammar):
-    first_sets = {}
-    nonterm_syms = set([rule.sym for rule in grammar.rules])
+    """Computes FIRST sets for every nonterminal in grammar, keyed by nonterminal char. A set includes
+    EPSILON_CHAR if its nonterminal can derive the empty string.
 
-    for sym in nonterm_syms:
-        if sym.char not in first_sets:
-            first_sets = _add_sym_to_first_sets(sym, grammar.rules, first_sets)
+    Terminals are interned to bit positions and the sets are solved as one fixpoint over the graph of
+    "FIRST(A) includes FIRST(B)" edges, a strongly connected component at a time.
+    """
+    nonterminals = [sym.char for sym in grammar.nonterminals]
+    nullable = _nullable_nonterminals(grammar)
+    bit_ids = {}
 
-    return first_sets
+    direct = {}
+    dependencies = {A: set() for A in nonterminals}
+    for rule in grammar.rules:
+        A = rule.sym.char
+        for sym in rule.exp_syms:
+            if type(sym) is not NSym:
+                if sym.char != EPSILON_CHAR:
+                    direct[A] = direct.get(A, 0) | _bit(bit_ids, sym.char)
+                    break
 
-def _add_sym_to_first_sets(sym, rules, first_sets):
-    sym_rules = [rule for rule in rules if rule.sym == sym]
-    sym_first_sets = set()
+            else:
+                dependencies[A].add(sym.char)
+                if sym.char not in nullable:
+                    break
+
+    first_bits = propagate_bits(dependencies, direct)
+    terminals = list(bit_ids)
 
-    for rule in sym_rules:
-        (first_sets, next_terminals) = _get_next_terminals(rules, first_sets, rule.exp_syms, 0)
-        sym_first_sets |= next_terminals
+    first_sets = {}
+    for A in nonterminals:
+        first_sets[A] = _from_bits(first_bits[A], terminals)
+        if A in nullable:
+            first_sets[A].add(EPSILON_CHAR)
 
-    first_sets[sym.char] = sym_first_sets
     return first_sets
 
-def build_follow_sets(grammar, first_sets):
-    start_sym = grammar.start_symbol
+def _nullable_nonterminals(grammar):
+    """Worklist computation of the nonterminals that can derive the empty string. Each rule keeps a count of
+    the symbols that aren't yet known to be nullable; when it reaches zero the rule's nonterminal is nullable,
+    which in turn decrements the count of every rule it appears in.
+    """
+    remaining = []
+    worklist = []
+    for rule in grammar.rules:
+        # A terminal can never be erased, so a rule containing one will never reach zero
+        count = len([sym for sym in rule.exp_syms if sym.char != EPSILON_CHAR])
 
-    follow_sets = {start_sym.char: set([END_SYMBOL])}
-    follow_dependencies = {} # Map of A -> {B,...} representing that NSym A's set depends on NSym B's set
+        remaining.append(count)
+        if count == 0:
+            worklist.append(rule.sym.char)
 
-    for rule in grammar.rules:
-        (follow_sets, follow_dependencies) = _process_rule_follow(rule,
-                                                                  grammar.rules,
-                                                                  first_sets,
-                                                                  follow_sets,
-                                                                  follow_dependencies)
+    nullable = set()
+    while len(worklist) > 0:
+        A = worklist.pop()
+        if A in nullable:
+            continue
 
-    # Topo-sort nodes by dependency, then in reverse topo-sort order, list dependencies for each node
-    sorted_syms = topo_sort(follow_dependencies)
-    sorted_syms.reverse()
+        nullable.add(A)
+        for (i, _) in grammar.occurrences.get(A, ()):
+            remaining[i] -= 1
+            if remaining[i] == 0:
+                worklist.append(grammar.rules[i].sym.char)
 
-    for sym in sorted_syms:
-        if sym in follow_dependencies:
-            for dep in follow_dependencies[sym]:
-                follow_sets[sym] |= follow_sets[dep]
+    return nullable
 
-    return follow_sets
+def build_follow_sets(grammar, first_sets):
+    """Computes FOLLOW sets for every nonterminal in grammar, keyed by nonterminal char, given its FIRST sets.
 
-def topo_sort(g_in):
-    """Implementation of Kahn's algorithm to get a topological sort from a graph.
+    Like build_first_sets, this is a single fixpoint over integer bitsets, so mutually dependent FOLLOW sets
+    (which are common in real grammars) are handled a strongly connected component at a time.
     """
-    g = deepcopy(g_in)
-
-    # Reverse dependencies to help in Kahn's algorithm
-    gr = {}
-    for s in g:
-        ts = g[s]
-        for t in ts:
-            if t not in gr:
-                gr[t] = set()
-
-            gr[t].add(s)
-
-    S = set(g.keys()) - set(gr.keys())
-    ret = []
-
-    while len(S) > 0:
-        n = S.pop()
-        ret.append(n)
-        to_remove = []
-        if n in g:
-            for m in g[n]:
-                gr[m].remove(n)
-                to_remove.append((n,m))
-                if len(gr[m]) is 0:
-                    S.add(m)
-
-        for (n,m) in to_remove:
-            g[n].remove(m)
-
-    for n in g:
-        if len(g[n]) > 0:
-            raise ValueError("Cyclic dependency encountered during topological sort!")
-
-    return ret
-
-def _process_rule_follow(rule, all_rules, first_sets, follow_sets, dependencies):
-    """Process a single rule during follow set computation. This method doesn't fully compute follow sets, but
-    instead does whatever it can with first_sets and tracks follow set dependencies to later be processed in
-    topological sort order.
-    """
-    new_dependencies = dependencies.copy()
-    new_follow_sets = follow_sets.copy()
+    bit_ids = {}
+    direct = {sym.char: 0 for sym in grammar.nonterminals}
+    direct[grammar.start_symbol.char] = _bit(bit_ids, END_SYMBOL)
 
-    nsyms = [sym for sym in rule.exp_syms if type(sym) is NSym]
+    # Map of A -> {B,...} representing that NSym A's set depends on NSym B's set
+    dependencies = {A: set() for A in direct}
 
-    for sym in nsyms:
-        if sym.char not in new_follow_sets:
-            new_follow_sets[sym.char] = set()
-        if sym.char not in new_dependencies:
-            new_dependencies[sym.char] = set()
+    for rule in grammar.rules:
+        # FIRST set of the rule's suffix after the current position, and whether that suffix is nullable
+        trailer = 0
+        trailer_nullable = True
+
+        for sym in reversed(rule.exp_syms):
+            if type(sym) is not NSym:
+                if sym.char != EPSILON_CHAR:
+                    trailer = _bit(bit_ids, sym.char)
+                    trailer_nullable = False
+
+                continue
+
+            direct[sym.char] |= trailer
+            if trailer_nullable and sym != rule.sym:
+                dependencies[sym.char].add(rule.sym.char)
+
+            sym_first = first_sets.get(sym.char, set())
+            sym_first_bits = _to_bits(bit_ids, sym_first - set([EPSILON_CHAR]))
+            if EPSILON_CHAR in sym_first:
+                trailer |= sym_first_bits
+            else:
+                trailer = sym_first_bits
+                trailer_nullable = False
 
-        sym_ind = rule.exp_syms.index(sym)
+    follow_bits = propagate_bits(dependencies, direct)
+    terminals = list(bit_ids)
 
-        if sym_ind is len(rule.exp_syms) - 1 and sym.char != rule.sym.char:
-            new_dependencies[sym.char].add(rule.sym.char)
+    return {A: _from_bits(bits, terminals) for A, bits in follow_bits.items()}
 
-        else:
-            (first_sets, next_terminals) = _get_next_terminals(all_rules,
-                                                               first_sets,
-                                                               rule.exp_syms,
-                                                               sym_ind + 1)
-
-            if EPSILON_CHAR in next_terminals and sym != rule.sym:
-                new_dependencies[sym.char].add(rule.sym.char)
+def solve_first_sets(rules_by_symbol, affected, first_sets):
+    """Computes the FIRST sets of the nonterminals in affected into first_sets (keyed like build_first_sets), given
+    rules_by_symbol (as in Grammar). Every other nonterminal that the affected ones depend on must already have its
+    final set in first_sets. Returns the nonterminals whose sets changed.
+    """
+    def is_nullable(sym, nullable):
+        if type(sym) is not NSym:
+            return sym.char == EPSILON_CHAR
+        if sym.char in affected:
+            return sym.char in nullable
+
+        return EPSILON_CHAR in first_sets[sym.char]
+
+    nullable = set()
+    changed = True
+    while changed:
+        changed = False
+        for A in affected:
+            if A not in nullable and any(all(is_nullable(sym, nullable) for sym in rule.exp_syms)
+                                         for rule in rules_by_symbol.get(A, ())):
+                nullable.add(A)
+                changed = True
+
+    bit_ids = {}
+    direct = {}
+    dependencies = {A: set() for A in affected}
+    for A in affected:
+        bits = 0
+        for rule in rules_by_symbol.get(A, ()):
+            for sym in rule.exp_syms:
+                if type(sym) is not NSym:
+                    if sym.char != EPSILON_CHAR:
+                        bits |= _bit(bit_ids, sym.char)
+                        break
+
+                    continue
+
+                if sym.char in affected:
+                    dependencies[A].add(sym.char)
+                else:
+                    bits |= _to_bits(bit_ids, first_sets[sym.char] - set([EPSILON_CHAR]))
 
-            next_terminals.discard(EPSILON_CHAR)
-            new_follow_sets[sym.char] |= next_terminals
+                if not is_nullable(sym, nullable):
+                    break
 
-    return (new_follow_sets, new_dependencies)
+        direct[A] = bits
 
-def _add_sym_to_follow_sets(sym, rules, first_sets, follow_sets):
-    sym_follow_sets = follow_sets[sym.char] if sym.char in follow_sets else set()
-    rules_with_sym = [rule for rule in rules if sym in rule.exp_syms]
+    first_bits = propagate_bits(dependencies, direct)
+    terminals = list(bit_ids)
+    changed = set()
+    for A in affected:
+        first_set = _from_bits(first_bits[A], terminals)
+        if A in nullable:
+            first_set.add(EPSILON_CHAR)
 
-    for rule in rules_with_sym:
-        sym_ind = rule.exp_syms.index(sym)
+        if first_set != first_sets.get(A):
+            first_sets[A] = first_set
+            changed.add(A)
 
-        if sym_ind is len(rule.exp_syms) - 1:
-            if rule.sym.char not in follow_sets:
-                follow_sets = _add_sym_to_follow_sets(rule.sym, rules, first_sets, follow_sets)
+    return changed
 
-            sym_follow_sets |= follow_sets[rule.sym.char]
+def solve_follow_sets(rules_by_symbol, users, start, affected, first_sets, follow_sets):
+    """Computes the FOLLOW sets of the nonterminals in affected into follow_sets, like solve_first_sets.
+    users maps each nonterminal to the nonterminals with rules using it and start is the start symbol's char.
+    first_sets must be final for every nonterminal following an affected one in those rules, and follow_sets for
+    every nonterminal (other than the affected ones) that the affected ones depend on.
+    """
+    bit_ids = {}
+    direct = {A: 0 for A in affected}
+    dependencies = {A: set() for A in affected}
+    if start in affected:
+        direct[start] = _bit(bit_ids, END_SYMBOL)
+
+    lhs = set()
+    for A in affected:
+        lhs.update(users.get(A, ()))
+
+    for B in lhs:
+        for rule in rules_by_symbol[B]:
+            # only the part of the rule from its first affected symbol on matters
+            start_ind = _first_index_of(rule.exp_syms, affected)
+            if start_ind is None:
+                continue
+
+            trailer = 0
+            trailer_nullable = True
+
+            for sym in reversed(rule.exp_syms[start_ind:]):
+                if type(sym) is not NSym:
+                    if sym.char != EPSILON_CHAR:
+                        trailer = _bit(bit_ids, sym.char)
+                        trailer_nullable = False
+
+                    continue
+
+                X = sym.char
+                if X in affected:
+                    direct[X] |= trailer
+                    if trailer_nullable and X != B:
+                        if B in affected:
+                            dependencies[X].add(B)
+                        else:
+                            direct[X] |= _to_bits(bit_ids, follow_sets[B])
+
+                sym_first = first_sets[X]
+                sym_first_bits = _to_bits(bit_ids, sym_first - set([EPSILON_CHAR]))
+                if EPSILON_CHAR in sym_first:
+                    trailer |= sym_first_bits
+                else:
+                    trailer = sym_first_bits
+                    trailer_nullable = False
 
-        else:
-            i = sym_ind + 1
-            has_trailing_epsilon = True
-            while has_trailing_epsilon and i < len(rule.exp_syms):
-                has_trailing_epsilon = False
-                next_sym = rule.exp_syms[i]
+    follow_bits = propagate_bits(dependencies, direct)
+    terminals = list(bit_ids)
+    changed = set()
+    for A in affected:
+        follow_set = _from_bits(follow_bits[A], terminals)
+        if follow_set != follow_sets.get(A):
+            follow_sets[A] = follow_set
+            changed.add(A)
 
-                if type(next_sym) is TSym:
-                    sym_follow_sets.add(next_sym.char)
+    return changed
 
-                else:
-                    next_terms = first_sets[next_sym.char]
-                    if EPSILON_CHAR in next_terms:
-                        has_trailing_epsilon = True
-                        to_add = next_terms.copy()
-                        to_add.remove(EPSILON_CHAR)
+def _first_index_of(syms, nonterminals):
+    for i, sym in enumerate(syms):
+        if type(sym) is NSym and sym.char in nonterminals:
+            return i
 
-                        sym_follow_sets |= to_add
+    return None
 
-                    else:
-                        to_add = next_terms.copy()
+def _bit(bit_ids, char):
+    if char not in bit_ids:
+        bit_ids[char] = len(bit_ids)
 
-                        sym_follow_sets |= to_add
+    return 1 << bit_ids[char]
 
-                i += 1
+def _to_bits(bit_ids, chars):
+    bits = 0
+    for c in chars:
+        bits |= _bit(bit_ids, c)
 
-            if has_trailing_epsilon and i is len(rule.exp_syms) and len(sym_follow_sets) is 0:
-                if rule.sym.char not in follow_sets:
-                    follow_sets = _add_sym_to_follow_sets(rule.sym, rules, first_sets, follow_sets)
+    return bits
 
-                sym_follow_sets |= follow_sets[rule.sym.char]
+def _from_bits(bits, terminals):
+    chars = set()
+    while bits:
+        low = bits & -bits
+        chars.add(terminals[low.bit_length() - 1])
+        bits ^= low
 
-    follow_sets[sym.char] = sym_follow_sets
-    return follow_sets
+    return chars
 
-def _get_next_terminals(rules, first_sets, syms, start_ind):
+def _get_next_terminals(first_sets, syms, start_ind):
     """Given a sequence of symbols and previously calculated first_sets, will determine all terminals that
     follow immediately after the specified index. The returned set will include EPSILON_CHAR if it's possible
     for no terminal to follow the specified index based on the syms provided.
 
-    This method returns a tuple of (first_sets, next_terminals), where first_sets will include any new
-    first_sets computed and next_terminals is the aforementioned set
-
-    This method is used in first_set computation, follow_set computation, and parse_table computation.
+    This method is used in parse_table computation.
     """
     next_terminals = set()
 
-    i = start_ind
-    has_trailing_epsilon = True
-    while has_trailing_epsilon and i < len(syms):
-        next_sym = syms[i]
-        has_trailing_epsilon = False
-
-        if type(next_sym) is TSym:
-            next_terminals.add(next_sym.char)
+    for sym in syms[start_ind:]:
+        if type(sym) is not NSym:
+            if sym.char != EPSILON_CHAR:
+                next_terminals.add(sym.char)
+                return next_terminals
 
         else:
-            if next_sym.char not in first_sets:
-                first_sets = _add_sym_to_first_sets(next_sym, rules, first_sets)
-
-            next_sym_first_chars = first_sets[next_sym.char]
-            if EPSILON_CHAR in next_sym_first_chars:
-                has_trailing_epsilon = True
-                to_add = next_sym_first_chars.copy()
-                to_add.remove(EPSILON_CHAR)
-
-                next_terminals |= to_add
-
-            else:
-                to_add = next_sym_first_chars.copy()
-
-                next_terminals |= to_add
-
-        i += 1
+            sym_first_chars = first_sets.get(sym.char, set())
+            next_terminals |= sym_first_chars - set([EPSILON_CHAR])
 
-    if has_trailing_epsilon and i is len(syms):
-        next_terminals.add(EPSILON_CHAR)
+            if EPSILON_CHAR not in sym_first_chars:
+                return next_terminals
 
-    return (first_sets, next_terminals)
+    next_terminals.add(EPSILON_CHAR)
+    return next_terminals
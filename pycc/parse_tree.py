@@ -0,0 +1,103 @@
+"""Module for storing derivation trees built while parsing.
+
+Nodes live in a struct-of-arrays arena: node i is described by the i-th entry of each array('i') column, so a
+tree of a million nodes costs a few tens of megabytes rather than a million Python objects. The children of a
+node are allocated together when it's predicted, so they always occupy a contiguous run of indices.
+
+Node objects are lightweight views onto the arena, created only as the tree is walked.
+"""
+
+from array import array
+from itertools import repeat
+
+class ParseTree:
+    def __init__(self, table):
+        self.table = table
+
+        self.symbol = array('i')
+        self.parent = array('i')
+        self.first_child = array('i')
+        self.child_count = array('i')
+
+        # span of input symbols [start, end) derived by each node
+        self.start = array('i')
+        self.end = array('i')
+
+    def __len__(self):
+        return len(self.symbol)
+
+    @property
+    def root(self):
+        return Node(self, 0)
+
+    def node(self, index):
+        return Node(self, index)
+
+    def add_nodes(self, symbols, parent):
+        """Allocates one node per symbol, all children of parent, and returns the index of the first.
+        """
+        first = len(self.symbol)
+        k = len(symbols)
+
+        self.symbol.extend(symbols)
+        self.parent.extend(repeat(parent, k))
+        self.first_child.extend(repeat(-1, k))
+        self.child_count.extend(repeat(0, k))
+        self.start.extend(repeat(-1, k))
+        self.end.extend(repeat(-1, k))
+
+        return first
+
+    def set_children(self, index, first, count):
+        self.first_child[index] = first
+        self.child_count[index] = count
+
+class Node:
+    __slots__ = ('tree', 'index')
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def symbol(self):
+        return self.tree.table.symbol_char(self.tree.symbol[self.index])
+
+    @property
+    def is_terminal(self):
+        return self.tree.table.is_terminal(self.tree.symbol[self.index])
+
+    @property
+    def parent(self):
+        parent = self.tree.parent[self.index]
+        return None if parent < 0 else Node(self.tree, parent)
+
+    @property
+    def children(self):
+        first = self.tree.first_child[self.index]
+        return [Node(self.tree, i) for i in range(first, first + self.tree.child_count[self.index])]
+
+    @property
+    def span(self):
+        return (self.tree.start[self.index], self.tree.end[self.index])
+
+    def walk(self):
+        """Yields this node and all of its descendants in pre-order.
+        """
+        tree = self.tree
+        pending = [self.index]
+        while len(pending) > 0:
+            i = pending.pop()
+            yield Node(tree, i)
+
+            first = tree.first_child[i]
+            pending.extend(range(first + tree.child_count[i] - 1, first - 1, -1))
+
+    def __eq__(self, other):
+        return isinstance(other, Node) and self.tree is other.tree and self.index == other.index
+
+    def __hash__(self):
+        return hash((id(self.tree), self.index))
+
+    def __repr__(self):
+        return "Node({!r}, {}, {})".format(self.symbol, *self.span)
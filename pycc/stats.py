@@ -0,0 +1,96 @@
+"""Module for collecting parser instrumentation.
+
+A ParseStats passed to LLParser records how long each construction phase took and, for every parse run through
+parse() or a stream parse, how the driver spent its time: predicts per nonterminal, matches per terminal, hits
+and misses per (nonterminal, lookahead) table cell and the maximum stack depth. Parsers without a ParseStats run
+the uninstrumented driver, so instrumentation costs nothing when it's disabled.
+
+Counts are kept by integer id while parsing and only translated to symbol chars when read.
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+class ParseStats:
+    def __init__(self):
+        self.table = None
+        self.phase_times = {}
+        self.reset()
+
+    def reset(self):
+        """Clears the parse counters. Phase times are kept.
+        """
+        self.parses = 0
+        self.accepted = 0
+        self.max_stack_depth = 0
+
+        # Counters keyed by table cell index and terminal id
+        self.cell_hit_counts = Counter()
+        self.cell_miss_counts = Counter()
+        self.match_counts = Counter()
+
+    def bind(self, table):
+        """Sets the CompiledTable used to translate ids back to symbol chars.
+        """
+        self.table = table
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager that adds the time spent in its body to phase_times[name].
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0) + time.perf_counter() - start
+
+    def cell_hits(self):
+        """Map of (nonterminal, lookahead) -> number of predicts made through that cell.
+        """
+        return self._by_cell(self.cell_hit_counts)
+
+    def cell_misses(self):
+        """Map of (nonterminal, lookahead) -> number of parses rejected on a miss at that cell.
+        """
+        return self._by_cell(self.cell_miss_counts)
+
+    def hot_cells(self, n = 10):
+        """The n most used table cells as [((nonterminal, lookahead), count), ...].
+        """
+        return [(self._cell_key(cell), count) for cell, count in self.cell_hit_counts.most_common(n)]
+
+    def predicts(self):
+        """Map of nonterminal -> number of times it was predicted.
+        """
+        predicts = Counter()
+        for (nonterm, _), count in self.cell_hits().items():
+            predicts[nonterm] += count
+
+        return dict(predicts)
+
+    def matches(self):
+        """Map of terminal -> number of times it was matched.
+        """
+        return {self.table.terminals[a]: count for a, count in self.match_counts.items()}
+
+    def as_dict(self):
+        """All stats as plain (JSON serializable) data.
+        """
+        return {
+            'parses': self.parses,
+            'accepted': self.accepted,
+            'max_stack_depth': self.max_stack_depth,
+            'phase_times': dict(self.phase_times),
+            'predicts': self.predicts(),
+            'matches': self.matches(),
+            'cell_hits': [[nonterm, term, count] for (nonterm, term), count in self.cell_hits().items()],
+            'cell_misses': [[nonterm, term, count] for (nonterm, term), count in self.cell_misses().items()],
+        }
+
+    def _cell_key(self, cell):
+        n_terminals = self.table.n_terminals
+        return (self.table.nonterminals[cell // n_terminals], self.table.terminals[cell % n_terminals])
+
+    def _by_cell(self, counts):
+        return {self._cell_key(cell): count for cell, count in counts.items()}
@@ -0,0 +1,103 @@
+import unittest
+from pycc.ll_parser import LLParser
+from pycc.grammar import *
+from pycc.grammar_normalization import NormalizationPipeline
+from test.test_helpers import *
+
+def _with_actions(grammar, actions):
+    return Grammar([rule._replace(action=action) for rule, action in zip(grammar.rules, actions)],
+                   grammar.start_symbol)
+
+_arithmetic_actions = [
+    lambda t, h: t + h,        # E -> TH
+    lambda plus, t, h: t + h,  # H -> +TH
+    lambda: 0,                 # H -> epsilon
+    lambda f, g: f * g,        # T -> FG
+    lambda times, f, g: f * g, # G -> *FG
+    lambda: 1,                 # G -> epsilon
+    lambda l, e, r: e,         # F -> (E)
+    lambda c: int(c),          # F -> 0
+]
+
+class TestEvaluate(unittest.TestCase):
+    def test_integration_grammar(self):
+        parser = LLParser(_with_actions(integration_test_grammar, _arithmetic_actions))
+
+        self.assertEqual(parser.evaluate('0'), 0)
+        self.assertEqual(parser.evaluate('(0+0)*(0+0)'), 0)
+
+    def test_digits(self):
+        grammar = build_grammar(
+            [('E', 'TH'),
+             ('H', '+TH'),
+             ('H', EPSILON_CHAR),
+             ('T', 'FG'),
+             ('G', '*FG'),
+             ('G', EPSILON_CHAR),
+             ('F', '(E)'),
+             ('F', '1'),
+             ('F', '2')])
+        parser = LLParser(_with_actions(grammar, _arithmetic_actions + [lambda c: int(c)]))
+
+        self.assertEqual(parser.evaluate('1+2*2'), 5)
+        self.assertEqual(parser.evaluate('(1+2)*2'), 6)
+        self.assertEqual(parser.evaluate('((2))*(2*(1+1))+1'), 9)
+
+    def test_default_values(self):
+        parser = LLParser(build_grammar(
+            [('A', 'bC'),
+             ('C', 'c'),
+             ('C', EPSILON_CHAR)]))
+
+        self.assertEqual(parser.evaluate('bc'), ('b', 'c'))
+        self.assertEqual(parser.evaluate('b'), ('b', None))
+
+    def test_bytes(self):
+        parser = LLParser(build_grammar(
+            [('A', 'bC'),
+             ('C', 'c'),
+             ('C', EPSILON_CHAR)]))
+
+        self.assertEqual(parser.evaluate(b'bc'), ('b', 'c'))
+        self.assertEqual(parser.evaluate(bytearray(b'bc')), ('b', 'c'))
+        self.assertEqual(parser.evaluate(memoryview(b'b')), ('b', None))
+
+    def test_rejects(self):
+        parser = LLParser(_with_actions(integration_test_grammar, _arithmetic_actions))
+
+        with self.assertRaises(ValueError):
+            parser.evaluate('0+')
+        with self.assertRaises(ValueError):
+            parser.evaluate('(0+0)*0)')
+
+    def test_rewritten_rule_actions(self):
+        grammar = build_grammar(
+            [('A', 'A+b'),
+             ('A', 'b')])
+        parser = LLParser(Grammar([grammar.rules[0]._replace(action=lambda a, plus, b: a), grammar.rules[1]],
+                                  grammar.start_symbol))
+
+        self.assertTrue(parser.parse('b+b'))
+        with self.assertRaises(ValueError):
+            parser.evaluate('b+b')
+
+class TestPipeline(unittest.TestCase):
+    def test_shared_pipeline(self):
+        pipeline = NormalizationPipeline()
+        first = LLParser(_with_actions(integration_test_grammar, _arithmetic_actions), pipeline=pipeline)
+
+        # equal rules with the same actions, but distinct objects
+        second = LLParser(_with_actions(build_grammar(
+            [('E', 'TH'),
+             ('H', '+TH'),
+             ('H', EPSILON_CHAR),
+             ('T', 'FG'),
+             ('G', '*FG'),
+             ('G', EPSILON_CHAR),
+             ('F', '(E)'),
+             ('F', '0')]), _arithmetic_actions), pipeline=pipeline)
+
+        self.assertEqual(first.evaluate('(0+0)*0'), 0)
+        self.assertEqual(second.evaluate('(0+0)*0'), 0)
+        self.assertIsNot(first.grammar, second.grammar)
+        self.assertEqual(first.grammar, second.grammar)
@@ -0,0 +1,38 @@
+import random
+import unittest
+from pycc.batch import np, recognize_batch
+from pycc.ll_parser import LLParser
+from test.test_helpers import *
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestRecognizeBatch(unittest.TestCase):
+    def test_matches_parse(self):
+        parser = LLParser(integration_test_grammar)
+        inputs = ['0', '0+0*0', '(0+0)*(0+0)', '', '0+', '(0+0', '(0+0)*0)', 'x', '0x', '中']
+
+        self.assertEqual(list(parser.parse_batch(inputs)), [parser.parse(s) for s in inputs])
+
+    def test_random_inputs(self):
+        parser = LLParser(integration_test_grammar)
+        rng = random.Random(0)
+        inputs = [''.join(rng.choice('0+*()') for _ in range(rng.randrange(12))) for _ in range(2000)]
+
+        self.assertEqual(list(recognize_batch(parser.compiled, inputs, initial_depth=2)),
+                         [parser.parse(s) for s in inputs])
+
+    def test_deep_stacks(self):
+        parser = LLParser(integration_test_grammar)
+        inputs = ['(' * 100 + '0' + ')' * 100, '(' * 100 + '0' + ')' * 99, '0']
+
+        self.assertEqual(list(parser.parse_batch(inputs)), [True, False, True])
+
+    def test_bytes_inputs(self):
+        parser = LLParser(integration_test_grammar)
+        inputs = ['0+0*0', b'0+0*0', bytearray(b'(0+0'), memoryview(b'(0)'), b'', b'\xff', '0']
+
+        self.assertEqual(list(parser.parse_batch(inputs)), [parser.parse(s) for s in inputs])
+
+    def test_empty_batch(self):
+        parser = LLParser(integration_test_grammar)
+
+        self.assertEqual(len(parser.parse_batch([])), 0)
@@ -0,0 +1,30 @@
+import unittest
+from benchmarks import grammars, inputs
+from benchmarks.compare import compare
+from benchmarks.run import cases, run
+from pycc.ll_parser import LLParser
+
+class TestBenchmarkCases(unittest.TestCase):
+    def test_inputs_parse(self):
+        for name, grammar, input_sets in cases():
+            parser = LLParser(grammar)
+            for input_name, strings in input_sets.items():
+                expected = input_name != 'adversarial'
+                for s in strings:
+                    self.assertEqual(parser.parse(s), expected, (name, input_name))
+
+    def test_wide_alternatives_keywords_are_distinct(self):
+        grammar = grammars.wide_alternatives(100, width=3)
+        self.assertEqual(len(set(inputs.keywords(grammar, 100))), 100)
+
+class TestResults(unittest.TestCase):
+    def test_run_and_compare(self):
+        results = run(repeat=1)
+
+        self.assertEqual(set(results['results']), set(name for name, _, _ in cases()))
+        for phases in results['results'].values():
+            self.assertIn('build_parse_table', phases)
+            self.assertIn('left_factor', phases)
+
+        rows = compare(results, results)
+        self.assertTrue(all(ratio == 1 for (_, _, _, _, ratio) in rows))
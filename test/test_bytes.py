@@ -0,0 +1,47 @@
+import array
+import io
+import mmap
+import tempfile
+import unittest
+from pycc.ll_parser import LLParser
+from test.test_helpers import *
+
+_INPUTS = ['0', '0+0*0', '(0+0)*(0+0)', '0+', '(0+0', '(0+0)*0)', '0x']
+
+class TestParseBytes(unittest.TestCase):
+    def test_bytes_like(self):
+        parser = LLParser(integration_test_grammar)
+
+        for s in _INPUTS:
+            data = s.encode('ascii')
+            for buf in [data, bytearray(data), memoryview(data)]:
+                self.assertEqual(parser.parse(buf), parser.parse(s), (s, type(buf)))
+
+    def test_non_byte_memoryview(self):
+        parser = LLParser(integration_test_grammar)
+        signed = array.array('b', b'0+0')
+
+        self.assertTrue(parser.parse(memoryview(signed)))
+
+    def test_mmap(self):
+        parser = LLParser(integration_test_grammar)
+
+        with tempfile.TemporaryFile() as f:
+            f.write(b'(0+0)*' * 1000 + b'0')
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self.assertTrue(parser.parse(mm))
+                self.assertIsNotNone(parser.parse_tree(mm))
+
+    def test_binary_stream(self):
+        parser = LLParser(integration_test_grammar)
+
+        self.assertTrue(parser.parse_stream(io.BytesIO(b'0*0+' * 1000 + b'0'), chunk_size=7))
+        self.assertFalse(parser.parse_stream(io.BytesIO(b'0*0+' * 1000), chunk_size=7))
+
+    def test_latin1_terminals(self):
+        parser = LLParser(build_grammar([('A', 'é')]))
+
+        self.assertTrue(parser.parse(b'\xe9'))
+        self.assertTrue(parser.parse('é'))
+        self.assertFalse(parser.parse('é'.encode('utf-8')))
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pycc.cache
+from pycc.cache import *
+from pycc.ll_parser import LLParser
+from test.test_helpers import *
+
+class TestGrammarFingerprint(unittest.TestCase):
+    def test_stable(self):
+        self.assertEqual(grammar_fingerprint(integration_test_grammar),
+                         grammar_fingerprint(build_grammar([('E', 'TH'),
+                                                            ('H', '+TH'),
+                                                            ('H', EPSILON_CHAR),
+                                                            ('T', 'FG'),
+                                                            ('G', '*FG'),
+                                                            ('G', EPSILON_CHAR),
+                                                            ('F', '(E)'),
+                                                            ('F', '0')])))
+
+    def test_distinguishes_grammars(self):
+        self.assertNotEqual(grammar_fingerprint(build_grammar([('A', 'b')])),
+                            grammar_fingerprint(build_grammar([('A', 'c')])))
+
+        # same rules, different symbol kinds
+        self.assertNotEqual(grammar_fingerprint(build_grammar([('A', 'B'), ('B', 'b')])),
+                            grammar_fingerprint(Grammar([Rule(NSym('A'), [TSym('B')]),
+                                                         Rule(NSym('B'), [TSym('b')])],
+                                                        NSym('A'))))
+
+    def test_distinguishes_compiler_versions(self):
+        fingerprint = grammar_fingerprint(integration_test_grammar)
+
+        with mock.patch.object(pycc.cache, 'COMPILER_VERSION', COMPILER_VERSION + 1):
+            self.assertNotEqual(grammar_fingerprint(integration_test_grammar), fingerprint)
+
+class TestTableFiles(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'table.pycc')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        table = LLParser(integration_test_grammar).compiled
+        save_table(table, self.path)
+        loaded = load_table(self.path)
+
+        self.assertEqual(loaded.terminals, table.terminals)
+        self.assertEqual(loaded.nonterminals, table.nonterminals)
+        self.assertEqual(loaded.start, table.start)
+        self.assertEqual(loaded.table, table.table)
+        self.assertEqual(loaded.symbols, table.symbols)
+        self.assertEqual(loaded.offsets, table.offsets)
+
+    def test_rejects_bad_files(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a table at all, just some bytes')
+
+        with self.assertRaises(ValueError):
+            load_table(self.path)
+
+        self.assertIsNone(load_cached_table(self.dir.name, integration_test_grammar))
+
+class TestParserCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_warm_start(self):
+        cold = LLParser(integration_test_grammar, cache_dir=self.dir.name)
+        self.assertTrue(os.path.exists(cache_path(self.dir.name, integration_test_grammar)))
+
+        warm = LLParser(integration_test_grammar, cache_dir=self.dir.name)
+        self.assertIsNone(warm._grammar)
+        self.assertTrue(warm.parse('(0+0)*0'))
+        self.assertFalse(warm.parse('(0+0'))
+
+        # analysis still happens on demand
+        self.assertEqual(warm.parse_table, cold.parse_table)
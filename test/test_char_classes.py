@@ -0,0 +1,123 @@
+import tempfile
+import unittest
+from pycc.batch import np
+from pycc.cache import load_table, save_table
+from pycc.charset import parse_set
+from pycc.ll_parser import LLParser, ENTER, EXIT, TOKEN
+from test.test_helpers import *
+
+# Either 0, a number without leading zeros or an identifier
+number_or_identifier_grammar = Grammar(
+    [Rule(NSym('S'), [NSym('N')]),
+     Rule(NSym('S'), [CSym('[a-z_]'), NSym('I')]),
+     Rule(NSym('N'), [TSym('0')]),
+     Rule(NSym('N'), [CSym('[1-9]'), NSym('D')]),
+     Rule(NSym('D'), [CSym('\\d'), NSym('D')]),
+     Rule(NSym('D'), [TSym(EPSILON_CHAR)]),
+     Rule(NSym('I'), [CSym('\\w'), NSym('I')]),
+     Rule(NSym('I'), [TSym(EPSILON_CHAR)])],
+    NSym('S'))
+
+accepted = ['0', '7', '1234567890', 'a', 'a1_B', '_']
+rejected = ['', '01', '1a', 'A', 'a-b', 'é', '1一']
+
+class TestParseSet(unittest.TestCase):
+    def test_class_and_escape(self):
+        self.assertEqual(parse_set('[0-9]'), ((ord('0'), ord('9')),))
+        self.assertEqual(parse_set('\\d'), ((ord('0'), ord('9')),))
+
+    def test_invalid(self):
+        for pattern in ['a', '[0-9]x', '', '[0-9']:
+            with self.assertRaises(ValueError):
+                parse_set(pattern)
+
+class TestCharClasses(unittest.TestCase):
+    def test_parse(self):
+        parser = LLParser(number_or_identifier_grammar)
+
+        for s in accepted:
+            self.assertTrue(parser.parse(s), s)
+            self.assertTrue(parser.parse(s.encode('ascii')), s)
+        for s in rejected:
+            self.assertFalse(parser.parse(s), s)
+
+    def test_columns_are_classes(self):
+        table = LLParser(number_or_identifier_grammar).compiled
+
+        # unknown, END, then the classes 0, [1-9], [A-Z] and [a-z_]
+        self.assertEqual(table.terminals, [None, END_SYMBOL, '0', '[1-9]', '\\w', '[a-z_]'])
+
+        # \d and \w span more than one class, so they're lowered into nonterminals
+        self.assertEqual(table.nonterminals, ['S', 'N', 'D', 'I', '\\d', '\\w'])
+
+    def test_evaluate(self):
+        parser = LLParser(number_or_identifier_grammar)
+
+        self.assertEqual(parser.evaluate('12'), ('1', ('2', None)))
+
+    def test_overlap_conflict(self):
+        grammar = Grammar(
+            [Rule(NSym('S'), [CSym('[a-z]')]),
+             Rule(NSym('S'), [TSym('x'), TSym('y')])],
+            NSym('S'))
+
+        with self.assertRaises(ValueError):
+            LLParser(grammar)
+
+    def test_multi_char_terminals(self):
+        grammar = Grammar(
+            [Rule(NSym('S'), [CSym('[a-z]')]),
+             Rule(NSym('S'), [TSym('NUMBER')])],
+            NSym('S'))
+
+        with self.assertRaises(ValueError):
+            LLParser(grammar)
+
+    def test_empty_class(self):
+        grammar = Grammar(
+            [Rule(NSym('S'), [CSym('[a-z]')]),
+             Rule(NSym('S'), [CSym('[^\\d\\D]')])],
+            NSym('S'))
+
+        with self.assertRaises(ValueError):
+            LLParser(grammar)
+
+    def test_parse_tree(self):
+        tree = LLParser(number_or_identifier_grammar).parse_tree('12')
+
+        self.assertEqual([(node.symbol, node.is_terminal, node.span) for node in tree.root.walk()],
+                         [('S', False, (0, 2)), ('N', False, (0, 2)), ('[1-9]', True, (0, 1)),
+                          ('D', False, (1, 2)), ('\\d', True, (1, 2)), ('D', False, (2, 2))])
+
+    def test_events(self):
+        parser = LLParser(number_or_identifier_grammar)
+        events = [(kind, parser.compiled.symbol_char(sym), i) for kind, sym, i in parser.iter_events('12')]
+
+        self.assertEqual(events,
+                         [(ENTER, 'S', 0), (ENTER, 'N', 0), (TOKEN, '[1-9]', 0), (ENTER, 'D', 1),
+                          (TOKEN, '\\d', 1), (ENTER, 'D', 2), (EXIT, 'D', 2), (EXIT, 'D', 2), (EXIT, 'N', 2),
+                          (EXIT, 'S', 2)])
+
+    def test_cache_round_trip(self):
+        table = LLParser(number_or_identifier_grammar).compiled
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = cache_dir + '/table.pycc'
+            save_table(table, path)
+            loaded = load_table(path)
+
+        self.assertEqual(loaded.n_lowered, 2)
+
+        parser = LLParser(number_or_identifier_grammar)
+        parser.compiled = loaded
+        for s in accepted:
+            self.assertTrue(parser.parse(s), s)
+        for s in rejected:
+            self.assertFalse(parser.parse(s), s)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_batch(self):
+        parser = LLParser(number_or_identifier_grammar)
+
+        self.assertEqual(list(parser.parse_batch(accepted + rejected)),
+                         [True] * len(accepted) + [False] * len(rejected))
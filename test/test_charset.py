@@ -0,0 +1,44 @@
+import unittest
+from pycc.charset import *
+
+class TestParseClass(unittest.TestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_class('[a-c_x]', 0), (((ord('_'), ord('_')), (ord('a'), ord('c')), (ord('x'), ord('x'))), 7))
+
+    def test_negated(self):
+        (chars, i) = parse_class('[^"]', 0)
+        self.assertEqual(i, 4)
+        self.assertFalse(contains(chars, '"'))
+        self.assertTrue(contains(chars, 'a'))
+        self.assertTrue(contains(chars, '\U0001F600'))
+
+    def test_literal_dash_and_bracket(self):
+        (chars, _) = parse_class('[]a-]', 0)
+        self.assertEqual(chars, from_chars(']a-'))
+
+    def test_escapes(self):
+        (chars, _) = parse_class('[\\d.]', 0)
+        self.assertEqual(chars, from_chars('0123456789.'))
+
+    def test_unterminated(self):
+        with self.assertRaises(ValueError):
+            parse_class('[abc', 0)
+
+class TestPartition(unittest.TestCase):
+    def test_overlapping(self):
+        lower = parse_class('[a-z]', 0)[0]
+        a = from_chars('a')
+        (class_map, members) = partition([lower, a])
+
+        # 'a', the rest of a-z, and everything else
+        self.assertEqual(class_map.n_classes, 3)
+        self.assertEqual(members[1], set([class_map.class_of('a')]))
+        self.assertEqual(members[0], set([class_map.class_of('a'), class_map.class_of('q')]))
+        self.assertEqual(class_map.class_of('A'), 0)
+        self.assertEqual(class_map.class_of('中'), 0)
+
+    def test_non_latin1(self):
+        (class_map, members) = partition([from_chars('中'), ANY])
+
+        self.assertNotEqual(class_map.class_of('中'), class_map.class_of('丮'))
+        self.assertEqual(class_map.class_of('a'), class_map.class_of('丮'))
@@ -0,0 +1,53 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from pycc.codegen import *
+from test.test_helpers import *
+
+_INPUTS = ['0', '0+0*0', '(0+0)*(0+0)', '((((0))))', '', '0+', '(0+0', '(0+0)*0)', '0x', 'x']
+
+def _load(path):
+    spec = importlib.util.spec_from_file_location('generated_parser', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class TestGenerate(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def assertMatchesParser(self, grammar, mode, inputs):
+        path = os.path.join(self.dir.name, 'parser_{}.py'.format(mode))
+        generate(grammar, path, mode)
+        module = _load(path)
+
+        parser = LLParser(grammar)
+        for s in inputs:
+            self.assertEqual(module.parse(s), parser.parse(s), s)
+
+    def test_table(self):
+        self.assertMatchesParser(integration_test_grammar, 'table', _INPUTS)
+
+    def test_recursive(self):
+        self.assertMatchesParser(integration_test_grammar, 'recursive', _INPUTS)
+
+    def test_normalizes_grammar(self):
+        grammar = build_grammar(
+            [('A', 'A+b'),
+             ('A', 'b')])
+        inputs = ['b', 'b+b+b', 'b+', 'bb', '']
+
+        self.assertMatchesParser(grammar, 'table', inputs)
+        self.assertMatchesParser(grammar, 'recursive', inputs)
+
+    def test_no_pycc_dependency(self):
+        for mode in ['table', 'recursive']:
+            self.assertNotIn('pycc', generate_source(integration_test_grammar, mode).replace('by pycc', ''))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            generate_source(integration_test_grammar, 'lalr')
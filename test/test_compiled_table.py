@@ -0,0 +1,104 @@
+import unittest
+from pycc.compiled_table import *
+from pycc.parse_table import build_parse_table
+from pycc.constants import *
+from pycc.ll_parser import LLParser
+from test.test_helpers import *
+
+def _compile(grammar):
+    return compile_parse_table(grammar, build_parse_table(grammar))
+
+class TestCompileParseTable(unittest.TestCase):
+    def test_symbol_ids(self):
+        table = _compile(integration_test_grammar)
+
+        self.assertEqual(table.terminals, [None, END_SYMBOL, '+', '*', '(', ')', '0'])
+        self.assertEqual(table.nonterminals, ['E', 'H', 'T', 'G', 'F'])
+        self.assertEqual(table.symbol_char(table.start), 'E')
+        self.assertEqual(len(table.table), 5 * 7)
+
+    def test_productions_are_reversed(self):
+        table = _compile(integration_test_grammar)
+        ids = table.terminal_ids
+
+        # F -> (E) is the second to last rule
+        p = table.lookup(table.start + 4, ids['('])
+        self.assertEqual(p, 6)
+        self.assertEqual([table.symbol_char(s) for s in table.symbols[table.offsets[p]:table.offsets[p + 1]]],
+                         [')', 'E', '('])
+
+    def test_epsilon_production_is_empty(self):
+        table = _compile(integration_test_grammar)
+
+        p = table.lookup(table.start + 1, END_TERMINAL)
+        self.assertEqual(table.offsets[p], table.offsets[p + 1])
+
+    def test_misses(self):
+        table = _compile(integration_test_grammar)
+
+        self.assertEqual(table.lookup(table.start, table.terminal_ids['+']), -1)
+        self.assertEqual(table.lookup(table.start, UNKNOWN_TERMINAL), -1)
+
+    def test_encode(self):
+        table = _compile(integration_test_grammar)
+
+        self.assertEqual(list(table.encode('0+x')),
+                         [table.terminal_ids['0'], table.terminal_ids['+'], UNKNOWN_TERMINAL])
+
+    def test_encode_bytes(self):
+        table = _compile(integration_test_grammar)
+        expected = list(table.encode('0+x'))
+
+        self.assertEqual(list(table.encode(b'0+x')), expected)
+        self.assertEqual(list(table.encode(bytearray(b'0+x'))), expected)
+        self.assertEqual(list(table.encode(memoryview(b'0+x'))), expected)
+        self.assertEqual(list(table.encode(b'\xff')), [UNKNOWN_TERMINAL])
+
+class TestPredictionChains(unittest.TestCase):
+    def _chain(self, table, nonterm, term):
+        chains = table.chains()
+        cell = (table.start + table.nonterminals.index(nonterm) - table.n_terminals) * table.n_terminals
+        k = chains.table[cell + (END_TERMINAL if term == END_SYMBOL else table.terminal_ids[term])]
+
+        return ([table.symbol_char(s) for s in chains.symbols[chains.offsets[k]:chains.offsets[k + 1]]],
+                bool(chains.consumes[k]))
+
+    def test_chain_to_match(self):
+        table = _compile(integration_test_grammar)
+
+        # E -> TH, T -> FG, F -> 0, then 0 is matched
+        self.assertEqual(self._chain(table, 'E', '0'), (['H', 'G'], True))
+        self.assertEqual(self._chain(table, 'E', '('), (['H', 'G', ')', 'E'], True))
+
+    def test_chain_to_epsilon(self):
+        table = _compile(integration_test_grammar)
+
+        self.assertEqual(self._chain(table, 'H', END_SYMBOL), ([], False))
+        self.assertEqual(self._chain(table, 'G', '+'), ([], False))
+
+    def test_misses(self):
+        table = _compile(integration_test_grammar)
+        chains = table.chains()
+
+        for cell, p in enumerate(table.table):
+            self.assertEqual(chains.table[cell] < 0, p < 0)
+
+    def test_chain_through_nullable_nonterminals(self):
+        table = _compile(build_grammar([('S', 'AAA'), ('A', EPSILON_CHAR)]))
+
+        self.assertEqual(self._chain(table, 'S', END_SYMBOL), ([], False))
+
+    def test_chain_length_is_capped(self):
+        n = 2 * MAX_CHAIN_STEPS + 10
+        rules = [Rule(NSym('N{}'.format(i)), [NSym('N{}'.format(i + 1))]) for i in range(n)]
+        rules.append(Rule(NSym('N{}'.format(n)), [TSym('0')]))
+        table = _compile(Grammar(rules, NSym('N0')))
+
+        (stack, consumed) = self._chain(table, 'N0', '0')
+        self.assertFalse(consumed)
+        self.assertEqual(len(stack), 1)
+        self.assertEqual(self._chain(table, 'N{}'.format(n - MAX_CHAIN_STEPS + 1), '0'), ([], True))
+
+        parser = LLParser(Grammar(rules, NSym('N0')))
+        self.assertTrue(parser.parse('0'))
+        self.assertFalse(parser.parse('00'))
@@ -0,0 +1,54 @@
+import unittest
+from pycc.ll_parser import LLParser, ENTER, EXIT, TOKEN
+from test.test_helpers import *
+
+def _events(parser, s):
+    return [(kind, parser.compiled.symbol_char(sym), i) for (kind, sym, i) in parser.iter_events(s)]
+
+class TestIterEvents(unittest.TestCase):
+    def test_events(self):
+        parser = LLParser(integration_test_grammar)
+
+        self.assertEqual(_events(parser, '0*0'), [
+            (ENTER, 'E', 0),
+            (ENTER, 'T', 0),
+            (ENTER, 'F', 0),
+            (TOKEN, '0', 0),
+            (EXIT, 'F', 1),
+            (ENTER, 'G', 1),
+            (TOKEN, '*', 1),
+            (ENTER, 'F', 2),
+            (TOKEN, '0', 2),
+            (EXIT, 'F', 3),
+            (ENTER, 'G', 3),
+            (EXIT, 'G', 3),
+            (EXIT, 'G', 3),
+            (EXIT, 'T', 3),
+            (ENTER, 'H', 3),
+            (EXIT, 'H', 3),
+            (EXIT, 'E', 3)])
+
+    def test_matches_parse_tree_spans(self):
+        parser = LLParser(integration_test_grammar)
+        s = '(0+0)*(0)+0'
+
+        open_nodes = []
+        spans = []
+        for (kind, sym, i) in parser.iter_events(s):
+            if kind == ENTER:
+                open_nodes.append((sym, i))
+            elif kind == EXIT:
+                (entered, start) = open_nodes.pop()
+                self.assertEqual(entered, sym)
+                spans.append((start, i))
+
+        tree = parser.parse_tree(s)
+        self.assertEqual(sorted(spans), sorted(n.span for n in tree.root.walk() if not n.is_terminal))
+
+    def test_reject(self):
+        parser = LLParser(integration_test_grammar)
+        events = parser.iter_events('0+)')
+
+        self.assertEqual(next(events), (ENTER, parser.compiled.start, 0))
+        with self.assertRaises(ValueError):
+            list(events)
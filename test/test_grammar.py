@@ -0,0 +1,93 @@
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+from pycc.grammar import *
+from test.test_helpers import *
+
+class TestGrammarIndexes(unittest.TestCase):
+    def test_rules_by_symbol(self):
+        grammar = integration_test_grammar
+
+        self.assertEqual(list(grammar.rules_by_symbol), ['E', 'H', 'T', 'G', 'F'])
+        self.assertEqual(grammar.rules_for(NSym('G')), (grammar.rules[4], grammar.rules[5]))
+        self.assertEqual(grammar.rules_for(NSym('X')), ())
+
+    def test_occurrences(self):
+        grammar = integration_test_grammar
+
+        self.assertEqual(grammar.occurrences['E'], ((6, 1),))
+        self.assertEqual(grammar.occurrences['H'], ((0, 1), (1, 2)))
+        self.assertNotIn('+', grammar.occurrences)
+
+    def test_indexes_are_read_only(self):
+        grammar = integration_test_grammar
+
+        with self.assertRaises(TypeError):
+            grammar.rules_by_symbol['X'] = ()
+        with self.assertRaises(TypeError):
+            grammar.occurrences['E'] = ()
+        with self.assertRaises(AttributeError):
+            grammar.rules_by_symbol['E'].append(grammar.rules[0])
+
+    def test_inventory(self):
+        grammar = Grammar(
+            [Rule(NSym('A'), [TSym('b'), NSym('C')]),
+             Rule(NSym('A'), [TSym(EPSILON_CHAR)]),
+             Rule(NSym('D'), [NSym('A'), TSym('b'), TSym('c')])],
+            NSym('A'))
+
+        # C has no rules of its own, but is still a nonterminal
+        self.assertEqual(grammar.nonterminals, (NSym('A'), NSym('D'), NSym('C')))
+        self.assertEqual(grammar.terminals, (TSym('b'), TSym('c')))
+
+class TestDataModel(unittest.TestCase):
+    def test_symbols_are_interned(self):
+        self.assertIs(NSym('A'), NSym('A'))
+        self.assertIs(TSym(char='a'), TSym('a'))
+        self.assertIsNot(NSym('a'), TSym('a'))
+        self.assertNotEqual(NSym('a'), TSym('a'))
+        self.assertNotEqual(TSym('[a]'), CSym('[a]'))
+
+        self.assertIs(pickle.loads(pickle.dumps(NSym('A'))), NSym('A'))
+
+    def test_rules_are_hashable(self):
+        rule = Rule(NSym('A'), [TSym('b'), NSym('C')])
+
+        self.assertEqual(rule.exp_syms, (TSym('b'), NSym('C')))
+        self.assertEqual(rule, Rule(NSym('A'), (TSym('b'), NSym('C'))))
+        self.assertNotEqual(rule, Rule(NSym('A'), [TSym('b'), TSym('C')]))
+        self.assertEqual(len(set([rule, Rule(NSym('A'), [TSym('b'), NSym('C')])])), 1)
+
+    def test_grammars_are_hashable(self):
+        grammar = build_grammar([('E', 'TH'), ('H', '+TH'), ('H', EPSILON_CHAR), ('T', 'FG'), ('G', '*FG'),
+                                 ('G', EPSILON_CHAR), ('F', '(E)'), ('F', '0')])
+
+        self.assertEqual(grammar, integration_test_grammar)
+        self.assertEqual({integration_test_grammar: 1}[grammar], 1)
+        self.assertNotEqual(grammar, Grammar(grammar.rules[1:], grammar.start_symbol))
+
+    def test_immutable(self):
+        rule = Rule(NSym('A'), [TSym('b')])
+        grammar = Grammar([rule], NSym('A'))
+
+        for obj, attr in [(rule, 'sym'), (TSym('b'), 'char'), (grammar, 'rules')]:
+            with self.assertRaises(AttributeError):
+                setattr(obj, attr, None)
+            with self.assertRaises(AttributeError):
+                delattr(obj, attr)
+
+        self.assertEqual(hash(rule), hash(Rule(NSym('A'), [TSym('b')])))
+
+    def test_pickle_across_processes(self):
+        # hashes depend on the hash seed, so they mustn't travel with a pickled rule or grammar
+        script = ("import pickle, sys; from pycc.grammar import *; "
+                  "sys.stdout.buffer.write(pickle.dumps(Grammar([Rule(NSym('A'), [TSym('b')])], NSym('A'))))")
+        env = dict(os.environ, PYTHONHASHSEED='1234')
+        output = subprocess.run([sys.executable, '-c', script], env=env, check=True, stdout=subprocess.PIPE).stdout
+        grammar = pickle.loads(output)
+
+        self.assertEqual(grammar, Grammar([Rule(NSym('A'), [TSym('b')])], NSym('A')))
+        self.assertIn(Rule(NSym('A'), [TSym('b')]), set(grammar.rules))
+        self.assertEqual(grammar.rules_by_symbol['A'], (Rule(NSym('A'), [TSym('b')]),))
@@ -73,8 +73,98 @@ class TestLeftFactor(unittest.TestCase):
 
         self.assertEqual(left_factor(grammar),
                          build_grammar(
-                             [('A', 'bcB'),
-                              ('B', EPSILON_CHAR),
+                             [('A', 'bB'),
+                              ('B', 'cC'),
+                              ('B', 'd'),
+                              ('C', EPSILON_CHAR),
+                              ('C', 'e'),
+                              ('C', 'f')]))
+
+    def test_epsilon_alternative(self):
+        grammar = build_grammar(
+            [('A', 'bc'),
+             ('A', EPSILON_CHAR),
+             ('A', 'bd')])
+
+        self.assertEqual(left_factor(grammar),
+                         build_grammar(
+                             [('A', EPSILON_CHAR),
+                              ('A', 'bB'),
+                              ('B', 'c'),
+                              ('B', 'd')]))
+
+    def test_duplicate_alternatives(self):
+        grammar = build_grammar(
+            [('A', 'bc'),
+             ('A', 'bc')])
+
+        self.assertEqual(left_factor(grammar), build_grammar([('A', 'bc')]))
+
+    def test_shared_prefix_chain(self):
+        grammar = build_grammar(
+            [('A', 'bcde'),
+             ('A', 'bcdf'),
+             ('A', 'g')])
+
+        self.assertEqual(left_factor(grammar),
+                         build_grammar(
+                             [('A', 'bcdB'),
+                              ('A', 'g'),
                               ('B', 'e'),
-                              ('B', 'f'),
-                              ('A', 'bd')]))
+                              ('B', 'f')]))
+
+    def test_fresh_names_skip_used_chars(self):
+        grammar = Grammar(
+            [Rule(NSym('A'), [TSym('a')]),
+             Rule(NSym('A'), [TSym('B'), NSym('C')])],
+            NSym('A'))
+
+        self.assertEqual(next(nonterminal_generator(grammar.rules)), 'D')
+
+class TestNormalizationPipeline(unittest.TestCase):
+    def test_fresh_names(self):
+        grammar = build_grammar(
+            [('A', 'Ab'),
+             ('A', 'c'),
+             ('A', 'cd')])
+
+        self.assertEqual(NormalizationPipeline().normalize(grammar),
+                         Grammar([Rule(NSym('A'), [TSym('c'), NSym('A~F1')]),
+                                  Rule(NSym('A~F1'), [TSym('d'), NSym('A~R1')]),
+                                  Rule(NSym('A~F1'), [NSym('A~R1')]),
+                                  Rule(NSym('A~R1'), [TSym(EPSILON_CHAR)]),
+                                  Rule(NSym('A~R1'), [TSym('b'), NSym('A~R1')])],
+                                 NSym('A')))
+
+    def test_reuses_unchanged_nonterminals(self):
+        pipeline = NormalizationPipeline()
+        first = pipeline.normalize(integration_test_grammar)
+        misses = pipeline.misses
+
+        # only F's rules differ
+        variant = build_grammar(
+            [('E', 'TH'),
+             ('H', '+TH'),
+             ('H', EPSILON_CHAR),
+             ('T', 'FG'),
+             ('G', '*FG'),
+             ('G', EPSILON_CHAR),
+             ('F', '(E)'),
+             ('F', '1')])
+        second = pipeline.normalize(variant)
+
+        self.assertEqual(pipeline.misses - misses, 2)
+        self.assertEqual(first.rules[:6], second.rules[:6])
+        self.assertIs(pipeline.normalize(variant), second)
+
+    def test_taken_fresh_name(self):
+        grammar = build_grammar(
+            [('A', 'Ab'),
+             ('A', 'c')])
+        taken = Grammar(list(grammar.rules) + [Rule(NSym('A~R1'), [TSym('d')])], grammar.start_symbol)
+
+        pipeline = NormalizationPipeline()
+        pipeline.normalize(grammar)
+
+        self.assertEqual([rule.sym.char for rule in pipeline.normalize(taken).rules],
+                         ['A', 'A~R2', 'A~R2', 'A~R1'])
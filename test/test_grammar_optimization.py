@@ -0,0 +1,143 @@
+import unittest
+from pycc.grammar_optimization import *
+from pycc.grammar_normalization import left_factor, remove_left_recursion
+from pycc.ll_parser import LLParser
+from test.test_helpers import *
+
+class TestRemoveUselessSymbols(unittest.TestCase):
+    def test_remove_unreachable(self):
+        grammar = build_grammar(
+            [('A', 'b'),
+             ('C', 'd')])
+
+        self.assertEqual(remove_useless_symbols(grammar),
+                         build_grammar([('A', 'b')]))
+
+    def test_remove_unproductive(self):
+        grammar = build_grammar(
+            [('A', 'b'),
+             ('A', 'cB'),
+             ('B', 'dB')])
+
+        self.assertEqual(remove_useless_symbols(grammar),
+                         build_grammar([('A', 'b')]))
+
+class TestInlineNonterminals(unittest.TestCase):
+    def test_inline_single_rule(self):
+        grammar = build_grammar(
+            [('A', 'Bc'),
+             ('A', 'x'),
+             ('B', 'de')])
+
+        self.assertEqual(inline_nonterminals(grammar),
+                         build_grammar(
+                             [('A', 'dec'),
+                              ('A', 'x')]))
+
+    def test_inline_epsilon_rule(self):
+        grammar = build_grammar(
+            [('A', 'cB'),
+             ('B', '')])
+
+        self.assertEqual(inline_nonterminals(grammar),
+                         build_grammar([('A', 'c')]))
+
+    def test_collapse_unit_rule(self):
+        grammar = build_grammar(
+            [('A', 'B'),
+             ('A', 'x'),
+             ('B', 'y'),
+             ('B', 'z')])
+
+        self.assertEqual(inline_nonterminals(grammar),
+                         build_grammar(
+                             [('A', 'y'),
+                              ('A', 'z'),
+                              ('A', 'x')]))
+
+    def test_leave_recursive_and_shared_uses(self):
+        grammar = build_grammar(
+            [('A', 'aB'),
+             ('A', 'bB'),
+             ('B', 'xB'),
+             ('B', 'y')])
+
+        self.assertEqual(inline_nonterminals(grammar), grammar)
+
+class TestMergeEquivalentNonterminals(unittest.TestCase):
+    def test_merge(self):
+        grammar = build_grammar(
+            [('A', 'aB'),
+             ('A', 'bC'),
+             ('B', 'xB'),
+             ('B', 'y'),
+             ('C', 'xC'),
+             ('C', 'y')])
+
+        self.assertEqual(merge_equivalent_nonterminals(grammar),
+                         build_grammar(
+                             [('A', 'aB'),
+                              ('A', 'bB'),
+                              ('B', 'xB'),
+                              ('B', 'y')]))
+
+    def test_leave_nullable(self):
+        grammar = build_grammar(
+            [('A', 'aBc'),
+             ('A', 'bC'),
+             ('B', 'x'),
+             ('B', ''),
+             ('C', 'x'),
+             ('C', '')])
+
+        self.assertEqual(merge_equivalent_nonterminals(grammar), grammar)
+
+    def test_leave_class_and_terminal_with_same_char(self):
+        grammar = Grammar(
+            [Rule(NSym('A'), [TSym('a'), NSym('B')]),
+             Rule(NSym('A'), [TSym('b'), NSym('C')]),
+             Rule(NSym('B'), [TSym('[x]')]),
+             Rule(NSym('B'), [TSym('y')]),
+             Rule(NSym('C'), [CSym('[x]')]),
+             Rule(NSym('C'), [TSym('y')])],
+            NSym('A'))
+
+        self.assertEqual(merge_equivalent_nonterminals(grammar), grammar)
+
+class TestOptimize(unittest.TestCase):
+    def test_report(self):
+        normalized = left_factor(remove_left_recursion(integration_test_grammar))
+        optimized = optimize(normalized)
+
+        samples = ['0', '0+0*0', '(0+0)*(0+0)']
+        report = OptimizationReport(normalized, optimized, samples)
+
+        self.assertLess(report.nonterminals_after, report.nonterminals_before)
+        self.assertLess(report.table_entries_after, report.table_entries_before)
+        self.assertLess(report.predicts_after, report.predicts_before)
+
+    def test_same_language(self):
+        grammar = build_grammar(
+            [('E', 'E+T'),
+             ('E', 'T'),
+             ('T', 'T*F'),
+             ('T', 'F'),
+             ('F', '(E)'),
+             ('F', 'a'),
+             ('F', 'ab')])
+
+        parser = LLParser(grammar)
+        optimized = LLParser(grammar, optimize=True)
+
+        inputs = ['a', 'ab', 'a+ab*a', '(a+a)*(ab)', 'a+', '(a', 'aa', 'a*)', '', 'b']
+        for s in inputs:
+            self.assertEqual(optimized.parse(s), parser.parse(s), s)
+
+        self.assertLess(len(optimized.parse_table), len(parser.parse_table))
+
+    def test_leave_actions(self):
+        grammar = Grammar(
+            [Rule(NSym('A'), [NSym('B')], lambda b: b),
+             Rule(NSym('B'), [TSym('b')])], NSym('A'))
+
+        self.assertIs(optimize(grammar), grammar)
@@ -0,0 +1,80 @@
+import random
+import unittest
+from pycc.grammar_session import *
+from pycc.compiled_table import compile_parse_table
+from pycc.parse_table import build_first_sets, build_follow_sets, build_parse_table
+from test.test_helpers import *
+
+def _random_rule(rand, nonterminals = 'SABCD', terminals = 'xyz'):
+    exp = [NSym(c) if c in nonterminals else TSym(c)
+           for c in (rand.choice(nonterminals + terminals) for _ in range(rand.randint(0, 3)))]
+
+    return Rule(NSym(rand.choice(nonterminals)), exp or [TSym(EPSILON_CHAR)])
+
+class TestGrammarSession(unittest.TestCase):
+    def assertMatchesFullBuild(self, session):
+        grammar = session.grammar()
+        first_sets = build_first_sets(grammar)
+        follow_sets = build_follow_sets(grammar, first_sets)
+
+        self.assertEqual(session.first_sets, first_sets)
+        for sym in grammar.nonterminals:
+            self.assertEqual(session.follow_sets[sym.char], follow_sets[sym.char])
+
+        if len(session.conflicts) == 0:
+            self.assertEqual(session.parse_table, build_parse_table(grammar, first_sets, follow_sets))
+        else:
+            with self.assertRaises(ValueError):
+                build_parse_table(grammar, first_sets, follow_sets)
+
+    def test_initial_analysis(self):
+        session = GrammarSession(integration_test_grammar)
+
+        self.assertMatchesFullBuild(session)
+        self.assertEqual(session.conflicts, {})
+
+    def test_build_rule_by_rule(self):
+        session = GrammarSession(Grammar([], integration_test_grammar.start_symbol))
+        for rule in integration_test_grammar.rules:
+            session.add_rule(rule)
+            self.assertMatchesFullBuild(session)
+
+        self.assertEqual(session.parse_table, build_parse_table(integration_test_grammar))
+
+    def test_random_edits(self):
+        rand = random.Random(0)
+
+        for _ in range(200):
+            session = GrammarSession(Grammar([_random_rule(rand) for _ in range(rand.randint(0, 6))], NSym('S')))
+
+            for _ in range(10):
+                if len(session.rules) > 0 and rand.random() < 0.4:
+                    session.remove_rule(rand.choice(session.rules))
+                else:
+                    session.add_rule(_random_rule(rand))
+
+                self.assertMatchesFullBuild(session)
+
+    def test_conflicts(self):
+        session = GrammarSession(integration_test_grammar)
+
+        conflicting = Rule(NSym('F'), [TSym('0'), TSym('0')])
+        session.add_rule(conflicting)
+        self.assertEqual(list(session.conflicts), [('F', '0')])
+        with self.assertRaises(ValueError):
+            session.compile()
+
+        session.remove_rule(conflicting)
+        self.assertEqual(session.conflicts, {})
+        compiled = compile_parse_table(integration_test_grammar, build_parse_table(integration_test_grammar))
+        self.assertEqual(session.compile().table, compiled.table)
+
+    def test_remove_missing(self):
+        session = GrammarSession(integration_test_grammar)
+
+        with self.assertRaises(ValueError):
+            session.remove_rule(Rule(NSym('F'), [TSym('1')]))
+
+        # symbol kinds are compared too
+        with self.assertRaises(ValueError):
+            session.remove_rule(Rule(NSym('E'), [TSym('T'), NSym('H')]))
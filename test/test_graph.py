@@ -0,0 +1,29 @@
+import unittest
+from pycc.graph import *
+
+class TestStronglyConnectedComponents(unittest.TestCase):
+    def test_acyclic(self):
+        components = strongly_connected_components({'A': ['B'], 'B': ['C'], 'C': []})
+        self.assertEqual(components, [['C'], ['B'], ['A']])
+
+    def test_cycles(self):
+        components = strongly_connected_components({'A': ['B'], 'B': ['C', 'A'], 'C': ['D'], 'D': ['C']})
+        self.assertEqual([sorted(c) for c in components], [['C', 'D'], ['A', 'B']])
+
+    def test_successors_without_entries(self):
+        components = strongly_connected_components({'A': ['B']})
+        self.assertEqual(components, [['B'], ['A']])
+
+    def test_deep_chain(self):
+        n = 10000
+        graph = {i: [i + 1] for i in range(n)}
+        self.assertEqual(len(strongly_connected_components(graph)), n + 1)
+
+class TestPropagateBits(unittest.TestCase):
+    def test_chain(self):
+        values = propagate_bits({'A': ['B'], 'B': ['C']}, {'A': 1, 'B': 2, 'C': 4})
+        self.assertEqual(values, {'A': 7, 'B': 6, 'C': 4})
+
+    def test_cycle_shares_value(self):
+        values = propagate_bits({'A': ['B'], 'B': ['A', 'C']}, {'A': 1, 'C': 4})
+        self.assertEqual(values, {'A': 5, 'B': 5, 'C': 4})
@@ -0,0 +1,49 @@
+import random
+import unittest
+from pycc.ll_parser import LLParser
+from test.test_helpers import *
+
+class TestIncrementalParse(unittest.TestCase):
+    def test_matches_full_parse(self):
+        parser = LLParser(integration_test_grammar)
+        rand = random.Random(0)
+
+        for _ in range(100):
+            parse = parser.incremental('+'.join(['(0*0+0)'] * 10), interval=rand.randint(1, 8))
+
+            for _ in range(10):
+                start = rand.randint(0, len(parse.text))
+                end = min(len(parse.text), start + rand.randint(0, 2))
+                text = rand.choice(['0', '(0)', '+0', '0*', '(', ''])
+
+                self.assertEqual(parse.edit(start, end, text), parser.parse(parse.text), parse.text)
+
+    def test_edit_cost_is_local(self):
+        parser = LLParser(integration_test_grammar)
+        doc = '+'.join(['(0*0+0)'] * 10000)
+        parse = parser.incremental(doc, interval=256)
+        self.assertTrue(parse.accepted)
+        self.assertEqual(parse.parsed, len(doc))
+
+        # (0*0+0) -> ((0+0)*0+0)
+        middle = len(doc) // 2 // 8 * 8
+        self.assertTrue(parse.edit(middle + 1, middle + 2, '(0+0)'))
+        self.assertLess(parse.parsed, 2 * 256)
+
+        self.assertTrue(parse.edit(middle + 1, middle + 6, '0'))
+        self.assertLess(parse.parsed, 2 * 256)
+        self.assertEqual(parse.text, doc)
+
+    def test_recover_from_rejection(self):
+        parser = LLParser(integration_test_grammar)
+        parse = parser.incremental('0+0*0', interval=2)
+
+        self.assertFalse(parse.edit(2, 3, ')'))
+        self.assertTrue(parse.edit(2, 3, '(0)'))
+        self.assertEqual(parse.text, '0+(0)*0')
+
+    def test_invalid_range(self):
+        parse = LLParser(integration_test_grammar).incremental('0+0')
+
+        with self.assertRaises(ValueError):
+            parse.edit(2, 4, '0')
@@ -0,0 +1,114 @@
+import random
+import unittest
+from pycc.lazy_table import *
+from pycc.ll_parser import LLParser
+from pycc.stats import ParseStats
+from test.test_char_classes import number_or_identifier_grammar, accepted, rejected
+from test.test_helpers import *
+
+# S -> aA | bB, where A and B are independent copies of the integration test grammar
+split_grammar = build_grammar(
+    [('S', 'aE'),
+     ('S', 'be'),
+     ('E', 'TH'),
+     ('H', '+TH'),
+     ('H', EPSILON_CHAR),
+     ('T', 'FG'),
+     ('G', '*FG'),
+     ('G', EPSILON_CHAR),
+     ('F', '(E)'),
+     ('F', '0'),
+     ('e', 'th'),
+     ('h', '+th'),
+     ('h', EPSILON_CHAR),
+     ('t', 'fg'),
+     ('g', '*fg'),
+     ('g', EPSILON_CHAR),
+     ('f', '(e)'),
+     ('f', '0')])
+
+class TestLazyTable(unittest.TestCase):
+    def test_same_table_once_built(self):
+        eager = LLParser(split_grammar).compiled
+        lazy = LLParser(split_grammar, lazy=True).compiled
+
+        self.assertFalse(lazy.complete)
+        lazy.build_all()
+        self.assertTrue(lazy.complete)
+        self.assertEqual(lazy.table, eager.table)
+
+    def test_builds_rows_on_demand(self):
+        parser = LLParser(split_grammar, lazy=True)
+        self.assertEqual(parser.compiled.built_rows(), [])
+
+        self.assertTrue(parser.parse('a0+0*(0)'))
+        self.assertEqual(set(parser.compiled.built_rows()), set('SEHTGF'))
+
+        # FIRST and FOLLOW sets of the other half of the grammar were never needed
+        self.assertNotIn('e', parser.compiled.first_sets)
+        self.assertNotIn('h', parser.compiled.follow_sets)
+
+    def test_matches_eager(self):
+        eager = LLParser(split_grammar)
+        rand = random.Random(0)
+
+        for _ in range(50):
+            lazy = LLParser(split_grammar, lazy=True)
+            for _ in range(10):
+                s = rand.choice('ab') + ''.join(rand.choice('0+*()') for _ in range(rand.randint(0, 8)))
+                self.assertEqual(lazy.parse(s), eager.parse(s), s)
+
+    def test_other_drivers(self):
+        eager = LLParser(split_grammar)
+
+        self.assertEqual(list(LLParser(split_grammar, lazy=True).iter_events('b0*0')),
+                         list(eager.iter_events('b0*0')))
+        self.assertEqual(LLParser(split_grammar, lazy=True).evaluate('a0*0'), eager.evaluate('a0*0'))
+        self.assertIsNone(LLParser(split_grammar, lazy=True).parse_tree('a0*'))
+
+        stats = ParseStats()
+        self.assertTrue(LLParser(split_grammar, lazy=True, stats=stats).parse('b(0)'))
+        self.assertEqual(stats.cell_misses(), {})
+
+    def test_warm(self):
+        first = LLParser(split_grammar, lazy=True)
+        first.parse('b0')
+
+        parser = LLParser(split_grammar, lazy=True, warm=first.compiled.built_rows() + ['unknown'])
+        self.assertEqual(parser.compiled.built_rows(), first.compiled.built_rows())
+
+    def test_warm_from_stats(self):
+        stats = ParseStats()
+        LLParser(split_grammar, stats=stats).parse('a0')
+
+        parser = LLParser(split_grammar, lazy=True, warm=stats.predicts())
+        self.assertEqual(set(parser.compiled.built_rows()), set(stats.predicts()))
+
+    def test_conflict_found_when_row_is_built(self):
+        grammar = build_grammar(
+            [('S', 'aA'),
+             ('S', 'bB'),
+             ('A', 'c'),
+             ('B', 'cd'),
+             ('B', 'C'),
+             ('C', 'ce')])
+        parser = LLParser(grammar, lazy=True)
+
+        self.assertTrue(parser.parse('ac'))
+        with self.assertRaises(ValueError):
+            parser.parse('bcd')
+
+    def test_char_classes(self):
+        eager = LLParser(number_or_identifier_grammar)
+        parser = LLParser(number_or_identifier_grammar, lazy=True)
+
+        for s in accepted + rejected:
+            self.assertEqual(parser.parse(s), eager.parse(s), s)
+        self.assertEqual(set(parser.compiled.built_rows()), set('SNDI'))
+        self.assertEqual([node.symbol for node in parser.parse_tree('12').root.walk()],
+                         [node.symbol for node in eager.parse_tree('12').root.walk()])
+
+        lazy = LLParser(number_or_identifier_grammar, lazy=True).compiled
+        lazy.build_all()
+        self.assertTrue(lazy.complete)
+        self.assertEqual(lazy.table, eager.compiled.table)
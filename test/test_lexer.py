@@ -0,0 +1,83 @@
+import unittest
+from pycc.lexer import *
+from pycc.ll_parser import LLParser
+from pycc.grammar import *
+
+def _tokens(lexer, s):
+    return [(lexer.names[t], s[start:end]) for (t, start, end) in lexer.tokenize(s)]
+
+class TestLexer(unittest.TestCase):
+    def test_maximal_munch(self):
+        lexer = Lexer([('NUM', '[0-9]+'), ('OP', '[-+*/]'), ('WS', '[ \\t]+')], skip=['WS'])
+
+        self.assertEqual(_tokens(lexer, '12 + 345*6'),
+                         [('NUM', '12'), ('OP', '+'), ('NUM', '345'), ('OP', '*'), ('NUM', '6')])
+
+    def test_earlier_token_wins_ties(self):
+        lexer = Lexer([('IF', 'if'), ('ID', '[a-z_][a-z_0-9]*'), ('WS', ' +')], skip=['WS'])
+
+        self.assertEqual(_tokens(lexer, 'if iffy i'),
+                         [('IF', 'if'), ('ID', 'iffy'), ('ID', 'i')])
+
+    def test_backtracks_to_last_accept(self):
+        lexer = Lexer([('A', 'a'), ('ABC', 'abc'), ('B', 'b')])
+
+        self.assertEqual(_tokens(lexer, 'abab'), [('A', 'a'), ('B', 'b'), ('A', 'a'), ('B', 'b')])
+        self.assertEqual(_tokens(lexer, 'abcab'), [('ABC', 'abc'), ('A', 'a'), ('B', 'b')])
+
+    def test_failed_longer_matches_are_remembered(self):
+        lexer = Lexer([('A', 'a'), ('B', 'a*b')])
+
+        # each token scans to the end of the input looking for a b, which would be quadratic without remembering
+        # where those scans failed
+        n = 50000
+        self.assertEqual(list(lexer.token_ids('a' * n)), [0] * n)
+        self.assertEqual(_tokens(lexer, 'aaabaa'), [('B', 'aaab'), ('A', 'a'), ('A', 'a')])
+
+    def test_operators(self):
+        lexer = Lexer([('X', '(ab|c)*d?'), ('Y', 'e+'), ('Z', '.')])
+
+        self.assertEqual(_tokens(lexer, 'abcabdeeez'), [('X', 'abcabd'), ('Y', 'eee'), ('Z', 'z')])
+
+    def test_escapes_and_classes(self):
+        lexer = Lexer([('NUM', '\\d+(\\.\\d+)?'), ('STR', '"[^"]*"'), ('WS', '\\s+')], skip=['WS'])
+
+        self.assertEqual(_tokens(lexer, '3.14 "a b\\u00e9" 2'),
+                         [('NUM', '3.14'), ('STR', '"a b\\u00e9"'), ('NUM', '2')])
+        self.assertEqual(_tokens(lexer, '"é中"'), [('STR', '"é中"')])
+
+    def test_equivalence_classes(self):
+        lexer = Lexer([('ID', '[a-zA-Z]+'), ('NUM', '[0-9]+')])
+
+        # letters, digits and everything else
+        self.assertEqual(lexer.class_map.n_classes, 3)
+        self.assertEqual(lexer.class_map.class_of('a'), lexer.class_map.class_of('Q'))
+
+    def test_no_match(self):
+        lexer = Lexer([('NUM', '[0-9]+')])
+
+        with self.assertRaises(LexError):
+            list(lexer.tokenize('12a'))
+
+    def test_bad_patterns(self):
+        for pattern in ['(a', 'a)', '*a', '[a-', 'a\\']:
+            with self.assertRaises(ValueError):
+                Lexer([('T', pattern)])
+
+class TestParseTokens(unittest.TestCase):
+    def test_parse(self):
+        # E -> NUM H, H -> OP NUM H | epsilon
+        grammar = Grammar(
+            [Rule(NSym('E'), [TSym('NUM'), NSym('H')]),
+             Rule(NSym('H'), [TSym('OP'), TSym('NUM'), NSym('H')]),
+             Rule(NSym('H'), [TSym('')])],
+            NSym('E'))
+        lexer = Lexer([('NUM', '[0-9]+'), ('OP', '[-+]'), ('WS', ' +'), ('ID', '[a-z]+')], skip=['WS'])
+        parser = LLParser(grammar)
+
+        self.assertTrue(parser.parse_tokens('12 + 345 - 6', lexer))
+        self.assertTrue(parser.parse_tokens('7', lexer))
+
+        self.assertFalse(parser.parse_tokens('12 +', lexer))
+        self.assertFalse(parser.parse_tokens('12 + x', lexer))
+        self.assertFalse(parser.parse_tokens('12 * 3', lexer))
@@ -1,3 +1,4 @@
+import time
 import unittest
 from pycc.ll_parser import *
 from pycc.grammar import *
@@ -15,3 +16,96 @@ class TestIntegration(unittest.TestCase):
         self.assertFalse(parser.parse('0+'))
         self.assertFalse(parser.parse('(0+0'))
         self.assertFalse(parser.parse('(0+0)*0)'))
+
+    def test_parse_left_recursive(self):
+        parser = LLParser(build_grammar(
+            [('A', 'A+b'),
+             ('A', 'b')]))
+
+        self.assertTrue(parser.parse('b'))
+        self.assertTrue(parser.parse('b+b+b'))
+
+        self.assertFalse(parser.parse('b+'))
+        self.assertFalse(parser.parse('bb'))
+        self.assertFalse(parser.parse('c'))
+
+    def test_fresh_nonterminal_without_rules(self):
+        # B has no productive rules, so left factoring A mustn't pick B as its fresh nonterminal
+        parser = LLParser(build_grammar(
+            [('A', 'a'),
+             ('A', 'aaB'),
+             ('B', 'B')]))
+
+        self.assertTrue(parser.parse('a'))
+        self.assertFalse(parser.parse('aa'))
+        self.assertFalse(parser.parse('aaa'))
+
+def _best_parse_time(parser, s, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser.parse(s)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+class TestParseScaling(unittest.TestCase):
+    """Regression benchmark: parse time should grow linearly with input length. A quadratic driver would take
+    ~64x as long on the 8x input, so the bound below leaves plenty of room for timer noise.
+    """
+    def assertLinear(self, parser, build_input, n=2000, factor=8):
+        small = build_input(n)
+        large = build_input(n * factor)
+        self.assertTrue(parser.parse(large))
+
+        ratio = _best_parse_time(parser, large) / _best_parse_time(parser, small)
+        self.assertLess(ratio, factor * 3)
+
+    def test_deeply_nested(self):
+        parser = LLParser(integration_test_grammar)
+        self.assertLinear(parser, lambda n: '(' * n + '0' + ')' * n)
+
+    def test_long_flat(self):
+        parser = LLParser(integration_test_grammar)
+        self.assertLinear(parser, lambda n: '+'.join(['0*0'] * n))
+
+class TestMutuallyDependentFollowSets(unittest.TestCase):
+    def test_parse(self):
+        parser = LLParser(build_grammar(
+            [('A', 'aB'),
+             ('B', 'bA'),
+             ('B', EPSILON_CHAR)]))
+
+        self.assertTrue(parser.parse('a'))
+        self.assertTrue(parser.parse('ababa'))
+
+        self.assertFalse(parser.parse('ab'))
+        self.assertFalse(parser.parse('aa'))
+
+class TestParseMany(unittest.TestCase):
+    inputs = ['0', '0+0*0', '(0+0)*(0+0)', '0+', '(0+0', '(0+0)*0)'] * 50
+
+    def test_single_process(self):
+        parser = LLParser(integration_test_grammar)
+
+        self.assertEqual(list(parser.parse_many(self.inputs)), [parser.parse(s) for s in self.inputs])
+
+    def test_pool(self):
+        parser = LLParser(integration_test_grammar)
+
+        self.assertEqual(list(parser.parse_many(iter(self.inputs), workers=2, chunksize=7)),
+                         [parser.parse(s) for s in self.inputs])
+
+    def test_pool_reads_lazily(self):
+        parser = LLParser(integration_test_grammar)
+        read = [0]
+
+        def endless():
+            while True:
+                read[0] += 1
+                yield '0+0'
+
+        results = parser.parse_many(endless(), workers=2, chunksize=7)
+        self.assertTrue(next(results))
+        self.assertLessEqual(read[0], (2 * CHUNKS_PER_WORKER + 1) * 7)
+        results.close()
@@ -106,20 +106,47 @@ class TestFollowSets(unittest.TestCase):
         follow_sets = _build_follow_sets(rule_strs, first_sets)
         self.assertEqual(follow_sets['C'], set(['e']))
 
-class TestTopoSort(unittest.TestCase):
-    def test_simple(self):
-        self.assertEqual(topo_sort({'A': set(['B']), 'B': set(['C'])}),
-                         ['A', 'B', 'C'])
+    def test_mutual_dependency(self):
+        rule_strs = [
+            ('A', 'aB'),
+            ('B', 'bA'),
+            ('B', EPSILON_CHAR)
+        ]
+        first_sets = _build_first_sets(rule_strs)
+        follow_sets = _build_follow_sets(rule_strs, first_sets)
+        self.assertEqual(follow_sets['A'], set([END_SYMBOL]))
+        self.assertEqual(follow_sets['B'], set([END_SYMBOL]))
 
-    def test_multiple_dependency(self):
-        ts = topo_sort({'A': set(['B']), 'C': set(['B'])})
-        self.assertTrue(ts.index('A') < ts.index('B'))
-        self.assertTrue(ts.index('C') < ts.index('B'))
+    def test_cycle_with_trailer(self):
+        rule_strs = [
+            ('S', 'Ac'),
+            ('A', 'aB'),
+            ('B', 'bA'),
+            ('B', EPSILON_CHAR)
+        ]
+        first_sets = _build_first_sets(rule_strs)
+        follow_sets = _build_follow_sets(rule_strs, first_sets)
+        self.assertEqual(follow_sets['A'], set(['c']))
+        self.assertEqual(follow_sets['B'], set(['c']))
 
-    def test_cyclic_dependency(self):
-        with self.assertRaises(ValueError):
-            topo_sort({'A': set(['B']), 'B': set(['A'])})
+class TestLargeGrammar(unittest.TestCase):
+    def test_long_nullable_chain(self):
+        # A0 -> A1 x | epsilon, A1 -> A2 x | epsilon, ... far deeper than the Python recursion limit
+        n = 5000
+        syms = [chr(0x100 + i) for i in range(n)]
+        rule_strs = []
+        for i in range(n - 1):
+            rule_strs.append((syms[i], syms[i + 1] + 'x'))
+            rule_strs.append((syms[i], EPSILON_CHAR))
+        rule_strs.append((syms[-1], 'y'))
+
+        first_sets = _build_first_sets(rule_strs)
+        self.assertEqual(first_sets[syms[0]], set(['x', 'y', EPSILON_CHAR]))
+        self.assertEqual(first_sets[syms[-1]], set(['y']))
 
+        follow_sets = _build_follow_sets(rule_strs, first_sets)
+        self.assertEqual(follow_sets[syms[0]], set([END_SYMBOL]))
+        self.assertEqual(follow_sets[syms[1]], set(['x']))
 
 class TestIntegration(unittest.TestCase):
     def test_first_sets(self):
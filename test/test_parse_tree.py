@@ -0,0 +1,54 @@
+import unittest
+from pycc.ll_parser import LLParser
+from test.test_helpers import *
+
+def _shape(node):
+    if node.is_terminal:
+        return node.symbol
+
+    return (node.symbol, [_shape(child) for child in node.children])
+
+class TestParseTree(unittest.TestCase):
+    def test_rejects(self):
+        parser = LLParser(integration_test_grammar)
+
+        self.assertIsNone(parser.parse_tree('0+'))
+        self.assertIsNone(parser.parse_tree('(0'))
+
+    def test_shape(self):
+        parser = LLParser(integration_test_grammar)
+        tree = parser.parse_tree('0+0')
+
+        self.assertEqual(_shape(tree.root),
+                         ('E', [('T', [('F', ['0']), ('G', [])]),
+                                ('H', ['+',
+                                       ('T', [('F', ['0']), ('G', [])]),
+                                       ('H', [])])]))
+
+    def test_spans(self):
+        parser = LLParser(integration_test_grammar)
+        tree = parser.parse_tree('(0)*0')
+
+        self.assertEqual(tree.root.span, (0, 5))
+        self.assertEqual([(n.symbol, n.span) for n in tree.root.walk() if n.symbol == 'F'],
+                         [('F', (0, 3)), ('F', (1, 2)), ('F', (4, 5))])
+
+        # epsilon productions derive an empty span
+        h = tree.root.children[1]
+        self.assertEqual(h.span, (5, 5))
+
+    def test_parents(self):
+        parser = LLParser(integration_test_grammar)
+        tree = parser.parse_tree('0*0')
+
+        self.assertIsNone(tree.root.parent)
+        for node in tree.root.walk():
+            for child in node.children:
+                self.assertEqual(child.parent, node)
+
+    def test_walk_is_preorder(self):
+        parser = LLParser(integration_test_grammar)
+        tree = parser.parse_tree('0')
+
+        self.assertEqual([n.symbol for n in tree.root.walk()], ['E', 'T', 'F', '0', 'G', 'H'])
+        self.assertEqual(len(tree), 6)
@@ -0,0 +1,69 @@
+import json
+import unittest
+from pycc.ll_parser import LLParser
+from pycc.stats import ParseStats
+from pycc.constants import END_SYMBOL
+from test.test_helpers import *
+
+class TestParseStats(unittest.TestCase):
+    def test_phase_times(self):
+        stats = ParseStats()
+        LLParser(integration_test_grammar, stats=stats)
+
+        self.assertEqual(set(stats.phase_times),
+                         set(['remove_left_recursion', 'left_factor', 'build_first_sets', 'build_follow_sets',
+                              'build_parse_table', 'compile_parse_table']))
+
+    def test_counts(self):
+        stats = ParseStats()
+        parser = LLParser(integration_test_grammar, stats=stats)
+
+        self.assertTrue(parser.parse('0+0'))
+        self.assertEqual(stats.parses, 1)
+        self.assertEqual(stats.accepted, 1)
+        self.assertEqual(stats.predicts(), {'E': 1, 'T': 2, 'F': 2, 'G': 2, 'H': 2})
+        self.assertEqual(stats.matches(), {'0': 2, '+': 1, END_SYMBOL: 1})
+        self.assertEqual(stats.cell_hits()[('G', '+')], 1)
+        self.assertEqual(stats.cell_hits()[('G', END_SYMBOL)], 1)
+        self.assertEqual(stats.hot_cells(1)[0][1], 2)
+        self.assertEqual(stats.max_stack_depth, 4)
+
+    def test_misses(self):
+        stats = ParseStats()
+        parser = LLParser(integration_test_grammar, stats=stats)
+
+        self.assertFalse(parser.parse('0+)'))
+        self.assertEqual(stats.parses, 1)
+        self.assertEqual(stats.accepted, 0)
+        self.assertEqual(stats.cell_misses(), {('T', ')'): 1})
+
+    def test_results_match_uninstrumented(self):
+        parser = LLParser(integration_test_grammar)
+        instrumented = LLParser(integration_test_grammar, stats=ParseStats())
+
+        for s in ['0', '0+0*0', '(0+0)*(0+0)', '0+', '(0+0', '(0+0)*0)', 'x']:
+            self.assertEqual(instrumented.parse(s), parser.parse(s))
+
+    def test_stream(self):
+        stats = ParseStats()
+        stream = LLParser(integration_test_grammar, stats=stats).stream()
+        stream.feed('0*')
+        stream.feed('0')
+
+        self.assertTrue(stream.finish())
+        self.assertEqual(stats.parses, 1)
+        self.assertEqual(stats.predicts()['F'], 2)
+
+    def test_as_dict(self):
+        stats = ParseStats()
+        parser = LLParser(integration_test_grammar, stats=stats)
+        parser.parse('(0)')
+
+        data = json.loads(json.dumps(stats.as_dict()))
+        self.assertEqual(data['parses'], 1)
+        self.assertIn(['F', '(', 1], data['cell_hits'])
+
+        stats.reset()
+        self.assertEqual(stats.parses, 0)
+        self.assertEqual(stats.cell_hits(), {})
+        self.assertIn('build_parse_table', stats.phase_times)
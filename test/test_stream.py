@@ -0,0 +1,59 @@
+import io
+import unittest
+from pycc.ll_parser import LLParser
+from test.test_helpers import *
+
+class TestStreamParse(unittest.TestCase):
+    def test_chunks_match_parse(self):
+        parser = LLParser(integration_test_grammar)
+
+        for s in ['0', '0+0*0', '(0+0)*(0+0)', '0+', '(0+0', '(0+0)*0)']:
+            for size in [1, 2, 3]:
+                stream = parser.stream()
+                for i in range(0, len(s), size):
+                    stream.feed(s[i:i + size])
+
+                self.assertEqual(stream.finish(), parser.parse(s))
+
+    def test_early_reject(self):
+        parser = LLParser(integration_test_grammar)
+        stream = parser.stream()
+
+        self.assertTrue(stream.feed('(0+'))
+        self.assertFalse(stream.feed('+0'))
+        self.assertFalse(stream.feed('0)'))
+        self.assertFalse(stream.finish())
+
+    def test_feed_after_finish(self):
+        parser = LLParser(integration_test_grammar)
+        stream = parser.stream()
+        stream.feed('0')
+
+        self.assertTrue(stream.finish())
+        self.assertTrue(stream.finish())
+        with self.assertRaises(ValueError):
+            stream.feed('0')
+
+    def test_parse_stream_iterable(self):
+        parser = LLParser(integration_test_grammar)
+
+        self.assertTrue(parser.parse_stream(['(0', '+0)', '*0']))
+        self.assertFalse(parser.parse_stream(['(0', '+0']))
+
+    def test_parse_stream_stops_reading_at_error(self):
+        parser = LLParser(integration_test_grammar)
+        chunks_read = []
+
+        def chunks():
+            for chunk in ['0+', '+', '0', '0']:
+                chunks_read.append(chunk)
+                yield chunk
+
+        self.assertFalse(parser.parse_stream(chunks()))
+        self.assertEqual(chunks_read, ['0+', '+'])
+
+    def test_parse_stream_file(self):
+        parser = LLParser(integration_test_grammar)
+
+        self.assertTrue(parser.parse_stream(io.StringIO('0*0+' * 1000 + '0'), chunk_size=7))
+        self.assertFalse(parser.parse_stream(io.StringIO('0*0+' * 1000), chunk_size=7))